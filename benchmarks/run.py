@@ -0,0 +1,196 @@
+"""
+오프라인 벤치마크 - 합성 시트 XML과 process_text 스텁으로 단계별 처리 시간을 측정합니다.
+네트워크 없이 실행되며, 배포 전 성능 저하를 확인하는 용도로 사용합니다.
+
+사용법:
+    python -m benchmarks.run --sizes 10,100 --segments 20 --latency 0.05
+    python -m benchmarks.run --sizes 100 --env PARSE_WORKERS=4 --env MAX_CONCURRENCY=8
+"""
+import os
+import json
+import time
+import argparse
+import tempfile
+import contextlib
+
+from benchmarks import stub_workflow
+from benchmarks.synthetic import write_corpus
+from python.services.metrics import summarize
+
+# 파일 단위로 측정하는 처리 단계
+STAGES = ["parse", "extract", "llm", "update", "serialize"]
+
+def bench_stages(file_paths, batch_size, output_dir):
+    """
+    파일마다 파싱, 텍스트 추출, LLM 호출, 업데이트, 직렬화 시간을 측정하고 배치 단위로 결과 파일 저장 시간을 측정합니다.
+    
+    Args:
+        file_paths (list): XML 파일 경로 리스트
+        batch_size (int): 배치당 파일 수
+        output_dir (str): 배치 결과 파일을 저장할 디렉토리
+    
+    Returns:
+        dict: 단계 이름 -> 소요 시간 리스트 (초)
+    """
+    from python.services.xml_processor import XMLParser, request_segments
+    from python.process import write_batch_json
+    
+    timings = {stage: [] for stage in STAGES + ["batch_write"]}
+    file_results = []
+    batch_idx = 0
+    
+    for file_path in file_paths:
+        parser = XMLParser(file_path)
+        
+        start = time.perf_counter()
+        parser.tree
+        timings["parse"].append(time.perf_counter() - start)
+        
+        start = time.perf_counter()
+        text_list, tbpe_id_list = parser.extract_segments()
+        timings["extract"].append(time.perf_counter() - start)
+        
+        start = time.perf_counter()
+        processed_result = request_segments(text_list)
+        timings["llm"].append(time.perf_counter() - start)
+        
+        # positive/negative 각각 업데이트(반영 및 복원)와 직렬화 시간을 나누어 측정
+        update_time = 0.0
+        serialize_time = 0.0
+        variants = {}
+        snapshot = parser.snapshot_text_elements()
+        for variant_key in ("positive", "negative"):
+            start = time.perf_counter()
+            parser.update_xml(parser.extract_processed_texts(processed_result, text_list, tbpe_id_list, variant_key))
+            updated = time.perf_counter()
+            variants[variant_key] = parser.xml_to_string()
+            serialized = time.perf_counter()
+            parser.restore_text_elements(snapshot)
+            update_time += (updated - start) + (time.perf_counter() - serialized)
+            serialize_time += serialized - updated
+        timings["update"].append(update_time)
+        timings["serialize"].append(serialize_time)
+        
+        file_results.append({
+            "success": True,
+            "file": os.path.basename(file_path),
+            "page_idx": 0,
+            "positive_xml": variants["positive"],
+            "negative_xml": variants["negative"]
+        })
+        
+        if len(file_results) == batch_size or file_path == file_paths[-1]:
+            start = time.perf_counter()
+            write_batch_json(batch_idx, file_results, os.path.join(output_dir, f"batch_{batch_idx}.json"))
+            timings["batch_write"].append(time.perf_counter() - start)
+            file_results = []
+            batch_idx += 1
+    
+    return timings
+
+def bench_process(corpus_dir, output_dir, batch_size, env):
+    """
+    process() 전체를 실행하여 처리량을 측정합니다.
+    
+    Args:
+        corpus_dir (str): 입력 XML 디렉토리
+        output_dir (str): 출력 디렉토리
+        batch_size (int): 배치당 파일 수
+        env (dict): 추가로 설정할 환경 변수 (예: PARSE_WORKERS, MAX_CONCURRENCY)
+    
+    Returns:
+        dict: seconds, files_per_second, llm_calls, success
+    """
+    from python.process import process
+    
+    os.environ.update({"INPUT_PATH": corpus_dir, "OUTPUT_PATH": output_dir, "BATCH_SIZE": str(batch_size)})
+    os.environ.update(env)
+    
+    calls_before = stub_workflow.CALLS
+    start = time.perf_counter()
+    result = process()
+    seconds = time.perf_counter() - start
+    
+    file_count = result.get("total_files", 0)
+    return {
+        "seconds": round(seconds, 3),
+        "files_per_second": round(file_count / seconds, 2) if seconds > 0 else 0.0,
+        "llm_calls": stub_workflow.CALLS - calls_before,
+        "success": result.get("success", False)
+    }
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='합성 시트 XML과 process_text 스텁을 사용한 오프라인 벤치마크')
+    parser.add_argument('--sizes', default='10,100', help='코퍼스 파일 수 목록 (쉼표로 구분, 기본값: 10,100)')
+    parser.add_argument('--segments', type=int, default=20, help='페이지당 텍스트 조각 수 (TEXT/SIMPLE_TEXT 절반씩, 기본값: 20)')
+    parser.add_argument('--words', type=int, default=8, help='텍스트 조각당 단어 수 (기본값: 8)')
+    parser.add_argument('--image-kb', type=int, default=0, help='페이지마다 포함할 이미지 데이터 크기 (KB, 기본값: 0)')
+    parser.add_argument('--duplicate-ratio', type=float, default=0.0, help='페이지 간 공통 텍스트 비율 (기본값: 0)')
+    parser.add_argument('--latency', type=float, default=0.0, help='process_text 스텁의 응답 지연 시간 (초, 기본값: 0)')
+    parser.add_argument('--batch-size', type=int, default=100, help='배치당 파일 수 (기본값: 100)')
+    parser.add_argument('--env', action='append', default=[], help='process() 실행 시 설정할 환경 변수 (KEY=VALUE, 여러 번 지정 가능)')
+    parser.add_argument('--skip-process', action='store_true', help='process() 전체 실행 측정 생략')
+    parser.add_argument('--output', default=None, help='벤치마크 결과(JSON) 저장 경로')
+    parser.add_argument('--verbose', action='store_true', help='처리 중 출력 메시지 표시')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    
+    # xml_processor 임포트 전에 workflow 스텁 등록 (네트워크 사용 안 함)
+    stub_workflow.install(args.latency)
+    
+    env = dict(item.split('=', 1) for item in args.env)
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    sheet_options = {
+        "text_count": args.segments // 2,
+        "simple_text_count": args.segments - args.segments // 2,
+        "words_per_segment": args.words,
+        "image_kb": args.image_kb,
+        "duplicate_ratio": args.duplicate_ratio
+    }
+    
+    report = {"options": vars(args), "runs": []}
+    
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as work_dir:
+            corpus_dir = os.path.join(work_dir, "input")
+            file_paths = write_corpus(corpus_dir, size, **sheet_options)
+            
+            # 처리 중 출력 메시지는 측정 결과에 영향을 주므로 기본적으로 숨김
+            with open(os.devnull, 'w') as devnull:
+                quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(devnull)
+                with quiet:
+                    stage_output = os.path.join(work_dir, "stages")
+                    os.makedirs(stage_output)
+                    timings = bench_stages(file_paths, args.batch_size, stage_output)
+                    
+                    process_result = None
+                    if not args.skip_process:
+                        process_result = bench_process(corpus_dir, os.path.join(work_dir, "output"), args.batch_size, env)
+            
+            run = {
+                "files": size,
+                "corpus_bytes": sum(os.path.getsize(file_path) for file_path in file_paths),
+                "stages": {stage: summarize(values) for stage, values in timings.items()}
+            }
+            if process_result is not None:
+                run["process"] = process_result
+            report["runs"].append(run)
+        
+        print(f"[{size}개 파일] 코퍼스 크기 {run['corpus_bytes'] / 1024:.1f}KB")
+        for stage, stats in run["stages"].items():
+            print(f"  {stage:<12} 평균 {stats['mean_ms']:>9.3f}ms  p95 {stats['p95_ms']:>9.3f}ms  합계 {stats['total_ms']:>10.3f}ms")
+        if process_result is not None:
+            print(f"  process()    {process_result['seconds']:.3f}초, {process_result['files_per_second']}파일/초, "
+                  f"LLM 호출 {process_result['llm_calls']}회")
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"벤치마크 결과가 {args.output}에 저장되었습니다.")
+    
+    return report
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import sys
+import time
+import types
+
+# process_text 스텁의 응답 지연 시간 (초)
+LATENCY = 0.0
+
+# process_text 호출 횟수
+CALLS = 0
+
+def process_text(combined_text):
+    """
+    네트워크 없이 동작하는 process_text 스텁
+    텍스트 조각마다 접두사를 붙여 positive/hard_negative/paraphrase 문서를 만듭니다.
+    
+    Args:
+        combined_text (str): \\+\\ 구분자로 연결된 텍스트
+    
+    Returns:
+        dict: workflow.process_text와 같은 형식의 결과
+    """
+    global CALLS
+    CALLS += 1
+    
+    if LATENCY > 0:
+        time.sleep(LATENCY)
+    
+    text_list = combined_text.split("\\+\\")
+    return {
+        "positive_document": "\\+\\".join(f"긍정 {text}" for text in text_list),
+        "hard_negative_document": "\\+\\".join(f"부정 {text}" for text in text_list),
+        "paraphrase": "\\+\\".join(f"다른 표현 {text}" for text in text_list)
+    }
+
+def install(latency=0.0):
+    """
+    workflow 모듈 대신 스텁을 sys.modules에 등록합니다.
+    xml_processor가 process_text를 처음 호출하기 전에 호출해야 합니다.
+    
+    Args:
+        latency (float): process_text 호출마다 대기할 시간 (초)
+    """
+    global LATENCY
+    LATENCY = latency
+    
+    module = types.ModuleType("workflow")
+    module.process_text = process_text
+    sys.modules["workflow"] = module
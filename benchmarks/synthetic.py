@@ -0,0 +1,93 @@
+import os
+import json
+import random
+import base64
+from xml.sax.saxutils import escape
+
+# 합성 텍스트에 사용할 단어
+WORDS = [
+    "디자인", "템플릿", "발표", "제목", "소개", "회사", "제품", "서비스", "고객", "성장",
+    "design", "template", "slide", "title", "team", "product", "growth", "report", "plan", "summary"
+]
+
+def random_text(rng, word_count):
+    """단어를 무작위로 이어 붙인 텍스트를 생성합니다."""
+    return " ".join(rng.choice(WORDS) for _ in range(word_count))
+
+def simple_text_body(rng, text):
+    """SIMPLE_TEXT 태그의 TextBody JSON(리치 텍스트 구조)을 생성합니다 (첫 단어와 나머지를 두 문단으로 구성)."""
+    paragraphs = []
+    for paragraph_text in text.split(" ", 1):
+        words = paragraph_text.split(" ")
+        runs = [{"t": "r", "rp": {"size": rng.choice([12, 16, 20, 32])}, "c": [" ".join(words[:len(words) // 2 + 1])]}]
+        if len(words) > 1:
+            runs.append({"t": "r", "c": [" " + " ".join(words[len(words) // 2 + 1:])]})
+        paragraphs.append({"t": "p", "c": runs})
+    return json.dumps({"c": paragraphs}, ensure_ascii=False)
+
+def generate_sheet_xml(text_count=10, simple_text_count=10, words_per_segment=8, image_kb=0, duplicate_ratio=0.0, seed=0):
+    """
+    TEXT/SIMPLE_TEXT 태그를 포함한 합성 시트 XML을 생성합니다.
+    
+    Args:
+        text_count (int): TEXT 태그 수
+        simple_text_count (int): SIMPLE_TEXT 태그 수
+        words_per_segment (int): 텍스트 조각당 단어 수
+        image_kb (int): 포함할 이미지 데이터 크기 (KB, 대용량 내보내기 시뮬레이션)
+        duplicate_ratio (float): 페이지 간 공통 텍스트(제목, 바닥글 등)로 채울 텍스트 비율
+        seed (int): 난수 시드
+    
+    Returns:
+        str: XML 문자열
+    """
+    rng = random.Random(seed)
+    shared_rng = random.Random(0)
+    shared_texts = [random_text(shared_rng, words_per_segment) for _ in range(5)]
+
+    def segment_text():
+        if rng.random() < duplicate_ratio:
+            return rng.choice(shared_texts)
+        return random_text(rng, words_per_segment)
+    
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<SHEET>']
+    
+    if image_kb > 0:
+        image_data = base64.b64encode(rng.randbytes(image_kb * 1024))
+        lines.append(f'  <IMAGE><Data>{image_data.decode("ascii")}</Data></IMAGE>')
+    
+    for i in range(simple_text_count):
+        body = simple_text_body(rng, segment_text())
+        lines.append(
+            f'  <SIMPLE_TEXT TbpeId="s{i}"><TextBody>{escape(body)}</TextBody>'
+            f'<RenderPos>{{"x": {i}, "y": {i}}}</RenderPos></SIMPLE_TEXT>'
+        )
+    
+    for i in range(text_count):
+        lines.append(
+            f'  <TEXT TbpeId="t{i}"><Text>{escape(segment_text())}</Text>'
+            f'<TextData>data-{i}</TextData><RenderPos>{{"x": {i}, "y": {i}}}</RenderPos></TEXT>'
+        )
+    
+    lines.append('</SHEET>')
+    return "\n".join(lines)
+
+def write_corpus(output_dir, file_count, **sheet_options):
+    """
+    합성 시트 XML 파일을 디렉토리에 생성합니다 (파일명: {idx}_page.xml).
+    
+    Args:
+        output_dir (str): 출력 디렉토리 경로
+        file_count (int): 생성할 파일 수
+        **sheet_options: generate_sheet_xml 인자
+    
+    Returns:
+        list: 생성된 파일 경로 리스트
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    file_paths = []
+    for idx in range(file_count):
+        file_path = os.path.join(output_dir, f"{idx}_page.xml")
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(generate_sheet_xml(seed=idx, **sheet_options))
+        file_paths.append(file_path)
+    return file_paths
@@ -1,7 +1,9 @@
-import { MiricanvasBrowser } from './puppeteer/browser';
-import { MiricanvasPage } from './puppeteer/page';
+import { MiricanvasPagePool } from './puppeteer/pool';
+import { getImageOptions } from './puppeteer/page';
+import { loadStoredXml } from './storage';
 import * as dotenv from 'dotenv';
 import * as fs from 'fs';
+import * as readline from 'readline';
 const path = require('path');
 
 // 환경 변수 로드
@@ -20,16 +22,35 @@ console.log('환경 변수 로드 상태:', {
 // 명령줄 인자 파싱
 const args = process.argv.slice(2);
 let dataFilePath = '';
+let manifestPath = '';
 let outputPath = '';
+let resume = false;
+// 동시에 렌더링할 페이지 수 (main.py의 --pool-size)
+let poolSize = parseInt(process.env.RENDER_POOL_SIZE || '1', 10);
 
 // 명령줄 인자 처리
 for (let i = 0; i < args.length; i++) {
   if (args[i] === '--data' && i + 1 < args.length) {
     dataFilePath = args[i + 1];
     i++;
+  } else if (args[i] === '--manifest' && i + 1 < args.length) {
+    manifestPath = args[i + 1];
+    i++;
   } else if (args[i] === '--output' && i + 1 < args.length) {
     outputPath = args[i + 1];
     i++;
+  } else if (args[i] === '--resume') {
+    resume = true;
+  } else if (args[i] === '--pool-size' && i + 1 < args.length) {
+    poolSize = parseInt(args[i + 1], 10);
+    i++;
+  } else if (args[i] === '--image-format' && i + 1 < args.length) {
+    // 이미지 형식/배율은 환경 변수로 전달 (main.py의 --image-format, --image-scale과 동일)
+    process.env.IMAGE_FORMAT = args[i + 1];
+    i++;
+  } else if (args[i] === '--image-scale' && i + 1 < args.length) {
+    process.env.IMAGE_SCALE = args[i + 1];
+    i++;
   }
 }
 
@@ -49,6 +70,199 @@ function loadJsonFile(filePath: string): any {
   }
 }
 
+// 렌더링 완료 기록 파일명 (출력 디렉토리에 생성)
+const RENDER_CHECKPOINT_FILE = 'render_checkpoint.jsonl';
+
+// 이전 실행에서 렌더링이 완료된 항목 키 목록
+const renderedKeys = new Set<string>();
+
+/**
+ * 렌더링 완료 기록을 초기화하거나(--resume 없음) 이전 기록을 불러오는 함수
+ */
+function loadRenderCheckpoint(outputDir: string, resumeRun: boolean): void {
+  const checkpointPath = path.join(outputDir, RENDER_CHECKPOINT_FILE);
+
+  if (!resumeRun || !fs.existsSync(checkpointPath)) {
+    fs.writeFileSync(checkpointPath, '', 'utf-8');
+    return;
+  }
+
+  for (const line of fs.readFileSync(checkpointPath, 'utf-8').split('\n')) {
+    if (!line.trim()) {
+      continue;
+    }
+    try {
+      renderedKeys.add(JSON.parse(line).key);
+    } catch (error) {
+      // 중단 시점에 기록 중이던 마지막 줄은 무시
+    }
+  }
+  console.log(`이전 실행에서 렌더링이 완료된 ${renderedKeys.size}개 항목을 건너뜁니다.`);
+}
+
+/**
+ * 렌더링이 완료된 항목을 기록하는 함수
+ */
+function recordRendered(outputDir: string, key: string): void {
+  renderedKeys.add(key);
+  fs.appendFileSync(path.join(outputDir, RENDER_CHECKPOINT_FILE), JSON.stringify({ key }) + '\n', 'utf-8');
+}
+
+/**
+ * 배치 결과 파일에서 처리된 파일 항목을 순서대로 읽어오는 함수
+ * - json: 배치 JSON 전체를 읽은 뒤 processed_files 항목을 반환
+ * - jsonl: 한 줄씩 스트리밍으로 읽어 성공한 항목만 반환 (배치 크기와 무관하게 메모리 사용량 일정)
+ */
+async function* readBatchFiles(batch: any): AsyncGenerator<any> {
+  const isJsonl = batch.format === 'jsonl' || String(batch.json_path).endsWith('.jsonl');
+
+  if (!isJsonl) {
+    const batchData = loadJsonFile(batch.json_path);
+    console.log(`배치 데이터 로드 완료: ${batchData.processed_files.length}개 파일`);
+    yield* batchData.processed_files;
+    return;
+  }
+
+  if (!fs.existsSync(batch.json_path)) {
+    throw new Error(`파일을 찾을 수 없습니다: ${batch.json_path}`);
+  }
+
+  const lines = readline.createInterface({
+    input: fs.createReadStream(batch.json_path, { encoding: 'utf-8' }),
+    crlfDelay: Infinity
+  });
+
+  for await (const line of lines) {
+    if (!line.trim()) {
+      continue;
+    }
+    const record = JSON.parse(line);
+    if (!record.success) {
+      console.warn(`경고: ${record.file} 처리 실패 항목을 건너뜁니다. (${record.error})`);
+      continue;
+    }
+    yield record;
+  }
+}
+
+/**
+ * 파이프라인 매니페스트(JSON Lines)를 따라가며 완료된 배치 정보를 순서대로 반환하는 함수
+ * Python 처리 단계가 배치를 완료할 때마다 한 줄씩 추가하며, {"done": true} 줄을 만나면 종료합니다.
+ */
+async function* followManifest(filePath: string, pollInterval: number = 500): AsyncGenerator<any> {
+  let offset = 0;
+  let pending = '';
+
+  while (true) {
+    // 새로 추가된 내용만 읽기
+    const content = fs.existsSync(filePath) ? fs.readFileSync(filePath) : Buffer.alloc(0);
+    if (content.length > offset) {
+      pending += content.subarray(offset).toString('utf-8');
+      offset = content.length;
+
+      // 완전한 줄만 처리하고 마지막 미완성 줄은 다음 읽기로 넘김
+      const lines = pending.split('\n');
+      pending = lines.pop() || '';
+
+      for (const line of lines) {
+        if (!line.trim()) {
+          continue;
+        }
+        const entry = JSON.parse(line);
+        if (entry.done) {
+          return;
+        }
+        yield entry;
+      }
+    }
+
+    await new Promise(resolve => setTimeout(resolve, pollInterval));
+  }
+}
+
+/**
+ * 파일 하나를 풀의 비어 있는 페이지에서 렌더링하는 함수
+ * 실패한 파일은 렌더링 완료로 기록하지 않으므로 --resume 실행 시 다시 렌더링됩니다.
+ * @param pool 렌더링 페이지 풀
+ * @param batch 배치 메타데이터
+ * @param processedFile 배치 결과 파일 항목
+ */
+async function renderFile(pool: MiricanvasPagePool, batch: any, processedFile: any): Promise<void> {
+  const renderKey = `${batch.json_path}#${processedFile.file}`;
+  
+  try {
+    await pool.run(miriPage => miriPage.processXmlString(
+      processedFile.positive_xml, 
+      processedFile.negative_xml, 
+      processedFile.page_idx
+    ));
+    recordRendered(outputPath, renderKey);
+  } catch (error) {
+    console.error(`파일 ${processedFile.file} 렌더링 중 오류 발생:`, error);
+  }
+}
+
+/**
+ * 배치 하나를 처리하는 함수
+ * 페이지 풀 크기만큼의 파일을 동시에 렌더링하며, 브라우저와 로그인된 페이지는 배치 간에 재사용합니다.
+ * @param batch 배치 메타데이터 (batch_idx, file_count, json_path)
+ * @param pool 렌더링 페이지 풀
+ * @param totalBatches 전체 배치 수 (파이프라인 모드에서는 알 수 없음)
+ */
+async function processBatch(batch: any, pool: MiricanvasPagePool, totalBatches?: number): Promise<void> {
+  const batchLabel = totalBatches ? `${batch.batch_idx + 1}/${totalBatches}` : `${batch.batch_idx + 1}`;
+  console.log(`배치 ${batchLabel} 처리 시작 (${batch.file_count}개 파일)`);
+  
+  // 렌더링 중인 파일 작업 (최대 페이지 풀 크기만큼 유지)
+  const inFlight = new Set<Promise<void>>();
+  
+  try {
+    // 배치 내 각 파일 처리
+    for await (const processedFile of readBatchFiles(batch)) {
+      // 배치 파일과 파일명으로 렌더링 완료 여부 확인 (재실행 시 건너뜀)
+      const renderKey = `${batch.json_path}#${processedFile.file}`;
+      if (renderedKeys.has(renderKey)) {
+        console.log(`이미 렌더링된 파일을 건너뜁니다: ${processedFile.file}`);
+        continue;
+      }
+        
+      // 배치 파일 밖(sidecar 파일, zstd 아카이브)에 저장된 XML은 렌더링 직전에 읽어옴
+      try {
+        await loadStoredXml(batch.json_path, processedFile);
+      } catch (error) {
+        console.error(`파일 ${processedFile.file}의 XML을 읽는 중 오류 발생:`, error);
+        continue;
+      }
+        
+      // XML 문자열 직접 사용
+      if (!processedFile.positive_xml || !processedFile.negative_xml) {
+        console.warn(`경고: ${processedFile.file}에 XML 문자열이 없습니다.`);
+        continue;
+      }
+      
+      // 비어 있는 페이지가 없으면 렌더링 중인 파일 하나가 끝날 때까지 대기
+      if (inFlight.size >= pool.getSize()) {
+        await Promise.race(inFlight);
+      }
+      
+      console.log(`파일 처리 중: ${processedFile.file} (번호: ${processedFile.page_idx})`);
+      const task: Promise<void> = renderFile(pool, batch, processedFile).finally(() => {
+        inFlight.delete(task);
+      });
+      inFlight.add(task);
+    }
+    
+    // 남은 렌더링 작업 완료 대기
+    await Promise.all(inFlight);
+    
+    console.log(`배치 ${batch.batch_idx + 1} 처리 완료`);
+  } catch (error) {
+    // 이미 시작한 렌더링 작업은 끝까지 기다린 뒤 오류 출력
+    await Promise.all(inFlight);
+    console.error(`배치 ${batch.batch_idx + 1} 처리 중 오류 발생:`, error);
+  }
+}
+
 /**
  * 메인 함수 - 앱 실행 시작점
  */
@@ -56,81 +270,70 @@ async function main() {
   console.log('미리캔버스 스테이징 환경 접속 및 XML 처리를 시작합니다.');
   
   // 명령줄 인자 확인
-  if (!dataFilePath || !outputPath) {
-    console.error('오류: --data 및 --output 인자가 필요합니다.');
+  if ((!dataFilePath && !manifestPath) || !outputPath) {
+    console.error('오류: --data(또는 --manifest) 및 --output 인자가 필요합니다.');
     console.log('사용법: node app.js --data <xml_results.json 경로> --output <출력 디렉토리>');
+    console.log('        node app.js --manifest <batches_manifest.jsonl 경로> --output <출력 디렉토리>');
     process.exit(1);
   }
   
-  console.log(`데이터 파일: ${dataFilePath}`);
+  console.log(manifestPath ? `매니페스트 파일: ${manifestPath}` : `데이터 파일: ${dataFilePath}`);
   console.log(`출력 디렉토리: ${outputPath}`);
   
   // 출력 경로를 환경 변수로 설정
   process.env.OUTPUT_DIR = outputPath;
   
-  // 데이터 로드
-  let data;
+  // 이미지 저장 옵션 확인 (브라우저를 시작하기 전에 잘못된 설정 확인)
+  try {
+    const imageOptions = getImageOptions();
+    console.log(`이미지 형식: ${imageOptions.format}, 배율: ${imageOptions.scale}`);
+  } catch (error) {
+    console.error('이미지 저장 옵션 오류:', error);
+    process.exit(1);
+  }
+  
+  // 렌더링 완료 기록 로드 (--resume이 없으면 초기화)
+  loadRenderCheckpoint(outputPath, resume);
+  
+  // 로그인된 페이지 풀 (첫 번째 렌더링 시 브라우저를 시작하고 모든 배치에서 재사용)
+  const pool = new MiricanvasPagePool(poolSize);
+  console.log(`렌더링 페이지 수: ${pool.getSize()}`);
+  
   try {
-    data = loadJsonFile(dataFilePath);
+    // 파이프라인 모드: Python 처리 단계가 완료한 배치부터 바로 처리
+    if (manifestPath) {
+      for await (const batch of followManifest(manifestPath)) {
+        await processBatch(batch, pool);
+      }
     
-    // 배치 메타데이터 확인
-    if (!data.batches || !Array.isArray(data.batches)) {
-      throw new Error('배치 메타데이터 형식이 올바르지 않습니다. batches 배열이 필요합니다.');
+      console.log('모든 배치 처리가 완료되었습니다.');
+      return;
+    }
+  
+    // 데이터 로드
+    let data;
+    try {
+      data = loadJsonFile(dataFilePath);
+    
+      // 배치 메타데이터 확인
+      if (!data.batches || !Array.isArray(data.batches)) {
+        throw new Error('배치 메타데이터 형식이 올바르지 않습니다. batches 배열이 필요합니다.');
+      }
+    } catch (error) {
+      console.error('데이터 로드 실패:', error);
+      process.exitCode = 1;
+      return;
     }
     
     // 각 배치 처리
     for (const batch of data.batches) {
-      console.log(`배치 ${batch.batch_idx + 1}/${data.total_batches} 처리 시작 (${batch.file_count}개 파일)`);
-      
-      try {
-        // 배치 데이터 로드
-        const batchData = loadJsonFile(batch.json_path);
-        console.log(`배치 데이터 로드 완료: ${batchData.processed_files.length}개 파일`);
-        
-        // 브라우저 시작 (배치당 한 번만)
-        const browser = new MiricanvasBrowser();
-        try {
-          // 브라우저 시작 및 페이지 로드
-          // True : 백그라운드 실행
-          // False : 화면 실행
-          const page = await browser.launch();
-          
-          // 페이지 로드 확인
-          console.log('페이지 타이틀:', await page.title());
-          
-          // MiricanvasPage 인스턴스 생성
-          const miriPage = new MiricanvasPage(page);
-          
-          // 배치 내 각 파일 처리
-          for (const processedFile of batchData.processed_files) {
-            console.log(`파일 처리 중: ${processedFile.file} (번호: ${processedFile.page_idx})`);
-            
-            // XML 문자열 직접 사용
-            if (processedFile.positive_xml && processedFile.negative_xml) {
-              await miriPage.processXmlString(
-                processedFile.positive_xml, 
-                processedFile.negative_xml, 
-                processedFile.page_idx
-              );
-            } else {
-              console.warn(`경고: ${processedFile.file}에 XML 문자열이 없습니다.`);
-            }
-          }
-          
-          console.log(`배치 ${batch.batch_idx + 1} 처리 완료`);
-        } finally {
-          // 브라우저 종료
-          await browser.close();
-        }
-      } catch (error) {
-        console.error(`배치 ${batch.batch_idx + 1} 처리 중 오류 발생:`, error);
-      }
+      await processBatch(batch, pool, data.total_batches);
     }
     
     console.log('모든 배치 처리가 완료되었습니다.');
-  } catch (error) {
-    console.error('데이터 로드 실패:', error);
-    process.exit(1);
+  } finally {
+    // 브라우저 종료
+    await pool.close();
   }
 }
 
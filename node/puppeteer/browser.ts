@@ -87,6 +87,34 @@ export class MiricanvasBrowser {
     return this.page;
   }
 
+  /**
+   * 로그인된 브라우저 세션에서 새 페이지를 열고 스테이징 환경에 접속합니다.
+   * launch()로 로그인한 뒤에 호출해야 하며, 로그인 쿠키를 공유하므로 다시 로그인하지 않습니다.
+   * @returns 생성된 페이지 객체
+   */
+  async newPage(): Promise<Page> {
+    if (!this.browser) {
+      throw new Error('브라우저가 시작되지 않았습니다.');
+    }
+    if (!process.env.STAGING7_URL) {
+      throw new Error('STAGING7_URL이 설정되지 않았습니다.');
+    }
+    
+    const page = await this.browser.newPage();
+    page.setDefaultNavigationTimeout(60000);
+    await page.goto(process.env.STAGING7_URL, {
+      waitUntil: 'domcontentloaded'
+    });
+    
+    return page;
+  }
+
+  /**
+   * 브라우저 연결 상태를 반환합니다.
+   */
+  isConnected(): boolean {
+    return !!this.browser && this.browser.connected;
+  }
   
   /**
    * 현재 페이지 객체를 반환합니다.
@@ -1,6 +1,7 @@
 import { Page } from 'puppeteer';
 import * as fs from 'fs';
 import * as path from 'path';
+import { once } from 'events';
 
 /**
  * 미리캔버스 전역 함수 타입 선언
@@ -10,9 +11,60 @@ declare global {
     loadSheetByXmlString: (xmlString: string) => Promise<void>;
     renderPage: (options: PageRenderingOptions) => Promise<string>;
     exportPageSheetXmlString: (options: PageExportOptions) => string;
+    // 렌더링된 이미지의 base64 데이터 (Node.js로 나누어 가져간 뒤 삭제)
+    __renderedImage?: string;
   }
 }
 
+/**
+ * 지원하는 이미지 형식별 MIME 타입과 파일 확장자
+ */
+export const IMAGE_FORMATS: { [format: string]: { mimeType: string; extension: string } } = {
+  png: { mimeType: 'image/png', extension: 'png' },
+  jpeg: { mimeType: 'image/jpeg', extension: 'jpg' },
+  webp: { mimeType: 'image/webp', extension: 'webp' }
+};
+
+/**
+ * 브라우저에서 한 번에 가져올 이미지 base64 문자열 길이 (4의 배수, 약 768KB의 이미지 데이터)
+ */
+const IMAGE_CHUNK_SIZE = 1024 * 1024;
+
+/**
+ * 이미지 저장 옵션 인터페이스
+ */
+interface ImageOptions {
+  /**
+   * 이미지 형식 (png, jpeg, webp)
+   * @default "png"
+   */
+  format: string;
+  
+  /**
+   * 디자인 크기(sheet size)의 배율
+   * @default 1
+   */
+  scale: number;
+}
+
+/**
+ * 환경 변수(IMAGE_FORMAT, IMAGE_SCALE)에서 이미지 저장 옵션을 읽어옵니다.
+ * main.py의 --image-format, --image-scale 또는 app.js의 같은 이름의 인자로 설정됩니다.
+ */
+export function getImageOptions(): ImageOptions {
+  const format = (process.env.IMAGE_FORMAT || 'png').toLowerCase();
+  if (!IMAGE_FORMATS[format]) {
+    throw new Error(`지원하지 않는 이미지 형식입니다: ${format} (사용 가능: ${Object.keys(IMAGE_FORMATS).join(', ')})`);
+  }
+  
+  const scale = parseFloat(process.env.IMAGE_SCALE || '1');
+  if (!(scale > 0)) {
+    throw new Error(`이미지 배율은 0보다 커야 합니다: ${process.env.IMAGE_SCALE}`);
+  }
+  
+  return { format, scale };
+}
+
 /**
  * 페이지 렌더링 옵션 인터페이스
  */
@@ -239,33 +291,131 @@ async processXmlString(positiveXml: string, negativeXml: string, pageIdx: string
   
   /**
    * 현재 로드된 XML을 렌더링하고 이미지로 저장합니다
+   * 렌더링 결과는 브라우저에 보관한 채 나누어 가져오며, 가져온 조각을 바로 파일에 씁니다.
    * 
    * @param pageIdx 페이지 인덱스
    * @param type 이미지 타입 (positive 또는 negative)
    */
   async renderAndSaveImage(pageIdx: string, type: string): Promise<void> {
+    const imageOptions = getImageOptions();
+    const { mimeType, extension } = IMAGE_FORMATS[imageOptions.format];
+    
     // 렌더링 옵션
     const renderOptions: PageRenderingOptions = { 
-      scale: 1, 
+      scale: imageOptions.scale, 
       backgroundOpacityType: 'ONLY_WHITE' 
     };
     
-    // renderXmlString 메서드를 활용하여 페이지 렌더링
-    const imageDataUrl = await this.renderXmlString(renderOptions);
-    
     // 이미지 저장 경로 - XML 파일과 동일한 폴더에 저장 (파일명 앞에 페이지 인덱스 추가)
     const outputDir = process.env.OUTPUT_DIR || './output';
     const resultDir = path.join(outputDir, 'result', pageIdx);
-    const imagePath = path.join(resultDir, `${pageIdx}_${type}.png`);
+    const imagePath = path.join(resultDir, `${pageIdx}_${type}.${extension}`);
     
     // 디렉토리 생성
-    fs.mkdirSync(resultDir, { recursive: true });
+    await fs.promises.mkdir(resultDir, { recursive: true });
+    
+    // 브라우저에서 렌더링한 뒤 이미지 저장
+    const base64Length = await this.renderImage(renderOptions, mimeType);
+    const byteLength = await this.pullImage(imagePath, base64Length);
     
-    // 이미지 저장
-    const base64Data = imageDataUrl.replace(/^data:image\/png;base64,/, '');
-    fs.writeFileSync(imagePath, Buffer.from(base64Data, 'base64'));
+    console.log(`이미지 저장 완료: ${imagePath} (${byteLength} bytes)`);
+  }
+
+  /**
+   * 페이지를 렌더링하고 결과 이미지를 브라우저에 보관합니다 (window.__renderedImage).
+   * 렌더링 결과가 요청한 형식과 다르면 브라우저의 캔버스에서 변환합니다.
+   * @param options 렌더링 옵션
+   * @param mimeType 저장할 이미지의 MIME 타입
+   * @returns 보관한 이미지의 base64 문자열 길이
+   */
+  private async renderImage(options: PageRenderingOptions, mimeType: string): Promise<number> {
+    return await this.page.evaluate(async (opts, type) => {
+      if (typeof window.renderPage !== 'function') {
+        throw new Error('renderPage 함수를 찾을 수 없음');
+      }
+      let dataUrl = await window.renderPage(opts);
+      
+      if (!dataUrl.startsWith(`data:${type};`)) {
+        const image = new Image();
+        await new Promise((resolve, reject) => {
+          image.onload = resolve;
+          image.onerror = () => reject(new Error('렌더링 이미지를 불러올 수 없음'));
+          image.src = dataUrl;
+        });
+        
+        const canvas = document.createElement('canvas');
+        canvas.width = image.naturalWidth;
+        canvas.height = image.naturalHeight;
+        const context = canvas.getContext('2d');
+        if (!context) {
+          throw new Error('이미지 변환용 캔버스를 만들 수 없음');
+        }
+        // JPEG는 투명도를 지원하지 않으므로 흰색 배경 위에 그림
+        if (type === 'image/jpeg') {
+          context.fillStyle = '#ffffff';
+          context.fillRect(0, 0, canvas.width, canvas.height);
+        }
+        context.drawImage(image, 0, 0);
+        dataUrl = canvas.toDataURL(type);
+        
+        // 브라우저가 지원하지 않는 형식이면 PNG로 변환되므로 오류 처리
+        if (!dataUrl.startsWith(`data:${type};`)) {
+          throw new Error(`브라우저가 ${type} 형식을 지원하지 않음`);
+        }
+      }
+      
+      window.__renderedImage = dataUrl.slice(dataUrl.indexOf(',') + 1);
+      return window.__renderedImage.length;
+    }, options, mimeType);
+  }
+
+  /**
+   * 브라우저에 보관한 이미지를 나누어 가져와 파일에 씁니다.
+   * 임시 파일에 쓴 뒤 이름을 바꾸므로 중단되어도 불완전한 이미지가 남지 않습니다.
+   * @param imagePath 이미지 저장 경로
+   * @param base64Length 보관한 이미지의 base64 문자열 길이
+   * @returns 저장한 이미지 크기 (bytes)
+   */
+  private async pullImage(imagePath: string, base64Length: number): Promise<number> {
+    const tempPath = `${imagePath}.tmp`;
+    const stream = fs.createWriteStream(tempPath);
+    const finished = new Promise<void>((resolve, reject) => {
+      stream.once('finish', resolve);
+      stream.once('error', reject);
+    });
+    // 쓰기 오류는 다음 대기 시점에 처리
+    finished.catch(() => undefined);
     
-    console.log(`이미지 저장 완료: ${imagePath}`);
+    let byteLength = 0;
+    try {
+      for (let start = 0; start < base64Length; start += IMAGE_CHUNK_SIZE) {
+        const chunk = await this.page.evaluate((from, to) => {
+          return (window.__renderedImage || '').slice(from, to);
+        }, start, start + IMAGE_CHUNK_SIZE);
+        
+        const buffer = Buffer.from(chunk, 'base64');
+        byteLength += buffer.length;
+        
+        // 쓰기 버퍼가 가득 차면 비워질 때까지 대기
+        if (!stream.write(buffer)) {
+          await Promise.race([once(stream, 'drain'), finished]);
+        }
+      }
+      
+      stream.end();
+      await finished;
+      await fs.promises.rename(tempPath, imagePath);
+      return byteLength;
+    } catch (error) {
+      stream.destroy();
+      await fs.promises.rm(tempPath, { force: true });
+      throw error;
+    } finally {
+      // 브라우저에 보관한 이미지 삭제 (페이지가 충돌한 경우 무시)
+      await this.page.evaluate(() => {
+        delete window.__renderedImage;
+      }).catch(() => undefined);
+    }
   }
 
   /**
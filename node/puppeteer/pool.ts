@@ -0,0 +1,249 @@
+import { Page } from 'puppeteer';
+import { MiricanvasBrowser } from './browser';
+import { MiricanvasPage } from './page';
+
+/**
+ * 풀에서 관리하는 페이지 항목
+ */
+interface PooledPage {
+  id: number;
+  // 페이지를 만든 브라우저 세대 (브라우저를 다시 시작하면 증가)
+  generation: number;
+  page: Page;
+  miriPage: MiricanvasPage;
+  // 페이지 충돌(crash) 또는 닫힘 여부 (반환 시 새 페이지로 교체)
+  broken: boolean;
+}
+
+/**
+ * 브라우저/페이지 충돌로 판단하는 오류 메시지
+ */
+const CRASH_MESSAGES = ['Target closed', 'Session closed', 'Page crashed', 'Protocol error', 'detached', 'Connection closed'];
+
+/**
+ * 로그인된 미리캔버스 페이지를 여러 개 유지하며 배치 간에 재사용하는 페이지 풀
+ * - 브라우저는 한 번만 시작하고 로그인하며, 나머지 페이지는 같은 브라우저 세션(쿠키)을 공유합니다.
+ * - run()으로 실행한 작업은 비어 있는 페이지에서 동시에 처리됩니다 (최대 size개).
+ * - 충돌하거나 닫힌 페이지는 새 페이지로 교체하고, 브라우저 연결이 끊어지면 브라우저를 다시 시작합니다.
+ */
+export class MiricanvasPagePool {
+  private size: number;
+  private browser: MiricanvasBrowser | null = null;
+  private pages: PooledPage[] = [];
+  private idle: PooledPage[] = [];
+  private waiters: ((entry: PooledPage) => void)[] = [];
+  private nextId = 0;
+  private generation = 0;
+  private starting: Promise<void> | null = null;
+  private restarting: Promise<void> | null = null;
+
+  /**
+   * @param size 동시에 렌더링할 페이지 수 (최소 1)
+   */
+  constructor(size: number) {
+    this.size = Math.max(1, Math.floor(size) || 1);
+  }
+
+  /**
+   * 풀 크기를 반환합니다.
+   */
+  getSize(): number {
+    return this.size;
+  }
+
+  /**
+   * 브라우저를 시작하고 로그인한 뒤 풀 크기만큼 페이지를 준비합니다 (여러 번 호출해도 한 번만 실행).
+   */
+  async start(): Promise<void> {
+    if (!this.starting) {
+      this.starting = this.launch();
+    }
+    await this.starting;
+  }
+
+  /**
+   * 브라우저를 시작하고 페이지를 생성합니다.
+   * @private
+   */
+  private async launch(): Promise<void> {
+    this.browser = new MiricanvasBrowser();
+
+    // 첫 번째 페이지에서 로그인 수행
+    const firstPage = await this.browser.launch();
+    console.log('페이지 타이틀:', await firstPage.title());
+    this.addPage(firstPage);
+
+    // 나머지 페이지는 로그인된 세션을 공유하므로 동시에 생성
+    const extraPages = await Promise.all(
+      Array.from({ length: this.size - 1 }, () => this.browser!.newPage())
+    );
+    for (const page of extraPages) {
+      this.addPage(page);
+    }
+
+    console.log(`렌더링 페이지 풀 준비 완료 (${this.size}개 페이지)`);
+  }
+
+  /**
+   * 페이지를 풀에 추가하고 비어 있는 페이지로 등록합니다.
+   * @private
+   */
+  private addPage(page: Page): void {
+    const entry: PooledPage = {
+      id: this.nextId++,
+      generation: this.generation,
+      page,
+      miriPage: new MiricanvasPage(page),
+      broken: false
+    };
+
+    // 페이지 충돌 시 반환될 때 교체하도록 표시
+    page.on('error', (error) => {
+      console.error(`렌더링 페이지 ${entry.id} 충돌:`, error);
+      entry.broken = true;
+    });
+    page.on('close', () => {
+      entry.broken = true;
+    });
+
+    this.pages.push(entry);
+    this.handOver(entry);
+  }
+
+  /**
+   * 비어 있는 페이지를 기다리는 작업에 넘기거나, 없으면 비어 있는 페이지 목록에 추가합니다.
+   * @private
+   */
+  private handOver(entry: PooledPage): void {
+    const waiter = this.waiters.shift();
+    if (waiter) {
+      waiter(entry);
+    } else {
+      this.idle.push(entry);
+    }
+  }
+
+  /**
+   * 비어 있는 페이지를 얻습니다 (없으면 반환될 때까지 대기).
+   * @private
+   */
+  private acquire(): Promise<PooledPage> {
+    const entry = this.idle.shift();
+    if (entry) {
+      return Promise.resolve(entry);
+    }
+    return new Promise(resolve => this.waiters.push(resolve));
+  }
+
+  /**
+   * 사용한 페이지를 반환합니다. 충돌한 페이지는 새 페이지로 교체한 뒤 반환합니다.
+   * @private
+   */
+  private async release(entry: PooledPage): Promise<void> {
+    if (!entry.broken && !entry.page.isClosed()) {
+      this.handOver(entry);
+      return;
+    }
+
+    this.pages = this.pages.filter(pooled => pooled !== entry);
+
+    // 다시 시작하기 전 브라우저의 페이지는 교체하지 않고 버림 (새 브라우저에서 풀 크기만큼 생성됨)
+    if (entry.generation !== this.generation) {
+      return;
+    }
+
+    try {
+      await this.recycle(entry);
+    } catch (error) {
+      console.error(`렌더링 페이지 ${entry.id} 교체 중 오류 발생:`, error);
+      // 교체에 실패해도 풀 크기를 유지하도록 다음 사용 시 다시 교체
+      entry.generation = this.generation;
+      this.pages.push(entry);
+      this.handOver(entry);
+    }
+  }
+
+  /**
+   * 충돌한 페이지를 닫고 새 페이지를 추가합니다. 브라우저 연결이 끊어진 경우 브라우저를 다시 시작합니다.
+   * @private
+   */
+  private async recycle(entry: PooledPage): Promise<void> {
+    if (!entry.page.isClosed()) {
+      await entry.page.close().catch(() => undefined);
+    }
+
+    if (!this.browser || !this.browser.isConnected()) {
+      await this.restartBrowser();
+      return;
+    }
+
+    console.log(`렌더링 페이지 ${entry.id}를 새 페이지로 교체합니다.`);
+    this.addPage(await this.browser.newPage());
+  }
+
+  /**
+   * 브라우저를 다시 시작하고 다시 로그인합니다 (동시에 여러 페이지가 요청해도 한 번만 실행).
+   * 이전 브라우저의 페이지는 모두 충돌한 것으로 표시되어 반환될 때 버려집니다.
+   * @private
+   */
+  private async restartBrowser(): Promise<void> {
+    if (!this.restarting) {
+      this.restarting = (async () => {
+        console.warn('브라우저 연결이 끊어져 브라우저를 다시 시작합니다.');
+        const previous = this.browser;
+        const previousPages = this.pages;
+        this.pages = [];
+        this.idle = [];
+        for (const pooled of previousPages) {
+          pooled.broken = true;
+        }
+        this.generation++;
+        if (previous) {
+          await previous.close().catch(() => undefined);
+        }
+        await this.launch();
+      })().finally(() => {
+        this.restarting = null;
+      });
+    }
+    await this.restarting;
+  }
+
+  /**
+   * 비어 있는 페이지에서 작업을 실행합니다.
+   * 브라우저/페이지 충돌로 실패한 경우 페이지를 교체하고 오류를 다시 발생시킵니다.
+   * @param task 페이지를 받아 실행할 작업
+   * @returns 작업 결과
+   */
+  async run<T>(task: (miriPage: MiricanvasPage) => Promise<T>): Promise<T> {
+    await this.start();
+    const entry = await this.acquire();
+    try {
+      return await task(entry.miriPage);
+    } catch (error) {
+      const message = String(error instanceof Error ? error.message : error);
+      if (CRASH_MESSAGES.some(crashMessage => message.includes(crashMessage))) {
+        entry.broken = true;
+      }
+      throw error;
+    } finally {
+      await this.release(entry);
+    }
+  }
+
+  /**
+   * 브라우저와 모든 페이지를 종료합니다.
+   */
+  async close(): Promise<void> {
+    if (this.starting) {
+      await this.starting.catch(() => undefined);
+    }
+    if (this.browser) {
+      await this.browser.close();
+      this.browser = null;
+    }
+    this.pages = [];
+    this.idle = [];
+    this.starting = null;
+  }
+}
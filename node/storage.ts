@@ -0,0 +1,95 @@
+import * as fs from 'fs';
+import * as path from 'path';
+import * as zlib from 'zlib';
+
+/**
+ * 배치 파일 밖에 저장된 XML 문서의 참조
+ * - sidecar: path (sidecar 디렉토리 기준 파일명)
+ * - zstd: offset, length (아카이브 내 압축 프레임 위치), size (원본 크기)
+ */
+interface XmlRef {
+  path?: string;
+  offset?: number;
+  length?: number;
+  size?: number;
+}
+
+/**
+ * Node.js 22.15 이상에서 제공하는 zlib의 zstd 압축 해제 함수
+ * (package-lock의 @types/node 22.13에는 타입 정의가 없어 선택 속성으로 선언)
+ */
+type ZstdZlib = typeof zlib & { zstdDecompressSync?: (buffer: Buffer) => Buffer };
+
+/**
+ * 렌더링에 사용하는 variant와 배치 파일 항목의 XML 문자열 키
+ */
+const RENDER_VARIANTS: { [variant: string]: string } = {
+  positive: 'positive_xml',
+  negative: 'negative_xml'
+};
+
+/**
+ * 배치 파일에 대응하는 XML 저장 위치를 반환합니다 (python/services/xml_storage.py의 storage_paths와 동일).
+ * @param batchJsonPath 배치 파일 경로
+ */
+function storagePaths(batchJsonPath: string): { sidecarDir: string; archivePath: string } {
+  const stem = batchJsonPath.replace(/\.jsonl?$/, '');
+  return { sidecarDir: `${stem}_xml`, archivePath: `${stem}.xml.zst` };
+}
+
+/**
+ * 참조한 XML 문서 하나를 읽어옵니다.
+ * zstd 아카이브는 문서마다 독립된 프레임이므로 해당 위치만 읽어 압축을 해제합니다.
+ * @param batchJsonPath 배치 파일 경로
+ * @param storage 저장 방식 (sidecar 또는 zstd)
+ * @param ref XML 문서 참조
+ */
+async function readXmlRef(batchJsonPath: string, storage: string, ref: XmlRef): Promise<string> {
+  const { sidecarDir, archivePath } = storagePaths(batchJsonPath);
+
+  if (storage === 'sidecar') {
+    return fs.promises.readFile(path.join(sidecarDir, ref.path as string), 'utf-8');
+  }
+
+  if (storage === 'zstd') {
+    // Node.js 22.15 이상에서 제공하는 zstd 압축 해제 사용 (추가 의존성 없음)
+    const { zstdDecompressSync } = zlib as ZstdZlib;
+    if (!zstdDecompressSync) {
+      throw new Error(`zstd 압축 해제를 지원하지 않는 Node.js 버전입니다 (${process.version}, 22.15 이상 필요). sidecar 저장 방식을 사용하세요.`);
+    }
+
+    const length = ref.length as number;
+    const frame = Buffer.alloc(length);
+    const handle = await fs.promises.open(archivePath, 'r');
+    try {
+      const { bytesRead } = await handle.read(frame, 0, length, ref.offset as number);
+      if (bytesRead !== length) {
+        throw new Error(`zstd 아카이브가 손상되었습니다: ${archivePath}`);
+      }
+    } finally {
+      await handle.close();
+    }
+    return zstdDecompressSync(frame).toString('utf-8');
+  }
+
+  throw new Error(`지원하지 않는 XML 저장 방식입니다: ${storage}`);
+}
+
+/**
+ * 배치 파일 밖(sidecar 파일, zstd 아카이브)에 저장된 positive/negative XML을 읽어 항목에 채웁니다.
+ * XML 문자열이 배치 파일에 포함된 항목(inline)은 그대로 둡니다.
+ * @param batchJsonPath 항목이 기록된 배치 파일 경로
+ * @param processedFile 배치 결과 항목
+ */
+export async function loadStoredXml(batchJsonPath: string, processedFile: any): Promise<void> {
+  if (!processedFile.xml_storage || !processedFile.xml_refs) {
+    return;
+  }
+
+  for (const [variant, key] of Object.entries(RENDER_VARIANTS)) {
+    const ref = processedFile.xml_refs[variant];
+    if (ref) {
+      processedFile[key] = await readXmlRef(batchJsonPath, processedFile.xml_storage, ref);
+    }
+  }
+}
@@ -20,7 +20,7 @@ setup(
     author='',
     author_email='',
     url='https://github.com/yourusername/ailabs-llm-xml-transformer',
-    packages=find_packages(exclude=['tests*']),
+    packages=find_packages(exclude=['tests*', 'benchmarks*']),
     include_package_data=True,
     install_requires=requirements,
     entry_points={
@@ -1,6 +1,5 @@
 import os
 import json
-from dotenv import load_dotenv
 
 # 환경 변수 로드 함수
 def load_environment_variables():
@@ -18,8 +17,10 @@ def load_environment_variables():
     if not os.path.exists(dotenv_path):
         return {"success": False, "message": "환경 변수 파일을 찾을 수 없습니다."}
     
-    # .env 파일 로드
+    # .env 파일 로드 (python-dotenv는 실제로 로드할 때만 임포트)
     try:
+        from dotenv import load_dotenv
+        
         load_dotenv(dotenv_path=dotenv_path)
         
         # 필수 환경 변수 확인
@@ -54,5 +55,18 @@ def get_env(key, default=None):
     """
     return os.getenv(key, default)
 
-# 모듈 로드 시 자동으로 환경 변수 로드
-env_result = load_environment_variables()
\ No newline at end of file
+# 환경 변수 로드 결과 (load_env_result에서 처음 호출할 때 로드)
+env_result = None
+
+def load_env_result():
+    """
+    .env 파일을 한 번만 로드하고 결과를 반환하는 함수
+    LLM을 사용하지 않는 실행(텍스트 추출 전용 모드)에서는 호출하지 않습니다.
+    
+    Returns:
+        dict: load_environment_variables의 반환값
+    """
+    global env_result
+    if env_result is None:
+        env_result = load_environment_variables()
+    return env_result
\ No newline at end of file
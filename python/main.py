@@ -1,11 +1,21 @@
 import os
+import re
 import json
 import argparse
+import threading
 import subprocess
 from pathlib import Path
 
-from python.process import process
-from python.config import env_result
+from python.process import process, append_manifest
+from python.config import load_env_result
+from python.services.llm_backend import BACKEND_NAMES
+
+# Node.js 렌더러 프로젝트 디렉토리와 빌드된 스크립트 경로 (현재 스크립트의 경로 기준)
+NODE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "node")
+NODE_SCRIPT_PATH = os.path.join(NODE_DIR, "dist", "app.js")
+
+# zstd 저장 방식의 렌더링에 필요한 Node.js 최소 버전 (zlib.zstdDecompressSync)
+ZSTD_MIN_NODE_VERSION = (22, 15, 0)
 
 def main():
     # 디버깅 모드 확인
@@ -21,6 +31,35 @@ def main():
         parser = argparse.ArgumentParser(description='XML 변환 및 LLM 처리 도구')
         parser.add_argument('--input', '-i', required=True, help='입력 파일 또는 디렉토리 경로')
         parser.add_argument('--output', '-o', required=True, help='출력 디렉토리 경로')
+        parser.add_argument('--concurrency', '-c', type=int, default=None, help='동시에 처리할 LLM 요청 수 (기본값: 1)')
+        parser.add_argument('--max-retries', type=int, default=None, help='요청 제한/일시적인 오류 시 LLM 요청 하나의 최대 재시도 횟수 (기본값: 5)')
+        parser.add_argument('--latency-target', type=float, default=None, help='LLM 요청 목표 지연 시간(초), 초과 시 동시 요청 수를 줄임 (기본값: 0, 사용하지 않음)')
+        parser.add_argument('--llm-backend', choices=BACKEND_NAMES, default=None, help='process_text를 처리할 LLM 백엔드 (기본값: workflow)')
+        parser.add_argument('--llm-url', default=None, help='http 백엔드 요청 주소 (기본값: http://127.0.0.1:8765/process_text)')
+        parser.add_argument('--llm-record', default=None, help='record/replay 백엔드의 응답 기록(JSONL) 파일 경로')
+        parser.add_argument('--cache', default=None, help='LLM 응답 캐시(SQLite) 파일 경로')
+        parser.add_argument('--output-format', choices=['json', 'jsonl'], default=None, help='배치 결과 출력 형식 (기본값: json)')
+        parser.add_argument('--xml-storage', choices=['inline', 'sidecar', 'zstd'], default=None, help='생성된 XML 저장 방식 (inline: 배치 파일에 포함, sidecar: 별도 XML 파일, zstd: 배치별 압축 아카이브, 기본값: inline)')
+        parser.add_argument('--batch-policy', choices=['count', 'bytes', 'segments'], default=None, help='배치 구성 방식 (count: 파일 수, bytes: 파일 크기 합계, segments: 예상 텍스트 조각 수 합계, 기본값: count)')
+        parser.add_argument('--batch-weight', type=int, default=None, help='bytes/segments 배치 구성 방식의 배치당 최대 작업량 (기본값: 16MB 또는 텍스트 조각 1000개)')
+        parser.add_argument('--shard', default=None, help='여러 서버에 나누어 처리할 때 이 서버가 처리할 샤드 (i/N 형식, i는 0부터 시작, 예: 0/4)')
+        parser.add_argument('--parse-workers', type=int, default=None, help='XML 파싱/추출/직렬화를 처리할 프로세스 수 (기본값: 0)')
+        parser.add_argument('--parse-chunksize', type=int, default=None, help='프로세스 풀 작업 단위 크기 (기본값: 자동)')
+        parser.add_argument('--max-request-tokens', type=int, default=None, help='process_text 요청 하나의 최대 토큰 수 (기본값: 0, 나누지 않음)')
+        parser.add_argument('--dedup', action='store_true', help='배치 안에서 동일한 텍스트는 한 번만 LLM으로 처리')
+        parser.add_argument('--coalesce-chars', type=int, default=None, help='텍스트가 적은 페이지를 하나의 LLM 요청으로 묶을 때의 최대 글자 수 (기본값: 0, 묶지 않음)')
+        parser.add_argument('--streaming-extract', action='store_true', help='전체 XML 트리 대신 iterparse로 텍스트 추출 (대용량 XML 메모리 절약)')
+        parser.add_argument('--json-codec', choices=['json', 'orjson'], default=None, help='SIMPLE_TEXT TextBody JSON 처리에 사용할 코덱 (기본값: json)')
+        parser.add_argument('--serializer', choices=['tree', 'splice'], default=None, help='variant XML 직렬화 방식 (tree: ElementTree 전체 직렬화, splice: 원본에서 변경된 텍스트만 교체, 기본값: tree)')
+        parser.add_argument('--variants', default=None, help='positive/negative 외에 추가로 생성할 variant의 process_text 결과 키 (쉼표로 구분, 예: paraphrase)')
+        parser.add_argument('--prometheus-textfile', default=None, help='실행 보고서를 Prometheus textfile 형식으로 저장할 경로 (예: /var/lib/node_exporter/xml_transformer.prom)')
+        parser.add_argument('--log-processed-result', action='store_true', help='process_text 결과 전체를 로그에 출력 (기본값: 텍스트 개수만 출력)')
+        parser.add_argument('--extract-only', '--dry-run', action='store_true', help='LLM 호출과 Node.js 렌더링 없이 텍스트 추출 결과(segments.jsonl)만 저장')
+        parser.add_argument('--resume', action='store_true', help='이전 실행에서 완료된 파일은 건너뛰고 이어서 처리')
+        parser.add_argument('--pool-size', type=int, default=None, help='Node.js 렌더링 단계에서 동시에 사용할 로그인된 브라우저 페이지 수 (기본값: 1)')
+        parser.add_argument('--image-format', choices=['png', 'jpeg', 'webp'], default=None, help='Node.js 렌더링 단계에서 저장할 이미지 형식 (기본값: png)')
+        parser.add_argument('--image-scale', type=float, default=None, help='렌더링 이미지의 디자인 크기 대비 배율 (기본값: 1)')
+        parser.add_argument('--pipeline', action='store_true', help='Python 처리와 Node.js 렌더링을 배치 단위로 동시에 진행')
         
         # 명령줄 인자 파싱
         args = parser.parse_args()
@@ -28,12 +67,140 @@ def main():
         # 입력 및 출력 경로 설정
         input_path = os.path.abspath(args.input)
         output_path = os.path.abspath(args.output)
+        
+        # 동시 LLM 요청 수 설정 (process.py에서 사용)
+        if args.concurrency is not None:
+            os.environ['MAX_CONCURRENCY'] = str(args.concurrency)
+        
+        # LLM 요청 재시도 및 동시 요청 수 조절 설정 (process.py에서 사용)
+        if args.max_retries is not None:
+            os.environ['LLM_MAX_RETRIES'] = str(args.max_retries)
+        if args.latency_target is not None:
+            os.environ['LLM_LATENCY_TARGET'] = str(args.latency_target)
+        
+        # LLM 백엔드 설정 (llm_backend.py에서 사용)
+        if args.llm_backend:
+            os.environ['LLM_BACKEND'] = args.llm_backend
+        if args.llm_url:
+            os.environ['LLM_HTTP_URL'] = args.llm_url
+        if args.llm_record:
+            os.environ['LLM_RECORD_PATH'] = os.path.abspath(args.llm_record)
+        
+        # LLM 응답 캐시 경로 설정 (process.py에서 사용)
+        if args.cache:
+            os.environ['LLM_CACHE_PATH'] = os.path.abspath(args.cache)
+        
+        # 배치 결과 출력 형식 설정 (process.py에서 사용)
+        if args.output_format:
+            os.environ['OUTPUT_FORMAT'] = args.output_format
+        
+        # 생성된 XML 저장 방식 설정
+        if args.xml_storage:
+            os.environ['XML_STORAGE'] = args.xml_storage
+        
+        # 배치 구성 방식 설정
+        if args.batch_policy:
+            os.environ['BATCH_POLICY'] = args.batch_policy
+        if args.batch_weight is not None:
+            os.environ['BATCH_WEIGHT'] = str(args.batch_weight)
+        
+        # 샤드 설정 (입력 디렉토리 기준 상대 경로의 해시로 파일 선택)
+        if args.shard:
+            os.environ['SHARD'] = args.shard
+        
+        # 프로세스 풀 설정 (process.py에서 사용)
+        if args.parse_workers is not None:
+            os.environ['PARSE_WORKERS'] = str(args.parse_workers)
+        if args.parse_chunksize is not None:
+            os.environ['PARSE_CHUNKSIZE'] = str(args.parse_chunksize)
+        
+        # 요청당 최대 토큰 수 설정 (process.py에서 사용)
+        if args.max_request_tokens is not None:
+            os.environ['MAX_REQUEST_TOKENS'] = str(args.max_request_tokens)
+        
+        # 배치 단위 중복 텍스트 제거 설정 (process.py에서 사용)
+        if args.dedup:
+            os.environ['DEDUP_SEGMENTS'] = 'true'
+        
+        # 여러 페이지 요청 묶기 설정 (process.py에서 사용)
+        if args.coalesce_chars is not None:
+            os.environ['COALESCE_MAX_CHARS'] = str(args.coalesce_chars)
+        
+        # 스트리밍 텍스트 추출 설정 (process.py에서 사용)
+        if args.streaming_extract:
+            os.environ['STREAMING_EXTRACT'] = 'true'
+        
+        # TextBody JSON 코덱 설정 (xml_processor.py에서 사용)
+        if args.json_codec:
+            os.environ['JSON_CODEC'] = args.json_codec
+        
+        # XML 직렬화 방식 설정 (xml_processor.py에서 사용)
+        if args.serializer:
+            os.environ['SERIALIZER'] = args.serializer
+        
+        # 추가 variant 설정 (process.py에서 사용)
+        if args.variants:
+            os.environ['VARIANT_KEYS'] = args.variants
+        
+        # 실행 보고서 Prometheus 내보내기 설정 (process.py에서 사용)
+        if args.prometheus_textfile:
+            os.environ['PROMETHEUS_TEXTFILE'] = os.path.abspath(args.prometheus_textfile)
+        
+        # process_text 결과 로그 설정 (xml_processor.py에서 사용)
+        if args.log_processed_result:
+            os.environ['LOG_PROCESSED_RESULT'] = 'true'
+        
+        # 텍스트 추출 전용 모드 설정 (process.py에서 사용)
+        if args.extract_only:
+            os.environ['EXTRACT_ONLY'] = 'true'
+        
+        # 재실행 모드 설정 (process.py와 Node.js에서 사용)
+        if args.resume:
+            os.environ['RESUME'] = 'true'
+        
+        # 렌더링 페이지 풀 크기 설정 (Node.js에서 사용)
+        if args.pool_size is not None:
+            os.environ['RENDER_POOL_SIZE'] = str(args.pool_size)
+        
+        # 렌더링 이미지 형식/배율 설정 (Node.js에서 사용)
+        if args.image_format:
+            os.environ['IMAGE_FORMAT'] = args.image_format
+        if args.image_scale is not None:
+            os.environ['IMAGE_SCALE'] = str(args.image_scale)
+        
+        # 파이프라인 모드 설정
+        if args.pipeline:
+            os.environ['PIPELINE_MODE'] = 'true'
+    
+    # 텍스트 추출 전용 모드 확인 (LLM 스택과 .env를 로드하지 않음)
+    extract_only = os.environ.get('EXTRACT_ONLY', 'False').lower() == 'true'
+    
+    # workflow 백엔드를 사용하는 경우에만 .env(OPENAI_API_KEY)가 필요
+    llm_backend = os.environ.get('LLM_BACKEND', 'workflow').lower()
+    uses_workflow = llm_backend == 'workflow' or (
+        llm_backend == 'record' and os.environ.get('LLM_RECORD_SOURCE', 'workflow').lower() == 'workflow'
+    )
     
     # 환경 변수 로드 결과 확인
-    if not env_result.get("success", False):
-        print(f"오류: 환경 변수 로드 실패 - {env_result.get('message', '알 수 없는 오류')}")
+    if not extract_only and uses_workflow:
+        env_result = load_env_result()
+        if not env_result.get("success", False):
+            print(f"오류: 환경 변수 로드 실패 - {env_result.get('message', '알 수 없는 오류')}")
+            return
+    
+    # Python 처리를 마친 뒤 렌더링 단계에서 실패하지 않도록 Node.js 렌더러 빌드를 먼저 확인
+    if not extract_only and not ensure_node_build():
         return
     
+    # zstd 저장 방식은 Node.js 렌더러가 zstd 압축 해제를 지원하는지 처리 시작 전에 확인
+    if not extract_only and os.environ.get('XML_STORAGE', 'inline').lower() == 'zstd':
+        version = node_version()
+        if version is None or version < ZSTD_MIN_NODE_VERSION:
+            found = ".".join(str(part) for part in version) if version else "확인 불가"
+            print(f"오류: zstd 저장 방식의 렌더링에는 Node.js {'.'.join(str(part) for part in ZSTD_MIN_NODE_VERSION[:2])} 이상이 필요합니다 "
+                  f"(현재: {found}). --xml-storage sidecar를 사용하세요.")
+            return
+    
     # 환경 변수 설정 (process.py에서 사용)
     os.environ['INPUT_PATH'] = input_path
     os.environ['OUTPUT_PATH'] = output_path
@@ -45,49 +212,181 @@ def main():
     if not os.path.exists(output_path):
         os.makedirs(output_path)
     
-    # Python 처리 단계: XML 추출 및 처리
-    print("Python 처리 단계: XML 추출 및 처리 중...")
-    process()
+    if extract_only:
+        # 텍스트 추출 단계만 실행 (Node.js 렌더링 단계 없음)
+        print("텍스트 추출 전용 모드: LLM 호출과 Node.js 렌더링을 건너뜁니다.")
+        result = process()
+        if result and result.get("success"):
+            print(f"텍스트 추출이 완료되었습니다. 결과는 {result['segments_path']}에 저장되었습니다.")
+        return
+    
+    # 재실행 모드인 경우 Node.js 렌더러도 완료된 파일을 건너뛰도록 설정
+    resume = os.environ.get('RESUME', 'False').lower() == 'true'
+    resume_args = ["--resume"] if resume else []
+    
+    # 파이프라인 모드 확인 (Python 처리와 Node.js 렌더링을 배치 단위로 겹쳐서 실행)
+    pipeline_mode = os.environ.get('PIPELINE_MODE', 'False').lower() == 'true'
+    
+    if pipeline_mode:
+        # 배치가 완료될 때마다 한 줄씩 추가되는 매니페스트 파일 (process.py에서 사용)
+        manifest_path = os.path.join(output_path, "batches_manifest.jsonl")
+        os.environ['BATCH_MANIFEST_PATH'] = manifest_path
+        
+        # 이전 실행의 매니페스트를 비운 뒤 Node.js 렌더러를 먼저 시작
+        open(manifest_path, 'w', encoding='utf-8').close()
+        
+        print("파이프라인 모드: Node.js 렌더러가 완료된 배치부터 처리합니다.")
+        node_stage = start_node_stage(["--manifest", manifest_path, "--output", output_path] + resume_args)
+        if node_stage is None:
+            return
+        
+        # Python 처리 단계: XML 추출 및 처리
+        print("Python 처리 단계: XML 추출 및 처리 중...")
+        try:
+            process()
+        finally:
+            # 처리 결과와 관계없이 종료 표시를 기록하여 Node.js 렌더러가 종료될 수 있도록 함
+            append_manifest(manifest_path, {"done": True})
+        
+        if not wait_node_stage(node_stage):
+            return
+    else:
+        # Python 처리 단계: XML 추출 및 처리
+        print("Python 처리 단계: XML 추출 및 처리 중...")
+        process()
+        
+        # batches_meta.json 파일 경로
+        meta_json_path = os.path.join(output_path, "batches_meta.json")
+        
+        # Node.js 처리 단계
+        print("Node.js 처리 단계: 추출된 XML 데이터 처리 중...")
+        node_stage = start_node_stage(["--data", meta_json_path, "--output", output_path] + resume_args)
+        if node_stage is None or not wait_node_stage(node_stage):
+            return
+    
+    print(f"모든 처리가 완료되었습니다. 결과는 {output_path}에 저장되었습니다.")
+
+def node_version():
+    """
+    설치된 Node.js 버전을 반환합니다.
+    
+    Returns:
+        tuple: (major, minor, patch) 또는 확인할 수 없으면 None
+    """
+    try:
+        output = subprocess.run(["node", "--version"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+    match = re.match(r"v(\d+)\.(\d+)\.(\d+)", output)
+    return tuple(int(part) for part in match.groups()) if match else None
+
+def ensure_node_build():
+    """
+    Node.js 렌더러 빌드 결과(node/dist)가 없거나 TypeScript 소스보다 오래된 경우 npm run build로 빌드합니다.
     
-    # batches_meta.json 파일 경로
-    meta_json_path = os.path.join(output_path, "batches_meta.json")
+    Returns:
+        bool: 최신 빌드 결과를 사용할 수 있는지 여부
+    """
+    if os.path.exists(NODE_SCRIPT_PATH):
+        build_time = os.path.getmtime(NODE_SCRIPT_PATH)
+        sources_changed = False
+        for directory, subdirectories, files in os.walk(NODE_DIR):
+            subdirectories[:] = [name for name in subdirectories if name not in ("node_modules", "dist")]
+            if any(name.endswith(".ts") and os.path.getmtime(os.path.join(directory, name)) > build_time for name in files):
+                sources_changed = True
+                break
+        if not sources_changed:
+            return True
+        print("Node.js 렌더러 소스가 변경되어 다시 빌드합니다 (npm run build).")
+    else:
+        print("Node.js 렌더러 빌드 결과가 없어 빌드합니다 (npm run build).")
+    
+    try:
+        build = subprocess.run(["npm", "run", "build"], cwd=NODE_DIR, capture_output=True, text=True)
+    except Exception as e:
+        print(f"Node.js 렌더러 빌드 중 오류 발생: {e}")
+        return False
     
-    # Node.js 처리 단계
-    print("Node.js 처리 단계: 추출된 XML 데이터 처리 중...")
+    if build.returncode != 0:
+        print("Node.js 렌더러 빌드 실패 (node 디렉토리에서 npm install을 먼저 실행하세요):")
+        for line in (build.stdout + build.stderr).splitlines():
+            print(line.strip())
+        return False
+    return True
+
+def start_node_stage(node_args):
+    """
+    Node.js 렌더러를 시작하고 출력을 실시간으로 표시하는 스레드를 실행합니다.
     
-    # 현재 스크립트의 경로를 기준으로 Node.js 스크립트 경로 계산
-    current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    node_script_path = os.path.join(current_dir, "node", "dist", "app.js")
+    Args:
+        node_args (list): app.js에 전달할 명령줄 인자
+        
+    Returns:
+        tuple: (프로세스, 출력 스레드 리스트, 표준 오류 라인 리스트) 또는 실행 실패 시 None
+    """
+    # 빌드 결과(dist)는 저장소에 포함하지 않으므로 TypeScript 소스가 바뀌었으면 먼저 빌드
+    if not ensure_node_build():
+        return None
     
     # Node.js 스크립트 실행
     try:
         node_process = subprocess.Popen(
-            ["node", node_script_path, "--data", meta_json_path, "--output", output_path],
+            ["node", NODE_SCRIPT_PATH] + node_args,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True
         )
-        
+    except Exception as e:
+        print(f"Node.js 스크립트 실행 중 오류 발생: {e}")
+        return None
+    
+    # Python 처리와 동시에 실행될 수 있으므로 파이프가 가득 차지 않도록 별도 스레드에서 출력을 읽음
+    stderr_lines = []
+    
+    def forward_stdout():
         # 실시간으로 출력 표시
         for line in node_process.stdout:
             print(line.strip())
+    
+    def collect_stderr():
+        for line in node_process.stderr:
+            stderr_lines.append(line)
+    
+    threads = [
+        threading.Thread(target=forward_stdout, daemon=True),
+        threading.Thread(target=collect_stderr, daemon=True)
+    ]
+    for thread in threads:
+        thread.start()
+    
+    return node_process, threads, stderr_lines
+
+def wait_node_stage(node_stage):
+    """
+    Node.js 렌더러가 종료될 때까지 기다립니다.
+    
+    Args:
+        node_stage: start_node_stage의 반환값
         
-        # 프로세스 완료 대기
-        node_process.wait()
-        
-        # 오류 확인
-        if node_process.returncode != 0:
-            print("Node.js 처리 중 오류 발생:")
-            for line in node_process.stderr:
-                print(line.strip())
-            return
-        
-        print("Node.js 처리 완료")
-    except Exception as e:
-        print(f"Node.js 스크립트 실행 중 오류 발생: {e}")
-        return
+    Returns:
+        bool: 정상 종료 여부
+    """
+    node_process, threads, stderr_lines = node_stage
     
-    print(f"모든 처리가 완료되었습니다. 결과는 {output_path}에 저장되었습니다.")
+    # 프로세스 완료 대기
+    node_process.wait()
+    for thread in threads:
+        thread.join()
+    
+    # 오류 확인
+    if node_process.returncode != 0:
+        print("Node.js 처리 중 오류 발생:")
+        for line in stderr_lines:
+            print(line.strip())
+        return False
+    
+    print("Node.js 처리 완료")
+    return True
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,223 @@
+"""
+샤드별 출력 병합 도구 - 여러 서버에서 --shard i/N으로 나누어 처리한 출력 디렉토리를 하나로 합칩니다.
+샤드 순서대로 배치 인덱스를 다시 매겨 batch_{idx}.json(l)과 batches_meta.json을 만들며,
+병합된 출력은 Node.js 렌더링 단계와 후속 처리에서 단일 실행 결과와 같은 방식으로 사용할 수 있습니다.
+
+사용법:
+    python -m python.merge -o merged shard_0 shard_1 shard_2 shard_3
+    python -m python.merge -o merged shard_* --render
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+
+from python.services.xml_storage import storage_paths
+
+# 샤드 출력 디렉토리의 메타데이터 파일명
+META_FILE_NAME = "batches_meta.json"
+
+def load_shard_meta(shard_dir):
+    """
+    샤드 출력 디렉토리의 batches_meta.json을 로드합니다.
+    
+    Args:
+        shard_dir (str): 샤드 출력 디렉토리 경로
+    
+    Returns:
+        dict: 메타데이터 (로드 실패 시 None)
+    """
+    meta_path = os.path.join(shard_dir, META_FILE_NAME)
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"오류: 샤드 메타데이터를 읽을 수 없습니다: {meta_path} ({e})")
+        return None
+
+def order_shards(shards):
+    """
+    샤드 정보를 확인하고 샤드 번호 순서로 정렬합니다.
+    샤드 정보가 없는 출력(--shard 없이 실행)은 지정한 순서대로 뒤에 추가합니다.
+    
+    Args:
+        shards (list): (샤드 출력 디렉토리, 메타데이터) 리스트
+    
+    Returns:
+        tuple: (정렬된 샤드 리스트, 오류 메시지 또는 None)
+    """
+    sharded = [(shard_dir, meta) for shard_dir, meta in shards if meta.get("shard")]
+    unsharded = [(shard_dir, meta) for shard_dir, meta in shards if not meta.get("shard")]
+    
+    shard_counts = {meta["shard"]["count"] for _, meta in sharded}
+    if len(shard_counts) > 1:
+        return None, f"전체 샤드 수가 서로 다른 출력은 병합할 수 없습니다: {sorted(shard_counts)}"
+    
+    seen = {}
+    for shard_dir, meta in sharded:
+        index = meta["shard"]["index"]
+        if index in seen:
+            return None, f"샤드 {index}의 출력이 중복되었습니다: {seen[index]}, {shard_dir}"
+        seen[index] = shard_dir
+    
+    if shard_counts:
+        missing = sorted(set(range(shard_counts.pop())) - set(seen))
+        if missing:
+            print(f"경고: 샤드 {', '.join(str(index) for index in missing)}의 출력이 없습니다. 해당 샤드의 파일은 병합 결과에 포함되지 않습니다.")
+    
+    sharded.sort(key=lambda item: item[1]["shard"]["index"])
+    return sharded + unsharded, None
+
+def merge_batch_file(source_path, target_path, batch_idx):
+    """
+    샤드의 배치 파일을 병합 출력 디렉토리로 복사합니다.
+    JSON 배치 파일은 batch_idx를 새 인덱스로 바꾸어 저장하고, JSONL 배치 파일은 그대로 복사합니다.
+    배치 파일 밖에 저장된 XML(sidecar 디렉토리, zstd 아카이브)도 새 배치 파일 이름에 맞추어 함께 복사합니다.
+    
+    Args:
+        source_path (str): 샤드의 배치 파일 경로
+        target_path (str): 병합 출력 디렉토리의 배치 파일 경로
+        batch_idx (int): 새 배치 인덱스
+    """
+    for source_storage, target_storage in zip(storage_paths(source_path), storage_paths(target_path)):
+        if os.path.isdir(source_storage):
+            shutil.copytree(source_storage, target_storage, dirs_exist_ok=True)
+        elif os.path.isfile(source_storage):
+            shutil.copyfile(source_storage, target_storage)
+    
+    if source_path.endswith(".jsonl"):
+        shutil.copyfile(source_path, target_path)
+        return
+    
+    with open(source_path, 'r', encoding='utf-8') as f:
+        batch_data = json.load(f)
+    batch_data["batch_idx"] = batch_idx
+    with open(target_path, 'w', encoding='utf-8') as f:
+        json.dump(batch_data, f, ensure_ascii=False, indent=2)
+
+def merge_shards(shard_dirs, output_path, link=False):
+    """
+    샤드별 출력 디렉토리의 배치 결과를 하나의 출력 디렉토리로 병합합니다.
+    
+    Args:
+        shard_dirs (list): 샤드 출력 디렉토리 경로 리스트
+        output_path (str): 병합 출력 디렉토리 경로
+        link (bool): True면 배치 파일을 복사하지 않고 샤드 디렉토리의 파일 경로를 그대로 기록
+    
+    Returns:
+        dict: 병합 결과 (batches_meta.json과 같은 형식)
+    """
+    shards = []
+    for shard_dir in shard_dirs:
+        meta = load_shard_meta(shard_dir)
+        if meta is None:
+            return {"success": False, "error": f"샤드 메타데이터를 읽을 수 없습니다: {shard_dir}"}
+        shards.append((os.path.abspath(shard_dir), meta))
+    
+    shards, error_msg = order_shards(shards)
+    if error_msg:
+        print(f"오류: {error_msg}")
+        return {"success": False, "error": error_msg}
+    
+    os.makedirs(output_path, exist_ok=True)
+    
+    result = {
+        "success": True,
+        "total_files": 0,
+        "total_batches": 0,
+        "batches": [],
+        "failed_files": 0,
+        "shards": [],
+        "failed_shards": []
+    }
+    
+    for shard_dir, meta in shards:
+        shard_info = meta.get("shard") or {}
+        shard_label = f"샤드 {shard_info['index']}/{shard_info['count']}" if shard_info else shard_dir
+        shard_batches = []
+        
+        for batch_info in meta.get("batches", []):
+            # 샤드 출력을 다른 서버로 옮긴 경우에도 찾을 수 있도록 샤드 디렉토리 기준으로 배치 파일 경로 계산
+            source_path = os.path.join(shard_dir, os.path.basename(batch_info["json_path"]))
+            if not os.path.exists(source_path):
+                error_msg = f"배치 파일을 찾을 수 없습니다: {source_path}"
+                print(f"오류: {error_msg}")
+                return {"success": False, "error": error_msg}
+            
+            batch_idx = result["total_batches"]
+            if link:
+                json_path = source_path
+            else:
+                extension = ".jsonl" if source_path.endswith(".jsonl") else ".json"
+                json_path = os.path.join(os.path.abspath(output_path), f"batch_{batch_idx}{extension}")
+                merge_batch_file(source_path, json_path, batch_idx)
+            
+            merged_info = {
+                "batch_idx": batch_idx,
+                "file_count": batch_info["file_count"],
+                "json_path": json_path
+            }
+            if json_path.endswith(".jsonl"):
+                merged_info["format"] = "jsonl"
+            if shard_info:
+                merged_info["shard"] = shard_info["index"]
+            result["batches"].append(merged_info)
+            result["total_batches"] += 1
+            shard_batches.append(batch_idx)
+        
+        # 처리에 실패한 파일이 있는 샤드는 실패한 샤드로 기록 (process()가 기록한 failed_files)
+        failed_files = meta.get("failed_files", 0)
+        result["total_files"] += meta.get("total_files", 0)
+        result["failed_files"] += failed_files
+        if failed_files:
+            result["success"] = False
+            result["failed_shards"].append(shard_label)
+        result["shards"].append({
+            "index": shard_info.get("index"),
+            "count": shard_info.get("count"),
+            "path": shard_dir,
+            "total_files": meta.get("total_files", 0),
+            "failed_files": failed_files,
+            "batches": shard_batches
+        })
+        print(f"{shard_label}: 배치 {len(shard_batches)}개, 파일 {meta.get('total_files', 0)}개, 실패 {failed_files}개")
+    
+    meta_json_path = os.path.join(output_path, META_FILE_NAME)
+    with open(meta_json_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    
+    print(f"샤드 {len(shards)}개의 배치 {result['total_batches']}개를 병합했습니다. 메타데이터는 {meta_json_path}에 저장되었습니다.")
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='샤드별 출력 디렉토리 병합 도구')
+    parser.add_argument('shards', nargs='+', help='샤드 출력 디렉토리 경로 (--shard i/N으로 실행한 --output 경로)')
+    parser.add_argument('--output', '-o', required=True, help='병합 출력 디렉토리 경로')
+    parser.add_argument('--link', action='store_true', help='배치 파일을 복사하지 않고 샤드 디렉토리의 파일 경로를 그대로 기록')
+    parser.add_argument('--render', action='store_true', help='병합한 뒤 Node.js 렌더링 단계 실행')
+    args = parser.parse_args(argv)
+    
+    output_path = os.path.abspath(args.output)
+    result = merge_shards(args.shards, output_path, link=args.link)
+    if result.get("failed_shards"):
+        print(f"오류: 처리에 실패한 샤드가 있습니다: {', '.join(result['failed_shards'])}")
+        if args.render:
+            print("렌더링 단계를 건너뜁니다. 실패한 샤드를 --resume으로 다시 처리한 뒤 다시 병합하세요.")
+    if not result.get("success") or not args.render:
+        return result
+    
+    # 병합한 배치를 Node.js 렌더러로 처리 (main.py의 Node.js 처리 단계와 동일)
+    from python.main import start_node_stage, wait_node_stage
+    
+    print("Node.js 처리 단계: 병합된 XML 데이터 처리 중...")
+    node_stage = start_node_stage(["--data", os.path.join(output_path, META_FILE_NAME), "--output", output_path])
+    if node_stage is not None and wait_node_stage(node_stage):
+        print(f"모든 처리가 완료되었습니다. 결과는 {output_path}에 저장되었습니다.")
+    else:
+        result["success"] = False
+    return result
+
+if __name__ == "__main__":
+    # 병합이나 렌더링에 실패하면 0이 아닌 종료 코드 반환
+    sys.exit(0 if main().get("success") else 1)
@@ -0,0 +1,161 @@
+"""
+부하 테스트용 로컬 LLM 서버 - process_text 대신 텍스트 조각을 그대로 돌려주거나 변형하여 응답합니다.
+HTTP 백엔드(--llm-backend http)와 함께 사용하여 API 키와 네트워크 없이 동시 처리, 캐시, Node.js 렌더링 단계를 시험합니다.
+
+사용법:
+    python -m python.mock_llm_server --port 8765 --latency 0.2 --jitter 0.1 --throttle-rate 0.05
+    python -m python.main -i input -o output --llm-backend http --llm-url http://127.0.0.1:8765/process_text
+"""
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 텍스트 구분자 (xml_processor의 combine_texts와 동일)
+SEPARATOR = "\\+\\"
+
+class MockLLM:
+    """
+    process_text 응답을 만드는 클래스
+    
+    - echo: 모든 문서에 원본 텍스트를 그대로 사용
+    - transform: 텍스트 조각마다 문서별 접두사를 붙임 (결과 반영 여부를 확인하기 쉬움)
+    """
+
+    def __init__(self, mode="transform", latency=0.0, jitter=0.0, error_rate=0.0, throttle_rate=0.0,
+                 max_concurrency=0, seed=None):
+        """
+        Args:
+            mode (str): 응답 방식 (echo 또는 transform)
+            latency (float): 응답 지연 시간 (초)
+            jitter (float): 응답 지연 시간에 더할 무작위 시간의 최대값 (초)
+            error_rate (float): 503 응답 비율 (0~1)
+            throttle_rate (float): 429 응답 비율 (0~1)
+            max_concurrency (int): 동시에 처리할 최대 요청 수, 초과 시 429 응답 (0이면 제한 없음)
+            seed (int): 난수 시드 (선택 사항)
+        """
+        self.mode = mode
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.counts = {"requests": 0, "ok": 0, "throttled": 0, "errors": 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def handle(self, text):
+        """
+        요청 하나를 처리합니다.
+        
+        Args:
+            text (str): 결합된 텍스트
+        
+        Returns:
+            tuple: (HTTP 상태 코드, 응답 딕셔너리)
+        """
+        with self._lock:
+            self.counts["requests"] += 1
+            roll = self._random.random()
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            overloaded = self.max_concurrency and self.in_flight >= self.max_concurrency
+            if overloaded or roll < self.throttle_rate:
+                self.counts["throttled"] += 1
+                return 429, {"error": "rate limit exceeded"}
+            if roll < self.throttle_rate + self.error_rate:
+                self.counts["errors"] += 1
+                return 503, {"error": "service temporarily unavailable"}
+            self.in_flight += 1
+        
+        try:
+            if delay > 0:
+                time.sleep(delay)
+            result = self.process_text(text)
+            with self._lock:
+                self.counts["ok"] += 1
+            return 200, result
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def process_text(self, text):
+        """workflow.process_text와 같은 형식의 결과를 만듭니다."""
+        text_list = text.split(SEPARATOR)
+        if self.mode == "echo":
+            return {"positive_document": text, "hard_negative_document": text, "paraphrase": text}
+        return {
+            "positive_document": SEPARATOR.join(f"[positive] {segment}" for segment in text_list),
+            "hard_negative_document": SEPARATOR.join(f"[negative] {segment}" for segment in text_list),
+            "paraphrase": SEPARATOR.join(f"[paraphrase] {segment}" for segment in text_list)
+        }
+
+def make_handler(mock):
+    """MockLLM을 사용하는 HTTP 요청 처리 클래스를 만듭니다."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            try:
+                length = int(self.headers.get("Content-Length", "0"))
+                text = json.loads(self.rfile.read(length))["text"]
+            except (ValueError, KeyError, TypeError) as e:
+                self.send_json(400, {"error": f"잘못된 요청: {e}"})
+                return
+            status, payload = mock.handle(text)
+            self.send_json(status, payload)
+
+        def do_GET(self):
+            # 요청 통계 확인용
+            with mock._lock:
+                counts = dict(mock.counts)
+            self.send_json(200, counts)
+
+        def send_json(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            if status == 429:
+                self.send_header("Retry-After", "1")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # 요청마다 로그를 출력하지 않음
+            pass
+    
+    return Handler
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='부하 테스트용 로컬 LLM 서버')
+    parser.add_argument('--host', default='127.0.0.1', help='바인드 주소 (기본값: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='포트 (기본값: 8765)')
+    parser.add_argument('--mode', choices=['echo', 'transform'], default='transform', help='응답 방식 (기본값: transform)')
+    parser.add_argument('--latency', type=float, default=0.0, help='응답 지연 시간 (초)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='응답 지연 시간에 더할 무작위 시간의 최대값 (초)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='503 응답 비율 (0~1)')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='429 응답 비율 (0~1)')
+    parser.add_argument('--max-concurrency', type=int, default=0, help='동시에 처리할 최대 요청 수, 초과 시 429 응답 (기본값: 0, 제한 없음)')
+    parser.add_argument('--seed', type=int, default=None, help='난수 시드')
+    args = parser.parse_args(argv)
+    
+    mock = MockLLM(
+        args.mode, args.latency, args.jitter, args.error_rate, args.throttle_rate, args.max_concurrency, args.seed
+    )
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(mock))
+    server.daemon_threads = True
+    print(f"로컬 LLM 서버 실행 중: http://{args.host}:{args.port}/process_text (mode={args.mode})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"요청 통계: {mock.counts}")
+
+if __name__ == "__main__":
+    main()
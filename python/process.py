@@ -1,11 +1,31 @@
 import os
 import re
-import sys
 import json
 import math
-from pathlib import Path
+import time
+import multiprocessing
+from functools import partial
+from itertools import chain
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
-from python.services.xml_processor import XMLParser
+from python.services.xml_processor import (
+    XMLParser, request_segments, extract_file_segments, render_file_variants, log_processed_result,
+    count_segment_mismatches
+)
+from python.services.checkpoint import Checkpoint
+from python.services.xml_storage import XMLStorage, check_storage_mode
+from python.services.file_discovery import FileBatcher, iter_xml_files, iter_shard_files, parse_shard
+from python.services.token_packer import TokenPacker
+from python.services.segment_dedup import SegmentDeduplicator
+from python.services.request_coalescer import RequestCoalescer
+from python.services.llm_cache import LLMCache, workflow_fingerprint, model_settings_from_env
+from python.services.metrics import Metrics, RUN_REPORT_FILE_NAME
+from python.services.rate_control import RateController
+from python.services.llm_backend import WORKFLOW_PATH, get_backend
+
+# 텍스트 추출 전용 모드의 결과 파일명 (출력 디렉토리에 생성)
+EXTRACT_SEGMENTS_FILE_NAME = "segments.jsonl"
 
 def process():
     """XML 파일 처리 메인 함수"""
@@ -16,107 +36,868 @@ def process():
     # 배치 사이즈 환경 변수에서 가져오기 (기본값: 100)
     batch_size = int(os.getenv('BATCH_SIZE', '100'))
     
+    # 배치 구성 방식 (count: 파일 수, bytes: 파일 크기 합계, segments: 예상 텍스트 조각 수 합계)과 배치당 작업량
+    batch_policy = os.getenv('BATCH_POLICY', 'count').lower()
+    batch_weight = max(0, int(os.getenv('BATCH_WEIGHT', '0')))
+    
+    # 여러 서버에 나누어 처리할 때 이 서버가 처리할 샤드 ("i/N", main.py의 --shard)
+    shard = os.getenv('SHARD')
+    
+    # 동시에 진행할 LLM 요청 수 환경 변수에서 가져오기 (기본값: 1, 순차 처리)
+    max_concurrency = max(1, int(os.getenv('MAX_CONCURRENCY', '1')))
+    
+    # XML 파싱/추출/직렬화를 수행할 프로세스 수 (기본값: 0, 메인 프로세스에서 처리)
+    parse_workers = max(0, int(os.getenv('PARSE_WORKERS', '0')))
+    
+    # 프로세스 풀 작업 단위 크기 (기본값: 0, 배치 크기와 프로세스 수로 자동 계산)
+    parse_chunksize = max(0, int(os.getenv('PARSE_CHUNKSIZE', '0')))
+    
+    # 배치 결과 출력 형식 (json: 배치 단위 JSON, jsonl: 파일 단위로 즉시 기록하는 JSON Lines)
+    output_format = os.getenv('OUTPUT_FORMAT', 'json').lower()
+    if output_format not in ("json", "jsonl"):
+        return {"success": False, "error": f"지원하지 않는 출력 형식입니다: {output_format}"}
+    
+    # 생성된 XML 저장 방식 (inline: 배치 파일에 포함, sidecar: 별도 XML 파일, zstd: 배치별 압축 아카이브)
+    xml_storage = os.getenv('XML_STORAGE', 'inline').lower()
+    try:
+        check_storage_mode(xml_storage)
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+    
+    # 이전 실행의 체크포인트를 이어서 사용할지 여부 (main.py의 --resume)
+    resume = os.getenv('RESUME', 'False').lower() == 'true'
+    
+    # 배치 안에서 동일한 텍스트를 한 번만 LLM으로 처리할지 여부 (main.py의 --dedup)
+    dedup_segments = os.getenv('DEDUP_SEGMENTS', 'False').lower() == 'true'
+    
+    # 전체 XML 트리 대신 iterparse로 텍스트를 추출할지 여부 (main.py의 --streaming-extract)
+    streaming_extract = os.getenv('STREAMING_EXTRACT', 'False').lower() == 'true'
+    
+    # positive/negative 외에 추가로 생성할 variant의 process_text 결과 키 (쉼표로 구분, 예: paraphrase)
+    variant_keys = [
+        key.strip() for key in os.getenv('VARIANT_KEYS', '').split(',')
+        if key.strip() and key.strip() not in ("positive", "negative")
+    ]
+    
+    # 텍스트가 적은 여러 페이지를 하나의 LLM 요청으로 묶을 때의 최대 글자 수 (기본값: 0, 묶지 않음)
+    coalesce_max_chars = max(0, int(os.getenv('COALESCE_MAX_CHARS', '0')))
+    
+    # 실행 보고서를 Prometheus textfile 형식으로도 저장할 경로 (main.py의 --prometheus-textfile)
+    prometheus_path = os.getenv('PROMETHEUS_TEXTFILE')
+    
+    # LLM을 호출하지 않고 텍스트 추출 결과만 저장할지 여부 (main.py의 --extract-only)
+    extract_only = os.getenv('EXTRACT_ONLY', 'False').lower() == 'true'
+    
+    # 파이프라인 모드에서 완료된 배치를 알리는 매니페스트 경로 (main.py에서 설정)
+    manifest_path = os.getenv('BATCH_MANIFEST_PATH')
+    
     if not input_path or not output_path:
         return {"success": False, "error": "환경 변수 설정 오류"}
 
     # 출력 디렉토리 생성
     os.makedirs(output_path, exist_ok=True)
     
-    # XML 파일 목록 생성
-    xml_files = []
-    if os.path.isdir(input_path):
-        xml_files = list(Path(input_path).glob("**/*.xml"))
-    elif os.path.isfile(input_path) and input_path.endswith(".xml"):
-        xml_files = [Path(input_path)]
+    # 배치 구성 방식 확인
+    try:
+        batcher = FileBatcher(batch_size, batch_policy, batch_weight)
+    except ValueError as e:
+        error_msg = f"오류: {e}"
+        print(error_msg)
+        return {"success": False, "error": error_msg}
+    
+    # 샤드 지정 확인
+    shard_index, shard_count = 0, 1
+    if shard:
+        try:
+            shard_index, shard_count = parse_shard(shard)
+        except ValueError as e:
+            error_msg = f"오류: {e}"
+            print(error_msg)
+            return {"success": False, "error": error_msg}
     
-    if not xml_files:
+    # XML 파일 탐색 (디렉토리 전체를 탐색하기 전에 찾은 파일부터 처리)
+    xml_files = iter_xml_files(input_path)
+    first_file = next(xml_files, None)
+    if first_file is None:
         error_msg = f"오류: 입력 경로 '{input_path}'에서 XML 파일을 찾을 수 없습니다."
         print(error_msg)
         return {"success": False, "error": error_msg}
+    xml_files = chain([first_file], xml_files)
     
-    print(f"{len(xml_files)}개의 XML 파일을 처리합니다...")
+    # 입력 디렉토리 기준 상대 경로의 해시로 이 샤드에 속한 파일만 선택 (샤드끼리 겹치지 않음)
+    if shard_count > 1:
+        print(f"샤드 {shard_index}/{shard_count}: 이 샤드에 속한 파일만 처리합니다.")
+        xml_files = iter_shard_files(xml_files, input_path, shard_index, shard_count)
     
-    # 배치 처리를 위한 파일 분할
-    total_batches = math.ceil(len(xml_files) / batch_size)
-    print(f"총 {total_batches}개의 배치로 나누어 처리합니다. (배치당 최대 {batch_size}개 파일)")
+    # 텍스트 추출 전용 모드 (체크포인트와 배치 결과를 건드리지 않음)
+    if extract_only:
+        return process_extract_only(list(xml_files), output_path, parse_workers, parse_chunksize, prometheus_path)
     
-    # 모든 배치 결과를 저장할 딕셔너리
+    # LLM 백엔드 선택 (LLM_BACKEND 환경 변수, 기본값: workflow) - 설정 오류는 처리 시작 전에 확인
+    try:
+        backend = get_backend()
+    except (ValueError, OSError) as e:
+        error_msg = f"오류: LLM 백엔드를 생성할 수 없습니다 - {e}"
+        print(error_msg)
+        return {"success": False, "error": error_msg}
+    if backend.name != "workflow":
+        print(f"LLM 백엔드: {backend.name}")
+    
+    # 파일별 처리 완료 상태를 기록하는 체크포인트 (재실행 시 이미 처리된 파일은 제외)
+    checkpoint = Checkpoint(output_path, input_path, resume=resume)
+    previous_batches = []
+    first_batch_idx = 0
+    if resume:
+        # 다시 처리할 파일의 이전 결과는 이전 배치 파일에서 제거 (렌더링 단계에서 중복되지 않도록)
+        previous_batches = checkpoint.completed_batches()
+        first_batch_idx = checkpoint.next_batch_idx()
+        if checkpoint.superseded:
+            print(f"이전 배치 파일에서 다시 처리할 파일의 오래된 결과 {checkpoint.superseded}개를 제거했습니다.")
+    
+    # 발견한 파일 수와 이전 실행에서 처리가 완료되어 건너뛴 파일 수
+    file_counts = {"total": 0, "skipped": 0}
+    pending_files = iter_pending_files(xml_files, checkpoint if resume else None, file_counts)
+    
+    if batcher.policy == "count":
+        print(f"XML 파일을 찾는 대로 배치당 최대 {batch_size}개 파일씩 나누어 처리합니다...")
+    else:
+        print(f"XML 파일을 찾는 대로 배치당 최대 {batch_size}개 파일, 작업량({batcher.policy}) {batcher.max_weight}씩 나누어 처리합니다...")
+    if max_concurrency > 1:
+        print(f"최대 {max_concurrency}개의 LLM 요청을 동시에 처리합니다.")
+    if parse_workers > 0:
+        print(f"{parse_workers}개의 프로세스에서 XML 파싱/추출/직렬화를 처리합니다.")
+    
+    # 모든 배치 결과를 저장할 딕셔너리 (전체 파일/배치 수는 탐색이 끝난 뒤 기록)
     result = {
         "success": True,
+        "total_files": 0,
+        "total_batches": len(previous_batches),
+        "batches": list(previous_batches)
+    }
+    
+    # 파이프라인 모드인 경우 이전 실행에서 완료된 배치도 Node.js 렌더러에 전달
+    if manifest_path:
+        for batch_info in previous_batches:
+            append_manifest(manifest_path, batch_info)
+    
+    # 프로세스 풀 모드인 경우 CPU 작업(파싱/추출/직렬화)을 처리할 프로세스 풀 생성
+    # 작업 프로세스가 SQLite 연결을 물려받지 않도록 LLM 응답 캐시를 열기 전에 fork
+    parse_pool = multiprocessing.Pool(parse_workers) if parse_workers > 0 else None
+    
+    # LLM 응답 캐시 생성 (LLM_CACHE_PATH가 설정된 경우에만 사용)
+    cache = create_cache()
+    if cache is not None:
+        print(f"LLM 응답 캐시를 사용합니다: {cache.db_path}")
+    
+    # 토큰 수 기준 요청 분할기 생성 (MAX_REQUEST_TOKENS 또는 TOKEN_STATS가 설정된 경우에만 사용)
+    packer = create_packer()
+    if packer is not None and packer.max_tokens:
+        print(f"요청당 최대 {packer.max_tokens} 토큰으로 텍스트를 나누어 처리합니다.")
+    
+    # 단계별 소요 시간과 이벤트 횟수 수집 (실행 보고서로 저장)
+    metrics = Metrics()
+    
+    # LLM 요청 동시 실행 수 조절, 재시도, 서킷 브레이커
+    controller = create_controller(max_concurrency)
+    
+    handle_file = partial(
+        process_file, cache=cache, packer=packer, streaming=streaming_extract, variant_keys=variant_keys, metrics=metrics,
+        controller=controller
+    )
+    render_file = partial(render_file_variants, variant_keys=variant_keys)
+    if variant_keys:
+        print(f"추가 variant를 생성합니다: {', '.join(variant_keys)}")
+    
+    # 배치 단위 중복 텍스트 제거 (DEDUP_SEGMENTS가 설정된 경우에만 사용)
+    dedup = SegmentDeduplicator() if dedup_segments else None
+    if dedup is not None:
+        print("배치 안에서 동일한 텍스트는 한 번만 LLM으로 처리합니다.")
+    
+    # 여러 페이지 요청 묶기 (COALESCE_MAX_CHARS가 설정된 경우에만 사용)
+    coalescer = RequestCoalescer(coalesce_max_chars) if coalesce_max_chars > 0 else None
+    if coalescer is not None:
+        print(f"텍스트가 적은 페이지는 최대 {coalesce_max_chars}자까지 하나의 LLM 요청으로 묶어 처리합니다.")
+    
+    # 동시 처리 모드인 경우 배치 전체에서 공유할 스레드 풀 생성
+    executor = ThreadPoolExecutor(max_workers=max_concurrency) if max_concurrency > 1 else None
+    
+    try:
+        # 배치별 처리 (배치가 채워지는 즉시 처리)
+        for batch_number, (batch_files, batch_work) in enumerate(batcher.batches(pending_files)):
+            # 재실행 시 이전 실행의 배치 파일을 덮어쓰지 않도록 배치 인덱스를 이어서 사용
+            batch_idx = first_batch_idx + batch_number
+            
+            if batcher.policy == "count":
+                print(f"배치 {batch_idx + 1} 처리 중... ({len(batch_files)}개 파일)")
+            else:
+                print(f"배치 {batch_idx + 1} 처리 중... ({len(batch_files)}개 파일, 작업량 {batch_work})")
+            metrics.current_batch = batch_idx
+            batch_start = time.perf_counter()
+            
+            # 각 XML 파일 처리 (동시 처리 시에도 결과는 파일 순서대로 수집)
+            if dedup is not None or coalescer is not None:
+                chunksize = parse_chunksize or max(1, math.ceil(len(batch_files) / (max(1, parse_workers) * 4)))
+                file_results = process_batch_grouped(
+                    batch_files, dedup, coalescer, parse_pool, chunksize, executor, max_concurrency * 2, cache, packer,
+                    render_file, metrics, controller
+                )
+            elif parse_pool is not None:
+                chunksize = parse_chunksize or max(1, math.ceil(len(batch_files) / (parse_workers * 4)))
+                file_results = process_batch_in_pool(
+                    batch_files, parse_pool, chunksize, executor, max_concurrency * 2, cache, packer, render_file, metrics,
+                    controller
+                )
+            else:
+                file_results = ordered_map(handle_file, batch_files, executor, max_pending=max_concurrency * 2)
+            
+            # 배치 결과를 파일로 저장하고 파일별 처리 결과를 체크포인트에 기록
+            batch_json_path = os.path.join(output_path, f"batch_{batch_idx}.{output_format}")
+            
+            # 생성된 XML을 배치 파일 밖에 저장하고 배치 파일에는 참조만 기록
+            storage = None
+            if xml_storage != "inline":
+                storage = XMLStorage(batch_json_path, xml_storage, int(os.getenv('XML_ZSTD_LEVEL', '3')))
+                file_results = storage.store_all(file_results)
+            
+            if output_format == "jsonl":
+                # 한 줄이 기록될 때마다 체크포인트에 반영
+                file_results = checkpoint.track(batch_files, file_results, batch_idx, batch_json_path, record_each=True)
+                write_batch_jsonl(file_results, batch_json_path)
+            else:
+                # 배치 JSON 파일이 저장된 뒤 체크포인트에 반영
+                file_results = checkpoint.track(batch_files, file_results, batch_idx, batch_json_path)
+                write_batch_json(batch_idx, file_results, batch_json_path)
+                checkpoint.commit()
+            
+            # 배치 전체 처리 시간 기록 (결과 파일 저장은 처리와 동시에 진행되므로 함께 측정)
+            metrics.observe("batch", time.perf_counter() - batch_start)
+            if storage is not None:
+                metrics.add_counters(storage.stats())
+            
+            print(f"배치 {batch_idx + 1} 결과가 {batch_json_path}에 저장되었습니다.")
+            
+            # 전체 결과에 배치 정보 추가
+            batch_info = {
+                "batch_idx": batch_idx,
+                "file_count": len(batch_files),
+                "json_path": batch_json_path
+            }
+            if output_format == "jsonl":
+                batch_info["format"] = "jsonl"
+            if batcher.policy != "count":
+                batch_info["weight"] = batch_work
+            result["batches"].append(batch_info)
+            
+            # 파이프라인 모드인 경우 Node.js 렌더러가 바로 처리할 수 있도록 매니페스트에 추가
+            if manifest_path:
+                append_manifest(manifest_path, batch_info)
+    finally:
+        if parse_pool is not None:
+            parse_pool.close()
+            parse_pool.join()
+        if executor is not None:
+            executor.shutdown()
+        if cache is not None:
+            cache.evict()
+            # 캐시 통계 기록
+            result["cache"] = cache.stats()
+            cache.close()
+    
+    # 탐색이 끝난 뒤 전체 파일/배치 수 기록
+    new_batches = len(batcher.batch_weights)
+    result["total_files"] = file_counts["total"]
+    result["total_batches"] = len(previous_batches) + new_batches
+    if resume:
+        print(f"이전 실행에서 처리가 완료된 {file_counts['skipped']}개 파일을 건너뛰었습니다.")
+    print(f"{file_counts['total'] - file_counts['skipped']}개의 XML 파일을 {new_batches}개의 배치로 나누어 처리했습니다.")
+    
+    # 처리에 실패한 파일 수 기록 (병합 도구에서 실패한 샤드를 확인할 때 사용)
+    result["failed_files"] = checkpoint.failed_count()
+    if result["failed_files"]:
+        print(f"경고: {result['failed_files']}개 파일의 처리에 실패했습니다. --resume으로 다시 실행하면 실패한 파일만 다시 처리합니다.")
+    if batcher.policy != "count":
+        result["batching"] = batcher.stats()
+    if shard_count > 1:
+        result["shard"] = {"index": shard_index, "count": shard_count}
+    
+    # 요청별 토큰 수 통계 기록
+    if packer is not None:
+        result["tokens"] = packer.stats()
+        print(f"LLM 요청 {result['tokens']['requests']}회, 총 {result['tokens']['total_tokens']} 토큰")
+    
+    # 중복 텍스트 제거 통계 기록
+    if dedup is not None:
+        result["dedup"] = dedup.stats()
+        print(f"텍스트 {result['dedup']['total_segments']}개 중 고유 텍스트 {result['dedup']['unique_segments']}개를 "
+              f"{result['dedup']['requests']}회 요청으로 처리했습니다. (중복 비율: {result['dedup']['dedup_ratio']:.1%})")
+    
+    # 요청 묶음 통계 기록
+    if coalescer is not None:
+        result["coalesce"] = coalescer.stats()
+        print(f"페이지 요청 {result['coalesce']['page_requests']}개를 {result['coalesce']['requests']}회 요청으로 묶어 처리했습니다.")
+    
+    if cache is not None:
+        print(f"LLM 캐시 적중 {result['cache']['hits']}회, 미스 {result['cache']['misses']}회")
+    
+    # XML 저장 통계 출력
+    if xml_storage != "inline":
+        print(f"XML {metrics.counters.get('xml_documents', 0)}개를 {xml_storage} 방식으로 저장했습니다. "
+              f"({metrics.counters.get('xml_raw_bytes', 0)} bytes -> {metrics.counters.get('xml_stored_bytes', 0)} bytes)")
+    
+    # LLM 요청 제어 통계 출력
+    rate_control = controller.stats()
+    if rate_control["retries"] or rate_control["failures"]:
+        print(f"LLM 요청 재시도 {rate_control['retries']}회, 최종 실패 {rate_control['failures']}회 "
+              f"(요청 제한 {rate_control['throttled']}회, 서킷 브레이커 {rate_control['breaker_opened']}회)")
+    
+    # 단계별 소요 시간 통계를 담은 실행 보고서 저장
+    metrics.current_batch = None
+    write_run_report(metrics, output_path, prometheus_path, controller)
+    
+    # 전체 배치 정보를 담은 메타데이터 JSON 파일 저장
+    meta_json_path = os.path.join(output_path, "batches_meta.json")
+    with open(meta_json_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    
+    print(f"모든 배치 처리가 완료되었습니다. 메타데이터는 {meta_json_path}에 저장되었습니다.")
+    
+    return result
+
+def iter_pending_files(xml_files, checkpoint=None, file_counts=None):
+    """
+    찾은 XML 파일 중 처리할 파일만 하나씩 반환합니다.
+    
+    Args:
+        xml_files (iterable): XML 파일 경로
+        checkpoint (Checkpoint): 재실행 시 이전 실행의 체크포인트 (있으면 처리가 완료된 파일을 건너뜀)
+        file_counts (dict): 발견한 파일 수(total)와 건너뛴 파일 수(skipped)를 기록할 딕셔너리
+    
+    Returns:
+        generator: 처리할 XML 파일 경로
+    """
+    if file_counts is None:
+        file_counts = {"total": 0, "skipped": 0}
+    for xml_file in xml_files:
+        file_counts["total"] += 1
+        if checkpoint is not None and checkpoint.is_done(xml_file):
+            file_counts["skipped"] += 1
+            continue
+        yield xml_file
+
+def process_extract_only(xml_files, output_path, parse_workers=0, parse_chunksize=0, prometheus_path=None):
+    """
+    LLM을 호출하지 않고 XML 파일의 텍스트와 TbpeId만 추출하여 저장합니다.
+    workflow 모듈(LLM 스택)을 임포트하지 않으므로 입력 확인이나 요청 규모 추정에 사용합니다.
+    
+    Args:
+        xml_files (list): XML 파일 경로 리스트
+        output_path (str): 출력 디렉토리 경로
+        parse_workers (int): 텍스트 추출을 처리할 프로세스 수 (0이면 메인 프로세스에서 처리)
+        parse_chunksize (int): 프로세스 풀 작업 단위 크기 (0이면 자동 계산)
+        prometheus_path (str): 실행 보고서를 Prometheus textfile 형식으로도 저장할 경로 (선택 사항)
+    
+    Returns:
+        dict: 추출 결과 요약
+    """
+    print(f"텍스트 추출 전용 모드: {len(xml_files)}개의 XML 파일에서 텍스트만 추출합니다. (LLM 호출 없음)")
+    
+    # 토큰 수 통계 (MAX_REQUEST_TOKENS 또는 TOKEN_STATS가 설정된 경우 예상 요청 수와 토큰 수 집계)
+    packer = create_packer()
+    metrics = Metrics()
+    
+    result = {
+        "success": True,
+        "extract_only": True,
         "total_files": len(xml_files),
-        "total_batches": total_batches,
-        "batches": []
+        "failed_files": 0,
+        "total_segments": 0,
+        "total_chars": 0
     }
     
-    # 배치별 처리
-    for batch_idx in range(total_batches):
-        start_idx = batch_idx * batch_size
-        end_idx = min(start_idx + batch_size, len(xml_files))
-        batch_files = xml_files[start_idx:end_idx]
+    file_paths = [str(xml_file) for xml_file in xml_files]
+    parse_pool = multiprocessing.Pool(parse_workers) if parse_workers > 0 else None
+    segments_path = os.path.join(output_path, EXTRACT_SEGMENTS_FILE_NAME)
+    try:
+        if parse_pool is not None:
+            chunksize = parse_chunksize or max(1, math.ceil(len(file_paths) / (parse_workers * 4)))
+            tasks = parse_pool.imap(extract_file_segments, file_paths, chunksize)
+        else:
+            tasks = map(extract_file_segments, file_paths)
         
-        print(f"배치 {batch_idx + 1}/{total_batches} 처리 중... ({len(batch_files)}개 파일)")
+        # 파일 단위로 한 줄씩 기록 (입력 파일 순서 유지)
+        with open(segments_path, 'w', encoding='utf-8') as f:
+            for xml_file, task in zip(xml_files, tasks):
+                record_task_timings([task], metrics)
+                entry = {"file": xml_file.name, "page_idx": extract_idx(xml_file.stem)}
+                if "error" in task:
+                    print(f"파일 '{xml_file.name}' 텍스트 추출 중 오류: {task['error']}")
+                    metrics.increment("files_failed")
+                    result["failed_files"] += 1
+                    entry["error"] = task["error"]
+                else:
+                    metrics.increment("files_succeeded")
+                    result["total_segments"] += len(task["text_list"])
+                    result["total_chars"] += sum(len(text) for text in task["text_list"])
+                    if packer is not None and task["text_list"]:
+                        packer.record(packer.pack(task["text_list"]))
+                    entry["text_list"] = task["text_list"]
+                    entry["tbpe_id_list"] = task["tbpe_id_list"]
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    finally:
+        if parse_pool is not None:
+            parse_pool.close()
+            parse_pool.join()
+    
+    result["segments_path"] = segments_path
+    print(f"텍스트 {result['total_segments']}개 ({result['total_chars']}자)를 {segments_path}에 저장했습니다.")
+    
+    # 요청별 토큰 수 통계 기록 (실제 실행 시의 예상 요청 수와 토큰 수)
+    if packer is not None:
+        result["tokens"] = packer.stats()
+        print(f"예상 LLM 요청 {result['tokens']['requests']}회, 총 {result['tokens']['total_tokens']} 토큰")
+    
+    write_run_report(metrics, output_path, prometheus_path)
+    
+    return result
+
+def write_run_report(metrics, output_path, prometheus_path=None, controller=None):
+    """
+    단계별 소요 시간 통계를 담은 실행 보고서를 저장하고 요약을 출력합니다.
+    
+    Args:
+        metrics (Metrics): 단계별 소요 시간 수집기
+        output_path (str): 출력 디렉토리 경로
+        prometheus_path (str): Prometheus textfile 경로 (선택 사항)
+        controller (RateController): LLM 요청 제어기 (있으면 상태를 보고서의 rate_control 항목에 기록)
+    """
+    report = metrics.report()
+    if controller is not None:
+        report["rate_control"] = controller.stats()
+    report_path = os.path.join(output_path, RUN_REPORT_FILE_NAME)
+    metrics.write_json(report_path, report)
+    if prometheus_path:
+        metrics.write_prometheus(prometheus_path, report)
+    for stage, stats in report["stages"].items():
+        print(f"{stage} 단계: {stats['count']}회, 평균 {stats['mean_ms']}ms, p95 {stats['p95_ms']}ms, p99 {stats['p99_ms']}ms")
+    print(f"실행 보고서가 {report_path}에 저장되었습니다.")
+
+def append_manifest(manifest_path, entry):
+    """
+    파이프라인 매니페스트(JSON Lines)에 항목 하나를 추가합니다.
+    
+    Args:
+        manifest_path (str): 매니페스트 파일 경로
+        entry (dict): 배치 정보 또는 종료 표시({"done": True})
+    """
+    with open(manifest_path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        f.flush()
+
+def ordered_map(func, items, executor=None, max_pending=1):
+    """
+    입력 순서대로 결과를 반환하는 map 함수
+    스레드 풀이 주어지면 최대 max_pending개의 작업만 동시에 제출하여 완료된 결과가 메모리에 쌓이지 않도록 합니다.
+    
+    Args:
+        func: 각 항목에 적용할 함수
+        items: 처리할 항목 리스트
+        executor (ThreadPoolExecutor): 스레드 풀 (None이면 순차 처리)
+        max_pending (int): 동시에 제출할 최대 작업 수
         
-        # 배치 결과 저장용 딕셔너리
-        batch_results = {
-            "batch_idx": batch_idx,
-            "success": True,
-            "processed_files": [],
-            "errors": []
+    Yields:
+        입력 순서대로 정렬된 func의 결과
+    """
+    if executor is None:
+        yield from map(func, items)
+        return
+    
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def write_batch_json(batch_idx, file_results, batch_json_path):
+    """
+    배치 결과 전체를 하나의 JSON 파일로 저장합니다.
+    
+    Args:
+        batch_idx (int): 배치 인덱스
+        file_results: process_file 결과 이터러블
+        batch_json_path (str): 저장할 배치 JSON 파일 경로
+    """
+    # 배치 결과 저장용 딕셔너리
+    batch_results = {
+        "batch_idx": batch_idx,
+        "success": True,
+        "processed_files": [],
+        "errors": []
+    }
+    
+    for file_result in file_results:
+        if file_result["success"]:
+            batch_results["processed_files"].append(file_result)
+        else:
+            batch_results["errors"].append(file_result)
+    
+    with open(batch_json_path, 'w', encoding='utf-8') as f:
+        json.dump(batch_results, f, ensure_ascii=False, indent=2)
+
+def write_batch_jsonl(file_results, batch_json_path):
+    """
+    배치 결과를 JSON Lines 형식으로 저장합니다.
+    파일 하나의 처리가 끝날 때마다 한 줄씩 기록하고 즉시 flush하므로 메모리 사용량이 배치 크기와 무관합니다.
+    
+    Args:
+        file_results: process_file 결과 이터러블
+        batch_json_path (str): 저장할 배치 JSONL 파일 경로
+    """
+    with open(batch_json_path, 'w', encoding='utf-8') as f:
+        for file_result in file_results:
+            f.write(json.dumps(file_result, ensure_ascii=False) + "\n")
+            f.flush()
+
+def process_file(xml_file, cache=None, packer=None, streaming=False, variant_keys=(), metrics=None, controller=None):
+    """
+    XML 파일 하나를 처리하여 배치 결과 항목을 생성합니다.
+    
+    Args:
+        xml_file (Path): 처리할 XML 파일 경로
+        cache (LLMCache): process_text 응답 캐시 (선택 사항)
+        packer (TokenPacker): 토큰 수 기준 요청 분할기 (선택 사항)
+        streaming (bool): True면 iterparse로 텍스트를 먼저 추출하고, 텍스트가 있는 경우에만 전체 트리를 파싱
+        variant_keys (list): positive/negative 외에 추가로 생성할 variant의 process_text 결과 키
+        metrics (Metrics): 단계별 소요 시간 수집기 (선택 사항)
+        controller (RateController): LLM 요청 제어기 (선택 사항)
+        
+    Returns:
+        dict: 성공 시 XML 문자열을 포함한 결과, 실패 시 오류 정보 (LLM 처리 실패 포함)
+    """
+    file_name = xml_file.name
+    page_idx = extract_idx(xml_file.stem)
+    file_start = time.perf_counter()
+    
+    try:
+        # XML 파일 처리
+        parser = XMLParser(str(xml_file), cache=cache, packer=packer, streaming=streaming, controller=controller)
+        
+        # XML 문자열 생성 (API 한 번만 호출, 추가 variant도 같은 파싱 결과와 LLM 결과 사용)
+        variants = parser.generate_xml_variants(["positive", "negative"] + list(variant_keys))
+        positive_xml, negative_xml = variants.pop("positive"), variants.pop("negative")
+        
+        if metrics is not None:
+            metrics.record(parser.timings)
+            metrics.add_counters(parser.counters)
+            metrics.observe("file", time.perf_counter() - file_start)
+            metrics.increment("files_succeeded")
+        
+        print(f"파일 '{file_name}' 처리 완료")
+        
+        # 결과 저장 - XML 문자열 포함
+        file_result = {
+            "success": True, 
+            "file": file_name, 
+            "page_idx": page_idx,
+            "positive_xml": positive_xml,
+            "negative_xml": negative_xml
         }
+        if variant_keys:
+            file_result["variant_xml"] = variants
+        return file_result
         
-        # 각 XML 파일 처리
-        for xml_file in batch_files:
-            file_name = xml_file.name
-            page_idx = extract_idx(xml_file.stem)
-            
-            try:
-                # XML 파일 처리
-                parser = XMLParser(str(xml_file))
-                
-                # XML 문자열 생성 (API 한 번만 호출)
-                positive_xml, negative_xml = parser.generate_xml_string()
-                
-                print(f"파일 '{file_name}' 처리 완료")
-                
-                # 결과 저장 - XML 문자열 포함
-                batch_results["processed_files"].append({
-                    "success": True, 
-                    "file": file_name, 
-                    "page_idx": page_idx,
-                    "positive_xml": positive_xml,
-                    "negative_xml": negative_xml
-                })
-                
-            except Exception as e:
-                print(f"파일 '{file_name}' 처리 중 오류: {e}")
-                batch_results["errors"].append({
-                    "success": False, 
-                    "file": file_name, 
-                    "error": str(e)
-                })
+    except Exception as e:
+        print(f"파일 '{file_name}' 처리 중 오류: {e}")
+        if metrics is not None:
+            metrics.increment("files_failed")
+        return {
+            "success": False, 
+            "file": file_name, 
+            "error": str(e)
+        }
+
+def process_batch_in_pool(batch_files, parse_pool, chunksize, executor, max_pending, cache=None, packer=None,
+                          render_file=render_file_variants, metrics=None, controller=None):
+    """
+    CPU 작업은 프로세스 풀에서, LLM 호출은 메인 프로세스에서 처리하여 배치 결과 항목을 생성합니다.
+    작업 프로세스와는 추출된 텍스트와 최종 XML 문자열만 주고받습니다.
+    
+    Args:
+        batch_files (list): 배치에 포함된 XML 파일 경로 리스트
+        parse_pool (multiprocessing.Pool): 파싱/추출/직렬화용 프로세스 풀
+        chunksize (int): 프로세스 풀 작업 단위 크기
+        executor (ThreadPoolExecutor): LLM 호출용 스레드 풀 (None이면 순차 처리)
+        max_pending (int): 동시에 제출할 최대 LLM 요청 수
+        cache (LLMCache): process_text 응답 캐시 (선택 사항)
+        packer (TokenPacker): 토큰 수 기준 요청 분할기 (선택 사항)
+        render_file: 결과 반영 및 직렬화 함수 (기본값: render_file_variants)
+        metrics (Metrics): 단계별 소요 시간 수집기 (선택 사항)
+        controller (RateController): LLM 요청 제어기 (선택 사항)
+        
+    Yields:
+        dict: 파일 순서대로 정렬된 배치 결과 항목
+    """
+    file_paths = [str(xml_file) for xml_file in batch_files]
+    
+    # 1단계: 파싱 및 텍스트 추출 (프로세스 풀)
+    segments = parse_pool.map(extract_file_segments, file_paths, chunksize)
+    record_task_timings(segments, metrics)
+    
+    # 2단계: LLM 호출 (메인 프로세스의 스레드 풀)
+    tasks = ordered_map(
+        partial(request_segments_llm, cache=cache, packer=packer, metrics=metrics, controller=controller), segments,
+        executor, max_pending
+    )
+    
+    # 3단계: 결과 반영 및 직렬화 (프로세스 풀, LLM 응답이 도착하는 대로 순서대로 처리)
+    rendered = parse_pool.imap(render_file, tasks, chunksize)
+    
+    yield from collect_rendered(batch_files, rendered, metrics)
+
+def process_batch_grouped(batch_files, dedup, coalescer, parse_pool, chunksize, executor, max_pending, cache=None, packer=None,
+                          render_file=render_file_variants, metrics=None, controller=None):
+    """
+    배치의 모든 파일에서 텍스트를 먼저 추출한 뒤 LLM 요청을 배치 단위로 구성하여 배치 결과 항목을 생성합니다.
+    중복 제거기가 있으면 고유 텍스트만 요청하고, 요청 묶음기가 있으면 작은 요청을 하나로 묶어 보냅니다.
+    
+    Args:
+        batch_files (list): 배치에 포함된 XML 파일 경로 리스트
+        dedup (SegmentDeduplicator): 중복 텍스트 제거기 (None이면 페이지별로 요청)
+        coalescer (RequestCoalescer): 요청 묶음기 (None이면 묶지 않음)
+        parse_pool (multiprocessing.Pool): 파싱/추출/직렬화용 프로세스 풀 (None이면 메인 프로세스에서 처리)
+        chunksize (int): 프로세스 풀 작업 단위 크기
+        executor (ThreadPoolExecutor): LLM 호출용 스레드 풀 (None이면 순차 처리)
+        max_pending (int): 동시에 제출할 최대 LLM 요청 수
+        cache (LLMCache): process_text 응답 캐시 (선택 사항)
+        packer (TokenPacker): 토큰 수 기준 요청 분할기 (선택 사항)
+        render_file: 결과 반영 및 직렬화 함수 (기본값: render_file_variants)
+        metrics (Metrics): 단계별 소요 시간 수집기 (선택 사항)
+        controller (RateController): LLM 요청 제어기 (선택 사항)
+    
+    Yields:
+        dict: 파일 순서대로 정렬된 배치 결과 항목
+    """
+    file_paths = [str(xml_file) for xml_file in batch_files]
+    
+    # 1단계: 배치 전체 파싱 및 텍스트 추출
+    if parse_pool is not None:
+        tasks = parse_pool.map(extract_file_segments, file_paths, chunksize)
+    else:
+        tasks = [extract_file_segments(file_path) for file_path in file_paths]
+    record_task_timings(tasks, metrics)
+    
+    # 2단계: 요청 구성 (중복 제거 시 고유 텍스트만, 아니면 텍스트가 있는 페이지별로 하나씩)
+    if dedup is not None:
+        requests = dedup.plan(tasks)
+    else:
+        requests = [task["text_list"] for task in tasks if "error" not in task and task["text_list"]]
+    
+    # 3단계: LLM 호출 (요청 묶음기가 있으면 묶어서 호출한 뒤 원래 요청별로 나눔)
+    request_llm_func = partial(
+        request_unique_segments, cache=cache, packer=packer, metrics=metrics, controller=controller
+    )
+    if coalescer is not None:
+        groups = coalescer.coalesce(requests)
+        group_texts = [texts for texts, _ in groups]
+        group_responses = list(ordered_map(request_llm_func, group_texts, executor, max_pending))
+        responses = coalescer.demux(groups, group_responses, len(requests))
+    else:
+        responses = list(ordered_map(request_llm_func, requests, executor, max_pending))
+    
+    # 4단계: 처리 결과를 각 파일에 반영
+    if dedup is not None:
+        dedup.fan_out(tasks, requests, responses)
+    else:
+        request_tasks = [task for task in tasks if "error" not in task and task["text_list"]]
+        for task, response in zip(request_tasks, responses):
+            if response is not None:
+                task["processed_result"] = response
+    
+    # LLM 처리에 실패한 페이지는 빈 결과 대신 실패로 기록 (재실행 시 다시 처리)
+    for task in tasks:
+        if "error" not in task and task["text_list"] and task.get("processed_result") is None:
+            task["error"] = "LLM 처리 실패"
+    
+    # 5단계: 결과 반영 및 직렬화
+    if parse_pool is not None:
+        rendered = parse_pool.imap(render_file, tasks, chunksize)
+    else:
+        rendered = map(render_file, tasks)
+    
+    yield from collect_rendered(batch_files, rendered, metrics)
+
+def record_task_timings(tasks, metrics=None):
+    """
+    extract_file_segments 결과에 포함된 단계별 소요 시간을 수집기에 기록하고 작업 정보에서 제거합니다.
+    
+    Args:
+        tasks (list): extract_file_segments 결과 리스트
+        metrics (Metrics): 단계별 소요 시간 수집기 (선택 사항)
+    """
+    for task in tasks:
+        timings = task.pop("timings", None)
+        if metrics is not None and timings:
+            metrics.record(timings)
+
+def collect_rendered(batch_files, rendered, metrics=None):
+    """
+    render_file_variants 결과를 배치 결과 항목으로 변환합니다.
+    
+    Args:
+        batch_files (list): 배치에 포함된 XML 파일 경로 리스트
+        rendered: render_file_variants 결과 이터러블 (파일과 같은 순서)
+        metrics (Metrics): 단계별 소요 시간 수집기 (선택 사항)
+    
+    Yields:
+        dict: 파일 순서대로 정렬된 배치 결과 항목
+    """
+    for xml_file, variants in zip(batch_files, rendered):
+        file_name = xml_file.name
         
-        # 배치 결과를 JSON 파일로 저장
-        batch_json_path = os.path.join(output_path, f"batch_{batch_idx}.json")
-        with open(batch_json_path, 'w', encoding='utf-8') as f:
-            json.dump(batch_results, f, ensure_ascii=False, indent=2)
+        if "error" in variants:
+            print(f"파일 '{file_name}' 처리 중 오류: {variants['error']}")
+            if metrics is not None:
+                metrics.increment("files_failed")
+            yield {
+                "success": False, 
+                "file": file_name, 
+                "error": variants["error"]
+            }
+            continue
         
-        print(f"배치 {batch_idx + 1} 결과가 {batch_json_path}에 저장되었습니다.")
+        if metrics is not None:
+            metrics.record(variants.get("timings", {}))
+            metrics.add_counters(variants.get("counters", {}))
+            metrics.increment("files_succeeded")
         
-        # 전체 결과에 배치 정보 추가
-        result["batches"].append({
-            "batch_idx": batch_idx,
-            "file_count": len(batch_files),
-            "json_path": batch_json_path
-        })
+        print(f"파일 '{file_name}' 처리 완료")
+        file_result = {
+            "success": True, 
+            "file": file_name, 
+            "page_idx": extract_idx(xml_file.stem),
+            "positive_xml": variants["positive_xml"],
+            "negative_xml": variants["negative_xml"]
+        }
+        if "variant_xml" in variants:
+            file_result["variant_xml"] = variants["variant_xml"]
+        yield file_result
+
+def request_segments_llm(task, cache=None, packer=None, metrics=None, controller=None):
+    """
+    extract_file_segments 결과의 텍스트를 process_text로 처리하여 작업 정보에 추가합니다.
     
-    # 전체 배치 정보를 담은 메타데이터 JSON 파일 저장
-    meta_json_path = os.path.join(output_path, "batches_meta.json")
-    with open(meta_json_path, 'w', encoding='utf-8') as f:
-        json.dump(result, f, ensure_ascii=False, indent=2)
+    Args:
+        task (dict): extract_file_segments 결과
+        cache (LLMCache): process_text 응답 캐시 (선택 사항)
+        packer (TokenPacker): 토큰 수 기준 요청 분할기 (선택 사항)
+        metrics (Metrics): 단계별 소요 시간 수집기 (선택 사항)
+        controller (RateController): LLM 요청 제어기 (선택 사항)
+        
+    Returns:
+        dict: processed_result가 추가된 작업 정보 (LLM 처리 실패 시 error 추가)
+    """
+    if "error" in task or not task["text_list"]:
+        return task
     
-    print(f"모든 배치 처리가 완료되었습니다. 메타데이터는 {meta_json_path}에 저장되었습니다.")
+    try:
+        start = time.perf_counter()
+        task["processed_result"] = request_segments(task["text_list"], cache, packer, controller)
+        if metrics is not None:
+            metrics.observe("llm", time.perf_counter() - start)
+        log_processed_result(task["processed_result"], len(task["text_list"]))
+    except Exception as e:
+        print(f"프롬프트 처리 중 오류 발생: {e}")
+        task["error"] = f"LLM 처리 실패: {e}"
     
-    return result
+    return task
+
+def request_unique_segments(text_list, cache=None, packer=None, metrics=None, controller=None):
+    """
+    배치 단위로 구성한 요청(고유 텍스트 또는 묶인 페이지 텍스트)을 process_text로 처리합니다.
+    
+    Args:
+        text_list (list): 요청할 텍스트 조각 리스트
+        cache (LLMCache): process_text 응답 캐시 (선택 사항)
+        packer (TokenPacker): 토큰 수 기준 요청 분할기 (선택 사항)
+        metrics (Metrics): 단계별 소요 시간 수집기 (선택 사항)
+        controller (RateController): LLM 요청 제어기 (선택 사항)
+    
+    Returns:
+        process_text 함수의 결과 (실패 시 None)
+    """
+    try:
+        start = time.perf_counter()
+        processed_result = request_segments(text_list, cache, packer, controller)
+        if metrics is not None:
+            metrics.observe("llm", time.perf_counter() - start)
+        log_processed_result(processed_result, len(text_list))
+        
+        # 결과를 페이지별로 나누면 텍스트 개수가 맞춰지므로 응답 단위로 개수 차이를 기록
+        mismatches = count_segment_mismatches(processed_result, text_list)
+        if mismatches and metrics is not None:
+            metrics.increment("segment_mismatch", mismatches)
+        return processed_result
+    except Exception as e:
+        print(f"프롬프트 처리 중 오류 발생: {e}")
+        return None
+
+def create_cache():
+    """
+    환경 변수 설정에 따라 LLM 응답 캐시를 생성합니다.
+    
+    Returns:
+        LLMCache: 캐시 인스턴스 (LLM_CACHE_PATH가 없으면 None)
+    """
+    cache_path = os.getenv('LLM_CACHE_PATH')
+    if not cache_path:
+        return None
+    
+    # 프롬프트 버전을 지정하지 않으면 워크플로우 소스 내용으로 버전 계산
+    version = os.getenv('PROMPT_VERSION') or workflow_fingerprint(WORKFLOW_PATH)
+    
+    return LLMCache(
+        cache_path,
+        version=version,
+        settings=model_settings_from_env(),
+        max_entries=int(os.getenv('LLM_CACHE_MAX_ENTRIES', '100000')),
+        max_bytes=int(float(os.getenv('LLM_CACHE_MAX_MB', '0')) * 1024 * 1024),
+        max_age_seconds=float(os.getenv('LLM_CACHE_MAX_AGE_DAYS', '30')) * 86400
+    )
+
+def create_controller(max_concurrency):
+    """
+    환경 변수 설정에 따라 LLM 요청 제어기를 생성합니다.
+    
+    Args:
+        max_concurrency (int): 최대 동시 LLM 요청 수 (동시 실행 수 조절의 상한)
+    
+    Returns:
+        RateController: LLM 요청 제어기
+    """
+    return RateController(
+        max_concurrency,
+        max_retries=int(os.getenv('LLM_MAX_RETRIES', '5')),
+        base_delay=float(os.getenv('LLM_BACKOFF_BASE', '1.0')),
+        max_delay=float(os.getenv('LLM_BACKOFF_MAX', '60')),
+        latency_target=float(os.getenv('LLM_LATENCY_TARGET', '0')),
+        breaker_threshold=int(os.getenv('LLM_BREAKER_THRESHOLD', '5')),
+        breaker_cooldown=float(os.getenv('LLM_BREAKER_COOLDOWN', '30'))
+    )
+
+def create_packer():
+    """
+    환경 변수 설정에 따라 토큰 수 기준 요청 분할기를 생성합니다.
+    
+    Returns:
+        TokenPacker: 요청 분할기 (MAX_REQUEST_TOKENS와 TOKEN_STATS가 모두 없으면 None)
+    """
+    max_tokens = int(os.getenv('MAX_REQUEST_TOKENS', '0'))
+    token_stats = os.getenv('TOKEN_STATS', 'False').lower() == 'true'
+    if max_tokens <= 0 and not token_stats:
+        return None
+    
+    return TokenPacker(max(0, max_tokens), encoding_name=os.getenv('TOKEN_ENCODING', 'cl100k_base'))
 
 def extract_idx(filename):
     """파일명에서 숫자 추출 (예: '12344_text' -> '12344')"""
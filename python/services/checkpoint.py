@@ -0,0 +1,263 @@
+import os
+import json
+import hashlib
+import threading
+from pathlib import Path
+
+# 체크포인트 매니페스트 파일명 (출력 디렉토리에 생성)
+CHECKPOINT_FILE_NAME = "checkpoint.jsonl"
+
+def prune_batch_file(json_path, records, keep):
+    """
+    이전 실행의 배치 파일에서 유지할 파일의 결과만 남깁니다 (임시 파일에 기록한 뒤 교체).
+
+    체크포인트는 배치 결과와 같은 순서로 기록되므로 기록 순서로 결과 위치를 찾습니다.
+    JSONL 배치 파일은 한 줄이 기록 하나에 대응하고, JSON 배치 파일은 processed_files와 errors가
+    각각 성공/실패한 기록에 순서대로 대응합니다. 체크포인트에 기록되지 않은 결과(중단 시점에 기록 중이던 결과)는 제거합니다.
+
+    Args:
+        json_path (str): 배치 파일 경로
+        records (list): 배치에 기록된 (파일 키, 처리 성공 여부) 리스트 (기록 순서)
+        keep (list): records와 같은 길이의 유지 여부 리스트
+
+    Returns:
+        int: 제거한 결과 수
+    """
+    if not os.path.exists(json_path):
+        return 0
+
+    removed = 0
+    temp_path = json_path + ".tmp"
+    if json_path.endswith(".jsonl"):
+        with open(json_path, 'r', encoding='utf-8') as source, open(temp_path, 'w', encoding='utf-8') as target:
+            position = 0
+            for line in source:
+                if not line.strip():
+                    continue
+                if position < len(keep) and keep[position]:
+                    target.write(line if line.endswith("\n") else line + "\n")
+                else:
+                    removed += 1
+                position += 1
+    else:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            batch_data = json.load(f)
+        for list_key, success in (("processed_files", True), ("errors", False)):
+            list_keep = [kept for (_, record_success), kept in zip(records, keep) if bool(record_success) == success]
+            file_results = batch_data.get(list_key, [])
+            batch_data[list_key] = [
+                file_result for position, file_result in enumerate(file_results)
+                if position < len(list_keep) and list_keep[position]
+            ]
+            removed += len(file_results) - len(batch_data[list_key])
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(batch_data, f, ensure_ascii=False, indent=2)
+
+    if removed:
+        os.replace(temp_path, json_path)
+    else:
+        os.remove(temp_path)
+    return removed
+
+def file_content_hash(file_path):
+    """
+    파일 내용의 SHA-256 해시를 계산합니다.
+
+    Args:
+        file_path (str): 파일 경로
+
+    Returns:
+        str: 16진수 해시 문자열
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class Checkpoint:
+    """
+    입력 파일별 처리 완료 상태를 기록하는 체크포인트 매니페스트
+
+    파일 하나의 결과가 배치 파일에 기록될 때마다 한 줄씩 추가되며(JSON Lines),
+    재실행 시 내용이 바뀌지 않고 이미 처리된 파일은 건너뛸 수 있습니다.
+    내용 해시는 재실행 모드에서만 계산하며, 해시 없이 기록된 파일은 크기와 수정 시각으로 변경 여부를 확인합니다.
+    """
+
+    def __init__(self, output_path, input_root, resume=False):
+        """
+        Args:
+            output_path (str): 출력 디렉토리 경로
+            input_root (str): 입력 디렉토리 경로 (파일 키 계산 기준)
+            resume (bool): 기존 체크포인트를 이어서 사용할지 여부 (False면 초기화)
+        """
+        self.path = os.path.join(output_path, CHECKPOINT_FILE_NAME)
+        self.input_root = input_root if os.path.isdir(input_root) else os.path.dirname(input_root)
+        self.resume = resume
+        self.entries = {}
+        # 배치 인덱스 -> {"json_path": 배치 파일 경로, "records": [(파일 키, 처리 성공 여부), ...]} (기록 순서)
+        self.batches = {}
+        # 이전 배치 파일에서 제거한 오래된 결과 수 (completed_batches에서 계산)
+        self.superseded = 0
+        self._hashes = {}
+        self._pending = []
+        self._lock = threading.Lock()
+
+        if resume and os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 중단 시점에 기록 중이던 마지막 줄은 무시
+                        continue
+                    self.entries[entry["file"]] = entry
+                    batch = self.batches.setdefault(entry["batch_idx"], {"json_path": entry["json_path"], "records": []})
+                    batch["records"].append((entry["file"], entry.get("success", entry.get("status") == "done")))
+        else:
+            open(self.path, 'w', encoding='utf-8').close()
+
+    def file_key(self, file_path):
+        """입력 디렉토리 기준 상대 경로를 파일 키로 사용합니다."""
+        return Path(os.path.relpath(str(file_path), self.input_root)).as_posix()
+
+    def content_hash(self, file_path):
+        """파일 내용 해시를 계산합니다 (한 번 계산한 값은 재사용)."""
+        key = self.file_key(file_path)
+        if key not in self._hashes:
+            self._hashes[key] = file_content_hash(str(file_path))
+        return self._hashes[key]
+
+    def is_done(self, file_path):
+        """내용이 바뀌지 않았고 이전 실행에서 처리가 완료된 파일인지 확인합니다."""
+        entry = self.entries.get(self.file_key(file_path))
+        if entry is None or entry.get("status") != "done":
+            return False
+        if "content_hash" in entry:
+            return entry["content_hash"] == self.content_hash(file_path)
+        stat = os.stat(str(file_path))
+        return entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns
+
+    def is_current(self, file_key, batch_idx):
+        """
+        배치에 기록된 파일 결과가 최신 결과로 유지되는지 확인합니다.
+        이후 배치에서 다시 처리되었거나, 실패했거나, 내용이 바뀌어 이번 실행에서 다시 처리할 파일의 결과는 오래된 결과입니다.
+        입력에서 삭제된 파일은 다시 처리되지 않으므로 완료된 결과를 유지합니다.
+        """
+        entry = self.entries[file_key]
+        if entry["batch_idx"] != batch_idx or entry.get("status") != "done":
+            return False
+        file_path = os.path.join(self.input_root, file_key)
+        return not os.path.exists(file_path) or self.is_done(file_path)
+
+    def failed_count(self):
+        """최신 결과가 처리에 실패한 파일 수를 반환합니다 (재실행 시 다시 처리할 파일)."""
+        with self._lock:
+            return sum(1 for entry in self.entries.values() if entry.get("status") != "done")
+
+    def next_batch_idx(self):
+        """이전 실행의 배치 파일을 덮어쓰지 않도록 다음 배치 인덱스를 반환합니다."""
+        batch_indices = [entry["batch_idx"] for entry in self.entries.values() if "batch_idx" in entry]
+        return max(batch_indices) + 1 if batch_indices else 0
+
+    def completed_batches(self):
+        """
+        이전 실행에서 완료된 파일이 남아 있는 배치 정보를 반환합니다.
+        렌더링 단계에서 중복되거나 오래된 페이지가 생기지 않도록, 최신 결과가 아닌 파일(is_current)의 결과는
+        이전 배치 파일에서 제거하고 제거한 수를 superseded에 기록합니다. 완료된 파일이 남지 않은 배치는 제외합니다.
+
+        Returns:
+            list: batches_meta.json의 batches 항목과 같은 형식의 배치 정보 리스트
+        """
+        batches = []
+        self.superseded = 0
+        for batch_idx in sorted(self.batches):
+            json_path = self.batches[batch_idx]["json_path"]
+            records = self.batches[batch_idx]["records"]
+            keep = [self.is_current(file_key, batch_idx) for file_key, _ in records]
+
+            # JSONL 배치 파일은 체크포인트에 기록되지 않은 마지막 줄이 있을 수 있으므로 항상 확인
+            if not all(keep) or json_path.endswith(".jsonl"):
+                self.superseded += prune_batch_file(json_path, records, keep)
+
+            if not any(keep):
+                continue
+            batch_info = {
+                "batch_idx": batch_idx,
+                "file_count": sum(keep),
+                "json_path": json_path
+            }
+            if json_path.endswith(".jsonl"):
+                batch_info["format"] = "jsonl"
+            batches.append(batch_info)
+        return batches
+
+    def record(self, file_path, status, batch_idx, json_path, success=False):
+        """
+        파일 하나의 처리 결과를 체크포인트에 기록합니다.
+
+        Args:
+            file_path: 입력 XML 파일 경로
+            status (str): "done" 또는 "failed"
+            batch_idx (int): 결과가 기록된 배치 인덱스
+            json_path (str): 결과가 기록된 배치 파일 경로
+            success (bool): 배치 결과 항목의 success 값 (JSON 배치 파일의 processed_files/errors 구분)
+        """
+        entry = {"file": self.file_key(file_path)}
+        if self.resume:
+            # 재실행 모드에서는 건너뛸 파일을 확인하며 이미 계산한 해시를 기록
+            entry["content_hash"] = self.content_hash(file_path)
+        else:
+            stat = os.stat(str(file_path))
+            entry["size"] = stat.st_size
+            entry["mtime_ns"] = stat.st_mtime_ns
+        entry.update({
+            "status": status,
+            "success": bool(success),
+            "batch_idx": batch_idx,
+            "json_path": json_path
+        })
+        with self._lock:
+            self.entries[entry["file"]] = entry
+            batch = self.batches.setdefault(batch_idx, {"json_path": json_path, "records": []})
+            batch["records"].append((entry["file"], entry["success"]))
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+
+    def track(self, batch_files, file_results, batch_idx, json_path, record_each=False):
+        """
+        배치 결과 이터러블을 감싸 각 파일의 처리 결과를 체크포인트에 기록합니다.
+
+        Args:
+            batch_files (list): 배치에 포함된 XML 파일 경로 리스트 (결과와 같은 순서)
+            file_results: process_file 결과 이터러블
+            batch_idx (int): 배치 인덱스
+            json_path (str): 배치 파일 경로
+            record_each (bool): True면 다음 결과를 요청받는 시점(이전 결과가 기록된 뒤)에 바로 기록하고,
+                False면 commit()을 호출할 때까지 기록을 미룹니다.
+
+        Yields:
+            dict: 입력과 동일한 배치 결과 항목
+        """
+        for xml_file, file_result in zip(batch_files, file_results):
+            yield file_result
+
+            # LLM 처리 실패로 XML이 비어 있는 경우에도 재처리 대상으로 기록 (배치 파일 밖에 저장된 XML은 xml_refs로 확인)
+            xml_refs = file_result.get("xml_refs") or {}
+            done = file_result["success"] and all(
+                file_result.get(f"{variant}_xml") or variant in xml_refs for variant in ("positive", "negative")
+            )
+            status = "done" if done else "failed"
+            if record_each:
+                self.record(xml_file, status, batch_idx, json_path, file_result["success"])
+            else:
+                self._pending.append((xml_file, status, batch_idx, json_path, file_result["success"]))
+
+    def commit(self):
+        """track(record_each=False)로 미뤄둔 기록을 체크포인트에 추가합니다."""
+        pending, self._pending = self._pending, []
+        for xml_file, status, batch_idx, json_path, success in pending:
+            self.record(xml_file, status, batch_idx, json_path, success)
@@ -0,0 +1,202 @@
+import os
+import re
+import hashlib
+from pathlib import Path
+
+# 배치 구성 방식 (BATCH_POLICY 환경 변수)
+# - count: BATCH_SIZE개 파일씩 배치 구성 (기본값)
+# - bytes: 파일 크기 합계가 BATCH_WEIGHT를 넘지 않도록 배치 구성
+# - segments: 예상 텍스트 조각 수 합계가 BATCH_WEIGHT를 넘지 않도록 배치 구성
+BATCH_POLICIES = ("count", "bytes", "segments")
+
+# 배치 구성 방식별 배치당 기본 작업량 (BATCH_WEIGHT가 설정되지 않은 경우)
+DEFAULT_BATCH_WEIGHTS = {"bytes": 16 * 1024 * 1024, "segments": 1000}
+
+# 예상 텍스트 조각 수 계산에 사용하는 TEXT/SIMPLE_TEXT 시작 태그 패턴
+TEXT_TAG_PATTERN = re.compile(rb"<(?:SIMPLE_)?TEXT[\s/>]")
+
+def iter_xml_files(input_path):
+    """
+    입력 경로에서 XML 파일을 찾는 즉시 하나씩 반환합니다 (os.scandir 사용).
+    디렉토리 전체를 탐색하기 전에 처리를 시작할 수 있으며, 순서는 Path.glob("**/*.xml")과 같습니다
+    (디렉토리의 파일을 먼저 반환한 뒤 하위 디렉토리를 차례로 탐색).
+    
+    Args:
+        input_path (str): 입력 파일 또는 디렉토리 경로
+    
+    Returns:
+        generator: XML 파일 경로(Path)
+    """
+    if os.path.isfile(input_path):
+        if input_path.endswith(".xml"):
+            yield Path(input_path)
+        return
+    if not os.path.isdir(input_path):
+        return
+    
+    stack = [input_path]
+    while stack:
+        directory = stack.pop()
+        subdirectories = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirectories.append(entry.path)
+                        elif entry.name.endswith(".xml") and entry.is_file():
+                            yield Path(entry.path)
+                    except OSError:
+                        continue
+        except OSError as e:
+            print(f"경고: 디렉토리를 읽을 수 없습니다: {directory} ({e})")
+            continue
+        
+        # 먼저 찾은 하위 디렉토리부터 탐색
+        stack.extend(reversed(subdirectories))
+
+def parse_shard(value):
+    """
+    샤드 지정 문자열("i/N")을 해석합니다.
+    
+    Args:
+        value (str): 샤드 번호(0부터 시작)와 전체 샤드 수 (예: "0/4")
+    
+    Returns:
+        tuple: (샤드 번호, 전체 샤드 수)
+    
+    Raises:
+        ValueError: 형식이 잘못되었거나 샤드 번호가 범위를 벗어난 경우
+    """
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"샤드는 i/N 형식이어야 합니다: {value}")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"샤드 번호는 0 이상 {count - 1} 이하여야 합니다: {value}")
+    return index, count
+
+def shard_of(file_key, shard_count):
+    """
+    파일 키(입력 디렉토리 기준 상대 경로)의 해시로 파일이 속한 샤드 번호를 계산합니다.
+    입력 디렉토리의 위치나 탐색 순서와 무관하므로 여러 서버에서 같은 결과를 얻습니다.
+    """
+    digest = hashlib.sha1(file_key.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % shard_count
+
+def iter_shard_files(xml_files, input_path, shard_index, shard_count):
+    """
+    XML 파일 중 지정한 샤드에 속한 파일만 하나씩 반환합니다.
+    
+    Args:
+        xml_files (iterable): XML 파일 경로
+        input_path (str): 입력 파일 또는 디렉토리 경로 (상대 경로 계산 기준)
+        shard_index (int): 처리할 샤드 번호 (0부터 시작)
+        shard_count (int): 전체 샤드 수
+    
+    Returns:
+        generator: 샤드에 속한 XML 파일 경로
+    """
+    input_root = input_path if os.path.isdir(input_path) else os.path.dirname(input_path)
+    for xml_file in xml_files:
+        file_key = Path(os.path.relpath(str(xml_file), input_root)).as_posix()
+        if shard_of(file_key, shard_count) == shard_index:
+            yield xml_file
+
+def estimate_segments(file_path):
+    """
+    XML 파일의 TEXT/SIMPLE_TEXT 시작 태그 수로 텍스트 조각 수를 추정합니다 (XML 파싱 없음).
+    
+    Args:
+        file_path (str): XML 파일 경로
+    
+    Returns:
+        int: 예상 텍스트 조각 수
+    """
+    with open(file_path, 'rb') as f:
+        return len(TEXT_TAG_PATTERN.findall(f.read()))
+
+class FileBatcher:
+    """
+    XML 파일을 하나씩 받아 배치로 묶는 클래스
+    
+    - count: BATCH_SIZE개 파일씩 묶습니다 (파일 순서 유지).
+    - bytes/segments: 파일 크기 또는 예상 텍스트 조각 수를 작업량으로 보고, 누적 작업량이 max_weight를 넘기 전이나
+      파일 수가 batch_size에 도달했을 때 배치를 닫아 배치마다 작업량이 비슷해지도록 합니다.
+      배치 안에서는 작업량이 큰 파일부터 처리하도록 정렬하여, 큰 파일 하나가 배치 완료 시간을 늦추지 않도록 합니다.
+    """
+
+    def __init__(self, batch_size, policy="count", max_weight=0):
+        """
+        Args:
+            batch_size (int): 배치당 최대 파일 수
+            policy (str): 배치 구성 방식 (count, bytes, segments)
+            max_weight (int): 배치당 최대 작업량 (0이면 구성 방식별 기본값, count 방식에서는 사용하지 않음)
+        """
+        if policy not in BATCH_POLICIES:
+            raise ValueError(f"지원하지 않는 배치 구성 방식입니다: {policy} (사용 가능: {', '.join(BATCH_POLICIES)})")
+        self.batch_size = max(1, batch_size)
+        self.policy = policy
+        self.max_weight = (max_weight or DEFAULT_BATCH_WEIGHTS[policy]) if policy != "count" else 0
+        self.batch_weights = []
+
+    def file_weight(self, file_path):
+        """배치 구성 방식에 따른 파일 작업량을 계산합니다 (최소 1)."""
+        try:
+            if self.policy == "bytes":
+                return max(1, os.path.getsize(file_path))
+            if self.policy == "segments":
+                return max(1, estimate_segments(file_path))
+        except OSError:
+            # 읽을 수 없는 파일은 처리 단계에서 오류로 기록됨
+            pass
+        return 1
+
+    def batches(self, xml_files):
+        """
+        파일을 배치로 묶어 배치가 완성되는 즉시 반환합니다.
+        
+        Args:
+            xml_files (iterable): XML 파일 경로 (iter_xml_files의 반환값 등)
+        
+        Returns:
+            generator: (배치 파일 리스트, 배치 작업량)
+        """
+        batch = []
+        batch_weight = 0
+        for xml_file in xml_files:
+            weight = self.file_weight(xml_file)
+            # 파일을 추가하면 최대 작업량을 넘는 경우 먼저 배치를 닫음 (작업량이 최대값보다 큰 파일은 단독 배치)
+            if batch and self.max_weight and batch_weight + weight > self.max_weight:
+                yield self.close_batch(batch, batch_weight)
+                batch = []
+                batch_weight = 0
+            batch.append((weight, xml_file))
+            batch_weight += weight
+            if len(batch) >= self.batch_size:
+                yield self.close_batch(batch, batch_weight)
+                batch = []
+                batch_weight = 0
+        if batch:
+            yield self.close_batch(batch, batch_weight)
+
+    def close_batch(self, batch, batch_weight):
+        """배치를 닫고 처리 순서대로 정렬된 파일 리스트를 반환합니다."""
+        if self.policy != "count":
+            # 작업량이 큰 파일부터 처리 (작업량이 같으면 발견 순서 유지)
+            batch = sorted(batch, key=lambda item: -item[0])
+        self.batch_weights.append(batch_weight)
+        return [xml_file for _, xml_file in batch], batch_weight
+
+    def stats(self):
+        """배치 구성 통계를 반환합니다."""
+        weights = self.batch_weights
+        return {
+            "policy": self.policy,
+            "max_files": self.batch_size,
+            "weight_limit": self.max_weight or None,
+            "batches": len(weights),
+            "min_weight": min(weights) if weights else 0,
+            "max_weight": max(weights) if weights else 0,
+            "mean_weight": round(sum(weights) / len(weights), 3) if weights else 0.0
+        }
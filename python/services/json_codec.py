@@ -0,0 +1,37 @@
+import os
+import json
+
+# 사용할 JSON 코덱 (JSON_CODEC 환경 변수로 처음 사용할 때 결정)
+_codec = None
+
+def get_codec():
+    """
+    SIMPLE_TEXT TextBody JSON 처리에 사용할 코덱을 반환합니다.
+    JSON_CODEC=orjson이면 orjson을 사용하고, 설치되어 있지 않으면 표준 json 모듈을 사용합니다.
+    
+    Returns:
+        tuple: (코덱 이름, loads 함수, dumps 함수)
+    """
+    global _codec
+    if _codec is not None:
+        return _codec
+    
+    codec_name = os.getenv('JSON_CODEC', 'json').lower()
+    if codec_name == 'orjson':
+        try:
+            import orjson
+            _codec = ('orjson', orjson.loads, lambda data: orjson.dumps(data).decode('utf-8'))
+            return _codec
+        except ImportError:
+            print("orjson 모듈을 찾을 수 없어 기본 json 모듈을 사용합니다.")
+    
+    _codec = ('json', json.loads, lambda data: json.dumps(data, ensure_ascii=False))
+    return _codec
+
+def loads(text):
+    """JSON 문자열을 파싱합니다."""
+    return get_codec()[1](text)
+
+def dumps(data):
+    """데이터를 JSON 문자열로 변환합니다 (ensure_ascii=False와 동일하게 비ASCII 문자를 그대로 유지)."""
+    return get_codec()[2](data)
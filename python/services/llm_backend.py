@@ -0,0 +1,248 @@
+import os
+import sys
+import json
+import hashlib
+import threading
+import http.client
+from urllib.parse import urlsplit
+
+from python.config import load_env_result
+
+# workflow.py 파일 경로 설정 (환경 변수 또는 상대 경로 사용)
+WORKFLOW_PATH = os.environ.get(
+    "WORKFLOW_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                "prompt", "ailabs-context-aware-retrieval-eval-dataset", "src")
+)
+
+# 사용할 수 있는 백엔드 이름 (LLM_BACKEND 환경 변수)
+BACKEND_NAMES = ("workflow", "http", "record", "replay")
+
+# HTTP 백엔드 기본 주소 (python -m python.mock_llm_server 기본 주소)
+DEFAULT_HTTP_URL = "http://127.0.0.1:8765/process_text"
+
+class LLMHTTPError(Exception):
+    """HTTP 백엔드의 오류 응답 (RateController가 상태 코드와 Retry-After로 재시도 여부를 판단)"""
+
+    def __init__(self, status_code, message, retry_after=None):
+        super().__init__(f"HTTP {status_code}: {message}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+class WorkflowBackend:
+    """
+    프롬프트 서브모듈의 workflow.process_text를 호출하는 백엔드 (기본값)
+    
+    workflow는 langchain/langgraph/openai를 함께 임포트하므로 처음 호출할 때 임포트하며,
+    workflow가 사용하는 .env(OPENAI_API_KEY)도 이때 로드합니다 (process()를 직접 호출하는 경우 포함).
+    """
+    
+    name = "workflow"
+
+    def __init__(self, workflow_path=WORKFLOW_PATH):
+        self.workflow_path = workflow_path
+        self._process_text = None
+        self._lock = threading.Lock()
+
+    def process_text(self, combined_text):
+        if self._process_text is None:
+            with self._lock:
+                if self._process_text is None:
+                    # .env 로드 (main.py에서 이미 로드한 경우 다시 로드하지 않음)
+                    env_result = load_env_result()
+                    if not env_result.get("success", False):
+                        print(f"경고: 환경 변수 로드 실패 - {env_result.get('message', '알 수 없는 오류')}")
+                    
+                    # workflow.py 모듈 경로를 sys.path에 추가
+                    if self.workflow_path not in sys.path:
+                        sys.path.append(self.workflow_path)
+                    
+                    from workflow import process_text
+                    self._process_text = process_text
+        return self._process_text(combined_text)
+
+class HTTPBackend:
+    """
+    HTTP 서버에 결합된 텍스트를 POST로 보내고 JSON 응답을 process_text 결과로 사용하는 백엔드
+    
+    요청 본문은 {"text": 결합된 텍스트}이며, 스레드마다 keep-alive 연결을 재사용합니다.
+    부하 테스트용 로컬 서버(python -m python.mock_llm_server)와 함께 사용합니다.
+    """
+    
+    name = "http"
+
+    def __init__(self, url=DEFAULT_HTTP_URL, timeout=60.0):
+        """
+        Args:
+            url (str): 요청 주소 (http:// 또는 https://)
+            timeout (float): 요청 제한 시간 (초)
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"지원하지 않는 LLM 백엔드 주소입니다: {url}")
+        self.url = url
+        self.timeout = timeout
+        self.host = parts.netloc
+        self.path = parts.path or "/"
+        if parts.query:
+            self.path += "?" + parts.query
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self._local = threading.local()
+
+    def process_text(self, combined_text):
+        body = json.dumps({"text": combined_text}, ensure_ascii=False).encode("utf-8")
+        headers = {"Content-Type": "application/json; charset=utf-8"}
+        
+        # 끊어진 keep-alive 연결은 한 번만 다시 연결
+        for attempt in range(2):
+            connection = self.connection()
+            try:
+                connection.request("POST", self.path, body=body, headers=headers)
+                response = connection.getresponse()
+                payload = response.read()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                self.close_connection()
+                if attempt:
+                    raise
+            except Exception:
+                self.close_connection()
+                raise
+        
+        if response.status != 200:
+            raise LLMHTTPError(
+                response.status, payload.decode("utf-8", errors="replace")[:200], response.getheader("Retry-After")
+            )
+        return json.loads(payload)
+
+    def connection(self):
+        """현재 스레드의 HTTP 연결을 반환합니다 (없으면 생성)."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self.connection_class(self.host, timeout=self.timeout)
+            self._local.connection = connection
+        return connection
+
+    def close_connection(self):
+        """현재 스레드의 HTTP 연결을 닫습니다."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+class RecordReplayBackend:
+    """
+    process_text 응답을 JSONL 파일에 기록(record)하거나 기록된 응답을 재생(replay)하는 백엔드
+    
+    응답은 결합된 텍스트의 SHA-256 해시로 찾으며, 재생 시 기록되지 않은 텍스트는 오류로 처리합니다.
+    한 번 기록한 응답으로 API 키와 네트워크 없이 전체 파이프라인을 반복 실행할 수 있습니다.
+    """
+
+    def __init__(self, path, mode="replay", source=None):
+        """
+        Args:
+            path (str): 응답 기록 JSONL 파일 경로
+            mode (str): "record" (source 백엔드를 호출하고 응답 기록) 또는 "replay" (기록된 응답만 사용)
+            source: record 모드에서 실제로 호출할 백엔드
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"지원하지 않는 기록/재생 모드입니다: {mode}")
+        if mode == "record" and source is None:
+            raise ValueError("record 모드에는 응답을 받아올 백엔드가 필요합니다.")
+        self.name = mode
+        self.path = path
+        self.mode = mode
+        self.source = source
+        self.responses = {}
+        self._lock = threading.Lock()
+        
+        # 기존 기록 로드 (record 모드에서는 이미 기록된 텍스트를 다시 요청하지 않음)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 중단된 실행이 남긴 마지막 줄은 무시
+                        continue
+                    self.responses[entry["key"]] = entry["result"]
+        elif mode == "replay":
+            raise FileNotFoundError(f"응답 기록 파일을 찾을 수 없습니다: {path}")
+
+    @staticmethod
+    def make_key(combined_text):
+        """결합된 텍스트의 기록 키를 계산합니다."""
+        return hashlib.sha256(combined_text.encode("utf-8")).hexdigest()
+
+    def process_text(self, combined_text):
+        key = self.make_key(combined_text)
+        with self._lock:
+            if key in self.responses:
+                return self.responses[key]
+        
+        if self.mode == "replay":
+            raise LookupError(f"기록된 응답이 없습니다 (key={key[:12]}). record 모드로 먼저 실행하세요.")
+        
+        result = self.source.process_text(combined_text)
+        with self._lock:
+            if key not in self.responses:
+                self.responses[key] = result
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({"key": key, "result": result}, ensure_ascii=False) + "\n")
+        return result
+
+def create_backend(name=None):
+    """
+    환경 변수 설정에 따라 LLM 백엔드를 생성합니다.
+    
+    - workflow: workflow.process_text (기본값)
+    - http: LLM_HTTP_URL로 요청 (LLM_HTTP_TIMEOUT초 제한)
+    - record: LLM_RECORD_SOURCE(workflow 또는 http) 백엔드의 응답을 LLM_RECORD_PATH에 기록
+    - replay: LLM_RECORD_PATH에 기록된 응답만 사용
+    
+    Args:
+        name (str): 백엔드 이름 (없으면 LLM_BACKEND 환경 변수, 기본값: workflow)
+    
+    Returns:
+        process_text(combined_text) 메서드를 가진 백엔드 객체
+    """
+    name = (name or os.getenv('LLM_BACKEND') or "workflow").lower()
+    if name == "workflow":
+        return WorkflowBackend()
+    if name == "http":
+        return HTTPBackend(
+            os.getenv('LLM_HTTP_URL', DEFAULT_HTTP_URL), timeout=float(os.getenv('LLM_HTTP_TIMEOUT', '60'))
+        )
+    if name in ("record", "replay"):
+        record_path = os.getenv('LLM_RECORD_PATH')
+        if not record_path:
+            raise ValueError("record/replay 백엔드에는 LLM_RECORD_PATH 설정이 필요합니다.")
+        source = None
+        if name == "record":
+            source_name = os.getenv('LLM_RECORD_SOURCE', 'workflow').lower()
+            if source_name not in ("workflow", "http"):
+                raise ValueError(f"기록할 수 없는 LLM 백엔드입니다: {source_name}")
+            source = create_backend(source_name)
+        return RecordReplayBackend(record_path, mode=name, source=source)
+    raise ValueError(f"지원하지 않는 LLM 백엔드입니다: {name} (사용 가능: {', '.join(BACKEND_NAMES)})")
+
+# 기본 백엔드 (get_backend에서 처음 사용할 때 생성)
+_default_backend = None
+_default_backend_lock = threading.Lock()
+
+def get_backend():
+    """
+    LLM_BACKEND 환경 변수로 선택한 기본 백엔드를 반환합니다 (프로세스마다 한 번만 생성).
+    
+    Returns:
+        process_text(combined_text) 메서드를 가진 백엔드 객체
+    """
+    global _default_backend
+    if _default_backend is None:
+        with _default_backend_lock:
+            if _default_backend is None:
+                _default_backend = create_backend()
+    return _default_backend
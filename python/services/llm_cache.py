@@ -0,0 +1,224 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+# 캐시 키 계산에 포함할 워크플로우 소스 파일 확장자
+FINGERPRINT_SUFFIXES = ('.py', '.yaml', '.yml', '.json', '.txt')
+
+# 캐시 키 계산에 포함할 모델 설정 환경 변수 (LLM 백엔드가 다르면 응답도 다르므로 함께 포함)
+MODEL_SETTING_KEYS = ('OPENAI_MODEL', 'LLM_MODEL', 'LLM_TEMPERATURE', 'LLM_BACKEND', 'LLM_HTTP_URL')
+
+def workflow_fingerprint(workflow_path):
+    """
+    워크플로우(프롬프트) 소스 파일의 내용을 해시하여 버전 문자열을 생성합니다.
+    프롬프트나 워크플로우 코드가 바뀌면 캐시 키도 함께 바뀝니다.
+
+    Args:
+        workflow_path (str): workflow.py가 위치한 디렉토리 경로
+
+    Returns:
+        str: 소스 파일 내용의 SHA-256 해시 (디렉토리가 없으면 빈 문자열)
+    """
+    if not workflow_path or not os.path.isdir(workflow_path):
+        return ""
+
+    digest = hashlib.sha256()
+    for dir_path, dir_names, file_names in os.walk(workflow_path):
+        # 탐색 순서를 고정하고 캐시 디렉토리는 제외
+        dir_names[:] = sorted(name for name in dir_names if name != '__pycache__' and not name.startswith('.'))
+        for file_name in sorted(file_names):
+            if not file_name.endswith(FINGERPRINT_SUFFIXES):
+                continue
+            file_path = os.path.join(dir_path, file_name)
+            digest.update(os.path.relpath(file_path, workflow_path).encode('utf-8'))
+            with open(file_path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+def model_settings_from_env():
+    """환경 변수에서 캐시 키에 포함할 모델 설정을 읽어옵니다."""
+    return {key: os.getenv(key) for key in MODEL_SETTING_KEYS if os.getenv(key) is not None}
+
+class LLMCache:
+    """
+    process_text 응답을 SQLite 파일에 저장하는 내용 주소 기반(content-addressed) 캐시
+
+    캐시 키는 결합된 텍스트, 프롬프트/워크플로우 버전, 모델 설정을 함께 해시하여 만듭니다.
+    여러 스레드에서 동시에 사용할 수 있습니다.
+    """
+
+    def __init__(self, db_path, version="", settings=None, max_entries=100000, max_bytes=0, max_age_seconds=0):
+        """
+        Args:
+            db_path (str): SQLite 캐시 파일 경로
+            version (str): 프롬프트/워크플로우 버전
+            settings (dict): 모델 설정
+            max_entries (int): 최대 보관 항목 수 (0이면 제한 없음)
+            max_bytes (int): 최대 보관 크기(바이트) (0이면 제한 없음)
+            max_age_seconds (float): 항목 최대 보관 기간(초) (0이면 제한 없음)
+        """
+        self.db_path = db_path
+        self.version = version
+        self.settings = settings or {}
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self._lock = threading.Lock()
+
+        # 버전과 모델 설정은 모든 키에 공통이므로 미리 직렬화
+        self._key_prefix = json.dumps(
+            {"version": self.version, "settings": self.settings},
+            ensure_ascii=False, sort_keys=True
+        ).encode('utf-8')
+
+        cache_dir = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, "
+            "value TEXT NOT NULL, "
+            "size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, "
+            "accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self._conn.commit()
+
+        # 오래된 항목 정리
+        self.evict()
+
+    def make_key(self, text):
+        """결합된 텍스트에 대한 캐시 키를 생성합니다."""
+        digest = hashlib.sha256(self._key_prefix)
+        digest.update(b"\0")
+        digest.update(text.encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, text):
+        """
+        캐시된 응답을 조회합니다.
+
+        Args:
+            text (str): process_text에 전달할 결합된 텍스트
+
+        Returns:
+            캐시된 process_text 결과 (없으면 None)
+        """
+        key = self.make_key(text)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is not None and self.max_age_seconds and now - row[1] > self.max_age_seconds:
+                # 만료된 항목은 삭제하고 미스로 처리
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.evicted += 1
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+
+        return json.loads(row[0])
+
+    def set(self, text, result):
+        """
+        process_text 결과를 캐시에 저장합니다.
+
+        Args:
+            text (str): process_text에 전달한 결합된 텍스트
+            result: process_text 결과 (JSON 직렬화 가능해야 함)
+        """
+        key = self.make_key(text)
+        value = json.dumps(result, ensure_ascii=False)
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value.encode('utf-8')), now, now)
+            )
+            self._conn.commit()
+
+    def evict(self):
+        """보관 기간, 항목 수, 전체 크기 제한에 따라 캐시 항목을 정리합니다."""
+        with self._lock:
+            removed = 0
+
+            # 보관 기간이 지난 항목 삭제
+            if self.max_age_seconds:
+                cursor = self._conn.execute(
+                    "DELETE FROM responses WHERE created_at < ?", (time.time() - self.max_age_seconds,)
+                )
+                removed += cursor.rowcount
+
+            # 항목 수 제한 초과 시 가장 오래 사용되지 않은 항목부터 삭제
+            if self.max_entries:
+                count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+                if count > self.max_entries:
+                    cursor = self._conn.execute(
+                        "DELETE FROM responses WHERE key IN "
+                        "(SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                        (count - self.max_entries,)
+                    )
+                    removed += cursor.rowcount
+
+            # 전체 크기 제한 초과 시 가장 오래 사용되지 않은 항목부터 삭제
+            if self.max_bytes:
+                total_size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+                if total_size > self.max_bytes:
+                    excess = total_size - self.max_bytes
+                    stale_keys = []
+                    for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at ASC"):
+                        stale_keys.append((key,))
+                        excess -= size
+                        if excess <= 0:
+                            break
+                    self._conn.executemany("DELETE FROM responses WHERE key = ?", stale_keys)
+                    removed += len(stale_keys)
+
+            self._conn.commit()
+            self.evicted += removed
+
+        return removed
+
+    def stats(self):
+        """캐시 적중/미스 통계를 반환합니다."""
+        with self._lock:
+            entries, total_size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+
+        lookups = self.hits + self.misses
+        return {
+            "path": self.db_path,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evicted": self.evicted,
+            "entries": entries,
+            "size_bytes": total_size
+        }
+
+    def close(self):
+        """캐시를 정리하고 연결을 닫습니다."""
+        self.evict()
+        with self._lock:
+            self._conn.close()
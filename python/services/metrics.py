@@ -0,0 +1,186 @@
+import os
+import json
+import math
+import time
+import threading
+from contextlib import contextmanager
+
+# 실행 보고서 파일명 (출력 디렉토리에 생성)
+RUN_REPORT_FILE_NAME = "run_report.json"
+
+# Prometheus 메트릭 이름 접두사
+PROMETHEUS_PREFIX = "xml_transformer"
+
+@contextmanager
+def timed(timings, stage):
+    """
+    블록 실행 시간을 timings 딕셔너리의 해당 단계에 더합니다.
+    
+    Args:
+        timings (dict): 단계 이름 -> 누적 소요 시간 (초)
+        stage (str): 단계 이름
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
+def percentile(sorted_values, q):
+    """정렬된 값 리스트에서 백분위수를 계산합니다 (nearest-rank)."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def summarize(values):
+    """
+    소요 시간(초) 리스트의 통계를 밀리초 단위로 계산합니다.
+    
+    Args:
+        values (list): 소요 시간 리스트 (초)
+    
+    Returns:
+        dict: count, total_ms, mean_ms, p50_ms, p95_ms, p99_ms, max_ms
+    """
+    values = sorted(values)
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "total_ms": round(sum(values) * 1000, 3),
+        "mean_ms": round(sum(values) / len(values) * 1000, 3),
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3)
+    }
+
+class Metrics:
+    """
+    처리 단계별 소요 시간과 이벤트 횟수를 수집하는 클래스
+    
+    단계별 소요 시간은 전체와 배치별로 나누어 보관하며, p50/p95/p99 통계를 포함한
+    실행 보고서(JSON)와 Prometheus textfile 형식으로 내보낼 수 있습니다.
+    """
+
+    def __init__(self):
+        self.timings = {}
+        self.batch_timings = {}
+        self.counters = {}
+        # 현재 처리 중인 배치 인덱스 (process()의 배치 루프에서 설정)
+        self.current_batch = None
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        """단계 하나의 소요 시간을 기록합니다."""
+        with self._lock:
+            self.timings.setdefault(stage, []).append(seconds)
+            if self.current_batch is not None:
+                self.batch_timings.setdefault(self.current_batch, {}).setdefault(stage, []).append(seconds)
+
+    def record(self, timings):
+        """
+        파일 하나를 처리하며 측정한 단계별 소요 시간을 기록합니다.
+        
+        Args:
+            timings (dict): 단계 이름 -> 소요 시간 (초)
+        """
+        for stage, seconds in timings.items():
+            self.observe(stage, seconds)
+
+    def increment(self, name, value=1):
+        """이벤트 횟수를 증가시킵니다."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def add_counters(self, counters):
+        """여러 이벤트 횟수를 한 번에 더합니다."""
+        for name, value in counters.items():
+            self.increment(name, value)
+
+    @contextmanager
+    def timer(self, stage):
+        """블록 실행 시간을 단계 소요 시간으로 기록합니다."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def report(self):
+        """
+        실행 보고서를 생성합니다.
+        
+        Returns:
+            dict: elapsed_seconds, stages (단계별 통계), batches (배치별 단계 통계), counters
+        """
+        with self._lock:
+            timings = {stage: list(values) for stage, values in self.timings.items()}
+            batch_timings = {
+                batch_idx: {stage: list(values) for stage, values in stages.items()}
+                for batch_idx, stages in self.batch_timings.items()
+            }
+            counters = dict(self.counters)
+        
+        return {
+            "elapsed_seconds": round(time.time() - self.started_at, 3),
+            "stages": {stage: summarize(values) for stage, values in timings.items()},
+            "batches": {
+                str(batch_idx): {stage: summarize(values) for stage, values in stages.items()}
+                for batch_idx, stages in sorted(batch_timings.items())
+            },
+            "counters": counters
+        }
+
+    def write_json(self, path, report=None):
+        """실행 보고서를 JSON 파일로 저장합니다."""
+        report = report or self.report()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    def write_prometheus(self, path, report=None):
+        """
+        실행 보고서를 Prometheus textfile collector 형식으로 저장합니다.
+        수집기가 작성 중인 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체합니다.
+        
+        Args:
+            path (str): .prom 파일 경로
+            report (dict): report()의 반환값 (없으면 새로 생성)
+        """
+        report = report or self.report()
+        lines = [
+            f"# HELP {PROMETHEUS_PREFIX}_stage_seconds 처리 단계별 소요 시간",
+            f"# TYPE {PROMETHEUS_PREFIX}_stage_seconds summary"
+        ]
+        for stage, stats in report["stages"].items():
+            if not stats["count"]:
+                continue
+            for quantile, key in (("0.5", "p50_ms"), ("0.95", "p95_ms"), ("0.99", "p99_ms")):
+                lines.append(f'{PROMETHEUS_PREFIX}_stage_seconds{{stage="{stage}",quantile="{quantile}"}} {stats[key] / 1000:g}')
+            lines.append(f'{PROMETHEUS_PREFIX}_stage_seconds_sum{{stage="{stage}"}} {stats["total_ms"] / 1000:g}')
+            lines.append(f'{PROMETHEUS_PREFIX}_stage_seconds_count{{stage="{stage}"}} {stats["count"]}')
+        
+        lines.append(f"# HELP {PROMETHEUS_PREFIX}_events_total 처리 이벤트 횟수")
+        lines.append(f"# TYPE {PROMETHEUS_PREFIX}_events_total counter")
+        for name, value in sorted(report["counters"].items()):
+            lines.append(f'{PROMETHEUS_PREFIX}_events_total{{event="{name}"}} {value}')
+        
+        # LLM 요청 제어 상태 (process.py에서 보고서에 추가한 경우)
+        rate_control = report.get("rate_control") or {}
+        numeric_values = [(name, value) for name, value in sorted(rate_control.items()) if isinstance(value, (int, float))]
+        if numeric_values:
+            lines.append(f"# HELP {PROMETHEUS_PREFIX}_rate_control LLM 요청 제어 상태 (동시 실행 수 상한, 재시도 횟수 등)")
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}_rate_control gauge")
+            for name, value in numeric_values:
+                lines.append(f'{PROMETHEUS_PREFIX}_rate_control{{name="{name}"}} {value}')
+        
+        lines.append(f"# HELP {PROMETHEUS_PREFIX}_run_elapsed_seconds 전체 실행 시간")
+        lines.append(f"# TYPE {PROMETHEUS_PREFIX}_run_elapsed_seconds gauge")
+        lines.append(f"{PROMETHEUS_PREFIX}_run_elapsed_seconds {report['elapsed_seconds']}")
+        
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(temp_path, path)
@@ -0,0 +1,303 @@
+import re
+import time
+import random
+import threading
+
+# 요청 제한(throttling)으로 판단하는 예외 클래스 이름 (OpenAI SDK 등, 상위 클래스 포함 정확히 일치)
+THROTTLE_ERROR_NAMES = ("RateLimitError", "TooManyRequests")
+
+# 일시적인 오류로 판단하는 예외 클래스 이름 (TimeoutError/ConnectionError를 상속하지 않는 SDK 예외)
+TRANSIENT_ERROR_NAMES = (
+    "APITimeoutError", "APIConnectionError", "InternalServerError", "ServiceUnavailableError",
+    "Timeout", "ReadTimeout", "ConnectTimeout", "RemoteProtocolError"
+)
+
+# 재시도할 HTTP 상태 코드 (429 제외)
+TRANSIENT_STATUS_CODES = (408, 409, 500, 502, 503, 504)
+
+# 상태 코드나 예외 종류로 판단할 수 없는 경우에만 사용하는 오류 메시지 패턴
+# 숫자는 "HTTP 429", "status code: 503", "Error code: 429"처럼 상태 코드로 표기된 경우만 인식 (ID나 파일 경로의 숫자는 무시)
+STATUS_CODE_PATTERN = re.compile(r"\b(?:http|status(?: code)?|error code)\s*:?\s*(\d{3})\b", re.IGNORECASE)
+THROTTLE_MESSAGE_PATTERN = re.compile(r"\b(?:rate limit(?:ed| exceeded| reached)|too many requests)\b", re.IGNORECASE)
+TRANSIENT_MESSAGE_PATTERN = re.compile(
+    r"\b(?:request timed out|connection (?:reset|refused|aborted)|temporarily unavailable|service unavailable|"
+    r"server is overloaded)\b",
+    re.IGNORECASE
+)
+
+def error_status_code(error):
+    """예외 또는 예외의 응답 객체에 포함된 HTTP 상태 코드를 반환합니다 (없으면 None)."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(error, "status", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+def classify_status_code(status):
+    """HTTP 상태 코드를 재시도 여부에 따라 분류합니다."""
+    if status == 429:
+        return "throttle"
+    if status in TRANSIENT_STATUS_CODES:
+        return "transient"
+    return None
+
+def classify_error(error):
+    """
+    process_text 호출 오류를 재시도 여부에 따라 분류합니다.
+    HTTP 상태 코드 속성과 예외 종류로 먼저 판단하고, 판단할 수 없는 경우에만 엄격한 오류 메시지 패턴을 사용합니다.
+    
+    Args:
+        error (Exception): process_text에서 발생한 예외
+    
+    Returns:
+        str: "throttle" (요청 제한), "transient" (일시적인 오류) 또는 None (재시도하지 않음)
+    """
+    status = error_status_code(error)
+    if status is not None:
+        return classify_status_code(status)
+    
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return "transient"
+    class_names = {cls.__name__ for cls in type(error).__mro__}
+    if class_names.intersection(THROTTLE_ERROR_NAMES):
+        return "throttle"
+    if class_names.intersection(TRANSIENT_ERROR_NAMES):
+        return "transient"
+    
+    message = str(error)
+    match = STATUS_CODE_PATTERN.search(message)
+    if match:
+        kind = classify_status_code(int(match.group(1)))
+        if kind is not None:
+            return kind
+    if THROTTLE_MESSAGE_PATTERN.search(message):
+        return "throttle"
+    if TRANSIENT_MESSAGE_PATTERN.search(message):
+        return "transient"
+    return None
+
+def retry_after_seconds(error):
+    """예외의 응답 헤더에 Retry-After가 있으면 대기 시간(초)을 반환합니다 (없으면 None)."""
+    value = getattr(error, "retry_after", None)
+    if value is None:
+        headers = getattr(getattr(error, "response", None), "headers", None)
+        if headers is not None:
+            try:
+                value = headers.get("retry-after") or headers.get("Retry-After")
+            except Exception:
+                value = None
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+class RateController:
+    """
+    process_text 호출의 동시 실행 수, 재시도, 서킷 브레이커를 관리하는 클래스
+    
+    - 요청 제한/일시적인 오류는 지수 백오프(full jitter)로 재시도하고, 재시도 횟수를 넘으면 예외를 다시 발생시킵니다.
+    - 동시 실행 수는 AIMD 방식으로 조절합니다: 성공 시 조금씩 늘리고(additive increase),
+      요청 제한 응답이나 목표 지연 시간 초과 시 줄입니다(multiplicative decrease).
+    - 연속 실패가 임계값에 도달하면 서킷 브레이커가 열려 대기 시간 동안 새 요청을 보내지 않고,
+      이후 요청 하나로 상태를 확인한 뒤 성공하면 다시 닫힙니다.
+    """
+    
+    # 요청 제한 응답 시 동시 실행 수 감소 비율
+    THROTTLE_DECREASE = 0.5
+    # 목표 지연 시간 초과 시 동시 실행 수 감소 비율
+    LATENCY_DECREASE = 0.9
+
+    def __init__(self, max_concurrency=1, max_retries=5, base_delay=1.0, max_delay=60.0, latency_target=0.0,
+                 breaker_threshold=5, breaker_cooldown=30.0):
+        """
+        Args:
+            max_concurrency (int): 최대 동시 실행 수 (동시 실행 수 조절의 상한)
+            max_retries (int): 요청 하나의 최대 재시도 횟수
+            base_delay (float): 첫 재시도의 최대 대기 시간 (초)
+            max_delay (float): 재시도 대기 시간 상한 (초)
+            latency_target (float): 목표 지연 시간 (초, 0이면 지연 시간으로 조절하지 않음)
+            breaker_threshold (int): 서킷 브레이커를 여는 연속 실패 횟수 (0이면 사용하지 않음)
+            breaker_cooldown (float): 서킷 브레이커가 열린 뒤 요청을 다시 보내기까지의 대기 시간 (초)
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max(0, max_retries)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.latency_target = latency_target
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        
+        # 현재 동시 실행 수 상한 (실수로 관리하고 정수 부분만 사용)
+        self.limit = float(self.max_concurrency)
+        self.min_limit = self.limit
+        self.in_flight = 0
+        self.consecutive_failures = 0
+        self.breaker_open_until = 0.0
+        # 마지막으로 동시 실행 수를 줄인 시각 (그 이전에 시작된 요청의 신호로는 다시 줄이지 않음)
+        self.last_decrease = 0.0
+        
+        self.requests = 0
+        self.successes = 0
+        self.retries = 0
+        self.throttled = 0
+        self.transient_errors = 0
+        self.failures = 0
+        self.breaker_opened = 0
+        self.latency_total = 0.0
+        
+        self._random = random.Random()
+        self._condition = threading.Condition()
+
+    def call(self, func, *args):
+        """
+        동시 실행 수와 서킷 브레이커 상태에 따라 func를 호출하고, 재시도할 수 있는 오류는 백오프 후 다시 호출합니다.
+        
+        Args:
+            func: 호출할 함수 (process_text)
+            *args: func에 전달할 인자
+        
+        Returns:
+            func의 반환값
+        
+        Raises:
+            Exception: 재시도하지 않는 오류이거나 최대 재시도 횟수를 넘은 경우 마지막 예외
+        """
+        for attempt in range(self.max_retries + 1):
+            started = self.acquire()
+            try:
+                result = func(*args)
+            except Exception as e:
+                kind = classify_error(e)
+                self.release(started, kind or "error")
+                if kind is None or attempt == self.max_retries:
+                    with self._condition:
+                        self.failures += 1
+                    raise
+                
+                delay = self.backoff_delay(attempt, retry_after_seconds(e))
+                with self._condition:
+                    self.retries += 1
+                print(f"LLM 요청 재시도 {attempt + 1}/{self.max_retries} ({delay:.1f}초 후): {e}")
+                time.sleep(delay)
+            else:
+                self.release(started, "success")
+                return result
+
+    def backoff_delay(self, attempt, retry_after=None):
+        """
+        재시도 대기 시간을 계산합니다 (full jitter).
+        
+        Args:
+            attempt (int): 지금까지 실패한 횟수 - 1
+            retry_after (float): 서버가 지정한 대기 시간 (초, 선택 사항)
+        
+        Returns:
+            float: 대기 시간 (초)
+        """
+        delay = self._random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, min(self.max_delay, retry_after))
+        return delay
+
+    def acquire(self):
+        """
+        서킷 브레이커가 닫혀 있고 동시 실행 수가 상한보다 작을 때까지 기다린 뒤 실행 슬롯을 얻습니다.
+        
+        Returns:
+            float: 요청 시작 시각 (time.monotonic)
+        """
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                if self.breaker_open_until > now:
+                    self._condition.wait(self.breaker_open_until - now)
+                    continue
+                if self.in_flight < max(1, int(self.limit)):
+                    break
+                self._condition.wait()
+            self.in_flight += 1
+            self.requests += 1
+            return time.monotonic()
+
+    def release(self, started, outcome):
+        """
+        실행 슬롯을 반환하고 결과에 따라 동시 실행 수와 서킷 브레이커 상태를 갱신합니다.
+        
+        Args:
+            started (float): acquire의 반환값
+            outcome (str): "success", "throttle", "transient" 또는 "error"
+        """
+        now = time.monotonic()
+        latency = now - started
+        with self._condition:
+            self.in_flight -= 1
+            
+            if outcome == "success":
+                self.successes += 1
+                self.latency_total += latency
+                self.consecutive_failures = 0
+                if self.latency_target and latency > self.latency_target:
+                    self.decrease(started, now, self.LATENCY_DECREASE)
+                else:
+                    # 동시 실행 수만큼 성공하면 1 증가
+                    self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+            elif outcome in ("throttle", "transient"):
+                if outcome == "throttle":
+                    self.throttled += 1
+                    self.decrease(started, now, self.THROTTLE_DECREASE)
+                else:
+                    self.transient_errors += 1
+                self.consecutive_failures += 1
+                if self.breaker_threshold and self.consecutive_failures >= self.breaker_threshold:
+                    self.open_breaker(now)
+            
+            self._condition.notify_all()
+
+    def decrease(self, started, now, factor):
+        """
+        동시 실행 수를 줄입니다 (호출자가 lock을 보유).
+        마지막으로 줄인 뒤에 시작된 요청의 신호만 반영하여, 동시에 실패한 요청들로 여러 번 줄이지 않습니다.
+        """
+        if started < self.last_decrease:
+            return
+        self.limit = max(1.0, self.limit * factor)
+        self.min_limit = min(self.min_limit, self.limit)
+        self.last_decrease = now
+
+    def open_breaker(self, now):
+        """서킷 브레이커를 엽니다 (호출자가 lock을 보유). 다시 닫힐 때까지 요청을 하나씩만 보냅니다."""
+        if self.breaker_open_until <= now:
+            self.breaker_opened += 1
+            # 닫힌 상태에서 열릴 때만 출력 (확인 요청 실패로 다시 열리는 경우 제외)
+            if self.consecutive_failures == self.breaker_threshold:
+                print(f"LLM 요청이 연속 {self.consecutive_failures}회 실패하여 {self.breaker_cooldown}초 동안 요청을 중단합니다.")
+        self.breaker_open_until = now + self.breaker_cooldown
+        self.limit = 1.0
+        self.min_limit = 1.0
+
+    def state(self):
+        """서킷 브레이커 상태를 반환합니다 (closed, open, half_open)."""
+        if self.breaker_open_until > time.monotonic():
+            return "open"
+        if self.breaker_threshold and self.consecutive_failures >= self.breaker_threshold:
+            return "half_open"
+        return "closed"
+
+    def stats(self):
+        """요청 제어 상태와 통계를 반환합니다."""
+        with self._condition:
+            return {
+                "breaker_state": self.state(),
+                "concurrency_limit": int(self.limit),
+                "min_concurrency_limit": int(self.min_limit),
+                "max_concurrency": self.max_concurrency,
+                "requests": self.requests,
+                "successes": self.successes,
+                "retries": self.retries,
+                "throttled": self.throttled,
+                "transient_errors": self.transient_errors,
+                "failures": self.failures,
+                "breaker_opened": self.breaker_opened,
+                "mean_latency_ms": round(self.latency_total / self.successes * 1000, 3) if self.successes else 0.0
+            }
@@ -0,0 +1,96 @@
+from python.services.xml_processor import combine_texts, split_processed_text
+
+class RequestCoalescer:
+    """
+    텍스트가 적은 여러 페이지의 요청을 하나의 process_text 요청으로 묶는 클래스
+    
+    연속된 요청을 결합된 텍스트 길이가 최대 글자 수를 넘지 않는 범위에서 하나로 합치고,
+    응답은 각 요청의 텍스트 조각 위치에 따라 다시 나누어 원래 요청별 결과로 되돌립니다.
+    """
+
+    def __init__(self, max_chars):
+        """
+        Args:
+            max_chars (int): 묶인 요청 하나의 최대 글자 수 (결합된 텍스트 기준)
+        """
+        self.max_chars = max_chars
+        self.requests_in = 0
+        self.requests_out = 0
+
+    def coalesce(self, requests):
+        """
+        연속된 요청을 최대 글자 수 이내로 묶습니다.
+        최대 글자 수보다 긴 요청은 단독으로 보냅니다.
+        
+        Args:
+            requests (list): 요청별 텍스트 조각 리스트
+        
+        Returns:
+            list: (묶인 텍스트 조각 리스트, [(요청 인덱스, 시작 위치, 끝 위치), ...]) 튜플의 리스트
+        """
+        # 요청을 묶을 때 사이에 추가되는 구분자 길이
+        separator_chars = len(combine_texts(["", ""]))
+        
+        groups = []
+        group_texts = []
+        group_members = []
+        group_chars = 0
+        for request_idx, text_list in enumerate(requests):
+            request_chars = len(combine_texts(text_list))
+            if group_members and group_chars + separator_chars + request_chars > self.max_chars:
+                groups.append((group_texts, group_members))
+                group_texts, group_members, group_chars = [], [], 0
+            if group_members:
+                group_chars += separator_chars
+            
+            group_members.append((request_idx, len(group_texts), len(group_texts) + len(text_list)))
+            group_texts.extend(text_list)
+            group_chars += request_chars
+        if group_members:
+            groups.append((group_texts, group_members))
+        
+        self.requests_in += len(requests)
+        self.requests_out += len(groups)
+        return groups
+
+    def demux(self, groups, responses, request_count):
+        """
+        묶인 요청의 응답을 원래 요청별 결과로 나눕니다.
+        문자열 값(positive_document, hard_negative_document 등)은 텍스트 조각 위치에 따라 나누고,
+        딕셔너리가 아닌 응답이나 실패한 응답(None)은 묶인 모든 요청에 그대로 전달합니다.
+        
+        Args:
+            groups (list): coalesce의 반환값
+            responses (list): 묶인 요청별 process_text 결과
+            request_count (int): 원래 요청 수
+        
+        Returns:
+            list: 원래 요청 순서대로 정렬된 process_text 결과
+        """
+        request_responses = [None] * request_count
+        for (group_texts, group_members), response in zip(groups, responses):
+            if len(group_members) == 1 or not isinstance(response, dict):
+                for request_idx, _, _ in group_members:
+                    request_responses[request_idx] = response
+                continue
+            
+            # 문자열 값은 텍스트 조각 단위로 나누어 두고 요청별로 다시 연결
+            split_values = {
+                key: split_processed_text(value, group_texts)
+                for key, value in response.items() if isinstance(value, str)
+            }
+            for request_idx, start, end in group_members:
+                request_response = dict(response)
+                for key, processed_text_list in split_values.items():
+                    request_response[key] = combine_texts(processed_text_list[start:end])
+                request_responses[request_idx] = request_response
+        
+        return request_responses
+
+    def stats(self):
+        """요청 묶음 통계를 반환합니다."""
+        return {
+            "max_chars": self.max_chars,
+            "page_requests": self.requests_in,
+            "requests": self.requests_out
+        }
@@ -0,0 +1,108 @@
+from python.services.xml_processor import combine_texts, split_processed_text
+
+class SegmentDeduplicator:
+    """
+    배치 안에서 동일한 텍스트 조각을 한 번만 process_text로 처리하기 위한 클래스
+    
+    배치의 모든 페이지에서 추출한 텍스트 조각 중 처음 등장한 조각만 요청에 포함하고,
+    처리된 텍스트를 같은 텍스트를 가진 모든 TbpeId에 다시 나누어 반영합니다.
+    중복 제거 통계는 배치가 바뀌어도 누적됩니다.
+    """
+
+    def __init__(self):
+        self.total_segments = 0
+        self.unique_segments = 0
+        self.pages = 0
+        self.requests = 0
+
+    def plan(self, tasks):
+        """
+        배치의 추출 결과에서 중복을 제거한 요청 목록을 만듭니다.
+        페이지별로 이전 페이지에 없던 텍스트 조각만 모아 하나의 요청으로 구성하므로,
+        모든 텍스트가 앞 페이지와 겹치는 페이지는 요청을 만들지 않습니다.
+        
+        Args:
+            tasks (list): extract_file_segments 결과 리스트
+        
+        Returns:
+            list: 요청별 고유 텍스트 조각 리스트
+        """
+        seen = set()
+        requests = []
+        for task in tasks:
+            if "error" in task or not task["text_list"]:
+                continue
+            
+            new_texts = []
+            for text in task["text_list"]:
+                if text not in seen:
+                    seen.add(text)
+                    new_texts.append(text)
+            if new_texts:
+                requests.append(new_texts)
+            
+            self.pages += 1
+            self.total_segments += len(task["text_list"])
+        
+        self.unique_segments += len(seen)
+        self.requests += len(requests)
+        return requests
+
+    def fan_out(self, tasks, requests, responses):
+        """
+        고유 텍스트 조각의 처리 결과를 각 페이지의 processed_result로 다시 구성합니다.
+        텍스트가 포함된 요청 중 하나라도 실패한 페이지에는 processed_result를 추가하지 않습니다.
+        
+        Args:
+            tasks (list): extract_file_segments 결과 리스트 (processed_result가 추가됨)
+            requests (list): plan의 반환값
+            responses (list): 요청별 process_text 결과 (실패한 요청은 None)
+        """
+        # 텍스트 조각별 처리 결과 ({문서 키: 처리된 텍스트}, 실패한 요청은 None)
+        rewritten = {}
+        extra_values = {}
+        for request_texts, response in zip(requests, responses):
+            if response is None:
+                for text in request_texts:
+                    rewritten[text] = None
+                continue
+            
+            per_text = [{} for _ in request_texts]
+            if isinstance(response, dict):
+                for key, value in response.items():
+                    if isinstance(value, str):
+                        for values, processed_text in zip(per_text, split_processed_text(value, request_texts)):
+                            values[key] = processed_text
+                    else:
+                        # 문자열이 아닌 값은 처음 받은 값을 사용
+                        extra_values.setdefault(key, value)
+            for text, values in zip(request_texts, per_text):
+                rewritten[text] = values
+        
+        for task in tasks:
+            if "error" in task or not task["text_list"]:
+                continue
+            
+            text_values = [rewritten[text] for text in task["text_list"]]
+            if any(values is None for values in text_values):
+                continue
+            
+            processed_result = dict(extra_values)
+            text_keys = dict.fromkeys(key for values in text_values for key in values)
+            for key in text_keys:
+                # 해당 키의 처리 결과가 없는 텍스트는 원본 유지
+                processed_result[key] = combine_texts(
+                    [values.get(key, text) for text, values in zip(task["text_list"], text_values)]
+                )
+            task["processed_result"] = processed_result
+
+    def stats(self):
+        """중복 제거 통계를 반환합니다."""
+        dedup_ratio = 1 - self.unique_segments / self.total_segments if self.total_segments else 0.0
+        return {
+            "pages": self.pages,
+            "total_segments": self.total_segments,
+            "unique_segments": self.unique_segments,
+            "requests": self.requests,
+            "dedup_ratio": round(dedup_ratio, 4)
+        }
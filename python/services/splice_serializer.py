@@ -0,0 +1,151 @@
+import re
+from xml.parsers import expat
+
+# XML 선언의 인코딩 (선언이 없으면 UTF-8)
+XML_ENCODING_PATTERN = re.compile(rb"^\s*<\?xml[^>]*?encoding\s*=\s*[\"']([A-Za-z0-9._-]+)[\"']")
+
+# 원본 바이트를 그대로 이어 붙일 수 있는 인코딩 (출력 문자열은 UTF-8로 디코딩)
+SPLICE_ENCODINGS = ("utf-8", "utf8", "us-ascii", "ascii")
+
+# 시작 태그 전체 (속성 값 안의 '>' 포함)
+START_TAG_PATTERN = re.compile(rb"<[^\"'>]*(?:(?:\"[^\"]*\"|'[^']*')[^\"'>]*)*>")
+
+# 시작 태그의 태그 이름
+TAG_NAME_PATTERN = re.compile(rb"<([^\s/>]+)")
+
+class ElementSpan:
+    """
+    원본 XML에서 요소 하나의 바이트 위치
+    
+    - start: 시작 태그의 '<' 위치
+    - start_end: 시작 태그 바로 뒤 위치
+    - text_end: 요소의 text가 끝나는 위치 (첫 번째 하위 요소의 시작 또는 종료 태그의 시작)
+    - end_end: 종료 태그 바로 뒤 위치 (빈 요소 태그는 start_end와 같음)
+    - tail_end: 요소의 tail이 끝나는 위치 (다음 형제 요소의 시작 또는 부모 종료 태그의 시작)
+    """
+    
+    __slots__ = ("start", "start_end", "text_end", "end_end", "tail_end", "empty")
+
+    def __init__(self, start, start_end):
+        self.start = start
+        self.start_end = start_end
+        self.text_end = None
+        self.end_end = None
+        self.tail_end = None
+        self.empty = False
+
+def can_splice(data):
+    """원본 바이트에 새 텍스트를 UTF-8로 끼워 넣을 수 있는 문서인지 확인합니다 (UTF-16 등은 지원하지 않음)."""
+    if data.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return False
+    match = XML_ENCODING_PATTERN.match(data.lstrip(b"\xef\xbb\xbf"))
+    return match is None or match.group(1).decode("ascii").lower() in SPLICE_ENCODINGS
+
+def index_element_spans(data, ordinals):
+    """
+    expat으로 원본 XML을 한 번 읽으며 지정한 요소의 바이트 위치를 기록합니다.
+    요소 번호는 문서 순서(ElementTree의 iter() 순서)이며, 시작/종료 이벤트만 처리하므로 텍스트는 읽지 않습니다.
+    
+    Args:
+        data (bytes): 원본 XML
+        ordinals (set): 위치를 기록할 요소 번호
+    
+    Returns:
+        dict: 요소 번호 -> ElementSpan
+    """
+    spans = {}
+    # [요소의 ElementSpan 또는 None, 마지막으로 닫힌 기록 대상 하위 요소의 ElementSpan]
+    stack = []
+    counter = [0]
+    parser = expat.ParserCreate()
+
+    def start_element(name, attrs):
+        index = parser.CurrentByteIndex
+        if stack:
+            parent = stack[-1]
+            if parent[0] is not None and parent[0].text_end is None:
+                parent[0].text_end = index
+            if parent[1] is not None:
+                parent[1].tail_end = index
+                parent[1] = None
+        
+        span = None
+        if counter[0] in ordinals:
+            span = ElementSpan(index, START_TAG_PATTERN.match(data, index).end())
+            spans[counter[0]] = span
+        counter[0] += 1
+        stack.append([span, None])
+
+    def end_element(name):
+        index = parser.CurrentByteIndex
+        span, last_child = stack.pop()
+        if last_child is not None:
+            last_child.tail_end = index
+        
+        if span is not None:
+            if data[span.start_end - 2:span.start_end] == b"/>":
+                span.empty = True
+                span.text_end = span.start_end
+                span.end_end = span.start_end
+            else:
+                if span.text_end is None:
+                    span.text_end = index
+                span.end_end = data.index(b">", index) + 1
+            if stack:
+                stack[-1][1] = span
+    
+    parser.StartElementHandler = start_element
+    parser.EndElementHandler = end_element
+    parser.Parse(data, True)
+    return spans
+
+def escape_text(text):
+    """ElementTree와 같은 방식으로 텍스트를 이스케이프하고 UTF-8로 인코딩합니다."""
+    if not text:
+        return b""
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    return text.encode("utf-8")
+
+def text_edit(data, span, text):
+    """
+    요소의 text를 바꾸는 편집을 만듭니다.
+    
+    Returns:
+        tuple: (시작 위치, 끝 위치, 바꿀 바이트)
+    """
+    if not span.empty:
+        return span.start_end, span.text_end, escape_text(text)
+    if not text:
+        return span.start, span.end_end, data[span.start:span.end_end]
+    
+    # 빈 요소 태그(<Text/>)는 시작/종료 태그로 나누어 텍스트를 넣음
+    name = TAG_NAME_PATTERN.match(data, span.start).group(1)
+    start_tag = data[span.start:span.start_end - 2].rstrip() + b">"
+    return span.start, span.end_end, start_tag + escape_text(text) + b"</" + name + b">"
+
+def splice(data, edits):
+    """
+    원본 바이트에 편집을 적용합니다.
+    
+    Args:
+        data (bytes): 원본 XML
+        edits (list): (시작 위치, 끝 위치, 바꿀 바이트) 리스트
+    
+    Returns:
+        bytes: 편집된 XML (편집 범위가 겹치면 None)
+    """
+    parts = []
+    position = 0
+    for start, end, replacement in sorted(edits, key=lambda edit: edit[0]):
+        if start < position:
+            return None
+        parts.append(data[position:start])
+        parts.append(replacement)
+        position = end
+    parts.append(data[position:])
+    return b"".join(parts)
@@ -0,0 +1,99 @@
+import threading
+
+# 텍스트 구분자 (xml_processor의 combine_texts와 동일)
+SEPARATOR = "\\+\\"
+
+class TokenPacker:
+    """
+    process_text 요청 하나에 들어갈 텍스트 조각을 토큰 수 기준으로 나누는 클래스
+
+    tiktoken으로 토큰 수를 계산하며, 텍스트 조각(TbpeId 단위)의 경계는 유지합니다.
+    요청별 토큰 수 통계도 함께 집계합니다.
+    """
+
+    def __init__(self, max_tokens, encoding_name="cl100k_base"):
+        """
+        Args:
+            max_tokens (int): 요청 하나의 최대 토큰 수 (0이면 나누지 않고 토큰 수만 집계)
+            encoding_name (str): tiktoken 인코딩 이름
+        """
+        # tiktoken은 토큰 패킹을 사용할 때만 필요하므로 여기서 임포트
+        import tiktoken
+
+        self.max_tokens = max_tokens
+        self.encoding_name = encoding_name
+        self.encoding = tiktoken.get_encoding(encoding_name)
+        self.separator_tokens = len(self.encoding.encode(SEPARATOR))
+        self.request_tokens = []
+        self.split_pages = 0
+        self._lock = threading.Lock()
+
+    def count_tokens(self, text):
+        """텍스트의 토큰 수를 계산합니다."""
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def pack(self, text_list):
+        """
+        텍스트 조각 리스트를 최대 토큰 수를 넘지 않는 연속 구간으로 나눕니다.
+        텍스트 조각 하나가 최대 토큰 수를 넘는 경우에는 해당 조각만으로 구간을 만듭니다.
+
+        Args:
+            text_list (list): 텍스트 조각 리스트
+
+        Returns:
+            list: (시작 인덱스, 끝 인덱스, 토큰 수) 튜플의 리스트
+        """
+        token_counts = [self.count_tokens(text) for text in text_list]
+
+        if not self.max_tokens:
+            total = sum(token_counts) + self.separator_tokens * max(0, len(text_list) - 1)
+            return [(0, len(text_list), total)]
+
+        chunks = []
+        start = 0
+        chunk_tokens = 0
+        for i, tokens in enumerate(token_counts):
+            added = tokens if i == start else tokens + self.separator_tokens
+            if i > start and chunk_tokens + added > self.max_tokens:
+                chunks.append((start, i, chunk_tokens))
+                start = i
+                added = tokens
+                chunk_tokens = 0
+            chunk_tokens += added
+        if start < len(text_list):
+            chunks.append((start, len(text_list), chunk_tokens))
+
+        return chunks
+
+    def record(self, chunks):
+        """
+        pack 결과의 요청별 토큰 수를 통계에 추가합니다.
+
+        Args:
+            chunks (list): pack의 반환값
+        """
+        with self._lock:
+            self.request_tokens.extend(tokens for _, _, tokens in chunks)
+            if len(chunks) > 1:
+                self.split_pages += 1
+
+    def stats(self):
+        """요청별 토큰 수 통계를 반환합니다."""
+        with self._lock:
+            tokens = sorted(self.request_tokens)
+            split_pages = self.split_pages
+
+        if not tokens:
+            return {"requests": 0, "total_tokens": 0, "split_pages": split_pages}
+
+        return {
+            "encoding": self.encoding_name,
+            "max_tokens": self.max_tokens,
+            "requests": len(tokens),
+            "split_pages": split_pages,
+            "total_tokens": sum(tokens),
+            "mean_tokens": round(sum(tokens) / len(tokens), 1),
+            "p50_tokens": tokens[(len(tokens) - 1) // 2],
+            "p95_tokens": tokens[min(len(tokens) - 1, int(len(tokens) * 0.95))],
+            "max_tokens_per_request": tokens[-1]
+        }
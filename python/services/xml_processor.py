@@ -2,29 +2,271 @@ import xml.etree.ElementTree as ET
 import json
 import os
 import io
-import sys
 import re
 import math
 
-# workflow.py 파일 경로 설정 (환경 변수 또는 상대 경로 사용)
-WORKFLOW_PATH = os.environ.get(
-    "WORKFLOW_PATH", 
-    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
-                "prompt", "ailabs-context-aware-retrieval-eval-dataset", "src")
-)
+from python.services import json_codec
+from python.services.metrics import timed
+from python.services.splice_serializer import can_splice, index_element_spans, text_edit, splice
+from python.services.llm_backend import get_backend
 
-# workflow.py 모듈 경로를 sys.path에 추가
-if WORKFLOW_PATH not in sys.path:
-    sys.path.append(WORKFLOW_PATH)
+# TEXT/SIMPLE_TEXT 태그에서 업데이트 시 사용하는 하위 태그
+TEXT_CHILD_TAGS = ("Text", "TextBody", "TextData", "RenderPos")
 
-# process_text 함수 임포트
-from workflow import process_text
+# 기본 variant 이름과 process_text 결과 키 (그 외 variant 이름은 결과 키로 그대로 사용)
+VARIANT_DOCUMENT_KEYS = {"positive": "positive_document", "negative": "hard_negative_document"}
+
+def log_processed_result(processed_result, text_count):
+    """
+    process_text 결과를 출력합니다.
+    결과 전체는 크기가 클 수 있으므로 LOG_PROCESSED_RESULT=true인 경우에만 출력합니다.
+    
+    Args:
+        processed_result: process_text 함수의 결과
+        text_count (int): 요청한 텍스트 조각 수
+    """
+    if os.getenv('LOG_PROCESSED_RESULT', 'False').lower() == 'true':
+        print(f"프롬프트 처리 결과: {processed_result}")
+    else:
+        print(f"프롬프트 처리 완료 (텍스트 {text_count}개)")
+
+def combine_texts(text_list):
+    """텍스트 리스트를 \\+\\ 구분자로 연결합니다."""
+    return "\\+\\".join(text_list)
+
+def request_llm(combined_text, cache=None, controller=None, backend=None):
+    """
+    결합된 텍스트를 process_text로 처리합니다.
+    캐시가 설정되어 있으면 캐시된 응답을 먼저 확인하고, 적중 시 API를 호출하지 않습니다.
+    요청 제어기가 설정되어 있으면 동시 실행 수 조절과 재시도를 거쳐 호출합니다.
+    
+    Args:
+        combined_text (str): \\+\\ 구분자로 연결된 텍스트
+        cache (LLMCache): process_text 응답 캐시 (선택 사항)
+        controller (RateController): 동시 실행 수/재시도/서킷 브레이커 제어기 (선택 사항)
+        backend: process_text를 처리할 LLM 백엔드 (없으면 LLM_BACKEND 환경 변수로 선택한 기본 백엔드)
+    
+    Returns:
+        process_text 함수의 결과
+    """
+    if cache is not None:
+        cached_result = cache.get(combined_text)
+        if cached_result is not None:
+            return cached_result
+    
+    backend = backend or get_backend()
+    if controller is not None:
+        processed_result = controller.call(backend.process_text, combined_text)
+    else:
+        processed_result = backend.process_text(combined_text)
+    
+    if cache is not None:
+        cache.set(combined_text, processed_result)
+    
+    return processed_result
+
+def request_segments(text_list, cache=None, packer=None, controller=None, backend=None):
+    """
+    텍스트 조각 리스트를 process_text로 처리합니다.
+    토큰 패커가 설정되어 있으면 최대 토큰 수를 넘지 않도록 텍스트 조각 경계에서 요청을 나누고,
+    각 요청의 결과를 원래 순서(TbpeId 순서)대로 합쳐 하나의 결과로 반환합니다.
+    
+    Args:
+        text_list (list): 텍스트 조각 리스트
+        cache (LLMCache): process_text 응답 캐시 (선택 사항)
+        packer (TokenPacker): 토큰 수 기준 요청 분할기 (선택 사항)
+        controller (RateController): 동시 실행 수/재시도/서킷 브레이커 제어기 (선택 사항)
+        backend: LLM 백엔드 (선택 사항)
+    
+    Returns:
+        process_text 함수의 결과 (요청을 나눈 경우 합쳐진 결과)
+    """
+    if packer is None:
+        return request_llm(combine_texts(text_list), cache, controller, backend)
+    
+    chunks = packer.pack(text_list)
+    packer.record(chunks)
+    
+    if len(chunks) == 1:
+        return request_llm(combine_texts(text_list), cache, controller, backend)
+    
+    chunk_results = [
+        request_llm(combine_texts(text_list[start:end]), cache, controller, backend) for start, end, _ in chunks
+    ]
+    return merge_chunk_results(chunk_results, chunks, text_list)
+
+def split_processed_text(processed_text, text_list):
+    """
+    처리된 텍스트를 \\+\\ 구분자로 나누고 원본 텍스트 개수에 맞춥니다.
+    개수가 많으면 잘라내고, 적으면 부족한 부분을 원본 텍스트로 채웁니다 (extract_processed_texts와 동일).
+    
+    Args:
+        processed_text (str): process_text 결과의 문서 텍스트
+        text_list (list): 원본 텍스트 리스트
+    
+    Returns:
+        list: 원본 텍스트 개수와 같은 길이의 처리된 텍스트 리스트
+    """
+    processed_text_list = [text.strip() for text in processed_text.split("\\+\\") if text.strip()]
+    processed_text_list = processed_text_list[:len(text_list)]
+    processed_text_list.extend(text_list[len(processed_text_list):])
+    return processed_text_list
+
+def count_segment_mismatches(processed_result, text_list):
+    """
+    process_text 결과의 문서별 텍스트 개수가 원본 텍스트 개수와 다른 경우를 찾아 출력합니다 (extract_processed_texts와 같은 메시지).
+    결과를 텍스트 조각 단위로 나누어 반영하는 경우(중복 제거, 요청 묶음) 나누기 전에 응답 단위로 확인합니다.
+    
+    Args:
+        processed_result: process_text 함수의 결과
+        text_list (list): 요청한 텍스트 리스트
+    
+    Returns:
+        int: 텍스트 개수가 다른 문서 수
+    """
+    if not isinstance(processed_result, dict):
+        return 0
+    
+    mismatches = 0
+    for value in processed_result.values():
+        if not isinstance(value, str):
+            continue
+        processed_count = len([text for text in value.split("\\+\\") if text.strip()])
+        if processed_count != len(text_list):
+            print(f"분리된 텍스트 개수({processed_count})와 원래 텍스트 개수({len(text_list)})가 다릅니다.")
+            mismatches += 1
+    return mismatches
+
+def merge_chunk_results(chunk_results, chunks, text_list):
+    """
+    나누어 요청한 process_text 결과를 하나의 결과로 합칩니다.
+    문자열 값(positive_document, hard_negative_document 등)은 요청별로 텍스트 개수를 맞춘 뒤 순서대로 연결합니다.
+    
+    Args:
+        chunk_results (list): 요청별 process_text 결과
+        chunks (list): TokenPacker.pack의 반환값
+        text_list (list): 원본 텍스트 리스트
+    
+    Returns:
+        dict: 합쳐진 process_text 결과 (딕셔너리 결과가 없으면 첫 번째 결과)
+    """
+    dict_results = [result for result in chunk_results if isinstance(result, dict)]
+    if not dict_results:
+        return chunk_results[0]
+    
+    # 문자열이 아닌 값은 첫 번째 결과의 값을 사용
+    merged = {}
+    for result in dict_results:
+        for key, value in result.items():
+            merged.setdefault(key, value)
+    
+    text_keys = [key for key, value in merged.items() if isinstance(value, str)]
+    for key in text_keys:
+        merged_text_list = []
+        for (start, end, _), result in zip(chunks, chunk_results):
+            chunk_text_list = text_list[start:end]
+            value = result.get(key) if isinstance(result, dict) else None
+            if isinstance(value, str):
+                merged_text_list.extend(split_processed_text(value, chunk_text_list))
+            else:
+                # 해당 요청의 결과가 없으면 원본 텍스트 유지
+                merged_text_list.extend(chunk_text_list)
+        merged[key] = combine_texts(merged_text_list)
+    
+    return merged
+
+def extract_file_segments(file_path):
+    """
+    프로세스 풀 작업: XML 파일을 파싱하여 텍스트와 TbpeId만 추출합니다.
+    전체 XML 트리는 만들지 않고(iterparse), 추출된 텍스트만 메인 프로세스로 전달합니다.
+    
+    Args:
+        file_path (str): XML 파일 경로
+    
+    Returns:
+        dict: file_path, text_list, tbpe_id_list, timings (오류 시 error)
+    """
+    try:
+        parser = XMLParser(file_path, streaming=True)
+        text_list, tbpe_id_list = parser.extract_segments()
+        return {"file_path": file_path, "text_list": text_list, "tbpe_id_list": tbpe_id_list, "timings": parser.timings}
+    except Exception as e:
+        return {"file_path": file_path, "error": str(e)}
+
+def render_file_variants(task, variant_keys=()):
+    """
+    프로세스 풀 작업: XML 파일을 파싱하고 process_text 결과를 반영하여 직렬화합니다.
+    
+    Args:
+        task (dict): extract_file_segments 결과에 processed_result가 추가된 작업 정보
+        variant_keys: positive/negative 외에 추가로 생성할 variant의 process_text 결과 키 목록
+    
+    Returns:
+        dict: positive_xml, negative_xml, timings, counters, variant_keys가 있으면 variant_xml (오류 시 error)
+    """
+    if "error" in task:
+        return {"error": task["error"]}
+    
+    # 추출된 텍스트가 없거나 process_text 결과가 없는 경우 빈 문자열 반환 (LLM 처리 실패는 task의 error로 전달됨)
+    parser = None
+    if not task["text_list"] or task.get("processed_result") is None:
+        variants = {key: "" for key in ["positive", "negative"] + list(variant_keys)}
+    else:
+        try:
+            parser = XMLParser(task["file_path"])
+            variants = dict(parser.iter_variants(
+                task["processed_result"], task["text_list"], task["tbpe_id_list"],
+                ["positive", "negative"] + list(variant_keys)
+            ))
+        except Exception as e:
+            return {"error": str(e)}
+    
+    rendered = {"positive_xml": variants.pop("positive"), "negative_xml": variants.pop("negative")}
+    if parser is not None:
+        rendered["timings"] = parser.timings
+        rendered["counters"] = parser.counters
+    if variant_keys:
+        rendered["variant_xml"] = variants
+    return rendered
 
 class XMLParser:
-    def __init__(self, file_path):
+    def __init__(self, file_path, cache=None, packer=None, streaming=False, controller=None, backend=None, serializer=None):
         self.file_path = file_path
-        self.tree = ET.parse(file_path)
-        self.root = self.tree.getroot()
+        # process_text 응답 캐시 (LLMCache, 선택 사항)
+        self.cache = cache
+        # 토큰 수 기준 요청 분할기 (TokenPacker, 선택 사항)
+        self.packer = packer
+        # 동시 실행 수/재시도/서킷 브레이커 제어기 (RateController, 선택 사항)
+        self.controller = controller
+        # process_text를 처리할 LLM 백엔드 (없으면 LLM_BACKEND 환경 변수로 선택한 기본 백엔드)
+        self.backend = backend
+        # True면 전체 트리를 만들지 않고 iterparse로 텍스트를 추출
+        self.streaming = streaming
+        # variant XML 직렬화 방식 (tree: ElementTree 전체 직렬화, splice: 원본 바이트에서 변경된 부분만 교체)
+        self.serializer = (serializer or os.getenv('SERIALIZER', 'tree')).lower()
+        # XML 트리는 처음 사용할 때 파싱 (스트리밍 추출만 하는 경우 만들지 않음)
+        self._tree = None
+        # TbpeId -> [(태그 이름, 태그 요소, 하위 태그 딕셔너리), ...] 인덱스 (처음 사용할 때 생성)
+        self._element_index = None
+        self._text_elements = None
+        # TextBody 요소 -> 파싱된 JSON과 원본 전체 텍스트 (variant마다 다시 파싱하지 않음)
+        self._text_body_cache = {}
+        # splice 직렬화에 사용하는 (원본 바이트, 요소 -> ElementSpan) (처음 사용할 때 생성, 사용할 수 없으면 빈 튜플)
+        self._splice_index = None
+        # 단계별 소요 시간(초)과 이벤트 횟수 (process()에서 수집)
+        self.timings = {}
+        self.counters = {}
+
+    @property
+    def tree(self):
+        if self._tree is None:
+            with timed(self.timings, "parse"):
+                self._tree = ET.parse(self.file_path)
+        return self._tree
+
+    @property
+    def root(self):
+        return self.tree.getroot()
 
     def generate_xml_string(self):
         """
@@ -33,48 +275,268 @@ class XMLParser:
         Returns:
             tuple: (positive_xml_string, negative_xml_string) - positive와 negative XML 문자열
         """
+        variants = self.generate_xml_variants(["positive", "negative"])
+        return variants["positive"], variants["negative"]
+
+    def generate_xml_variants(self, variant_keys):
+        """
+        XML 파일을 한 번만 파싱하고 process_text를 한 번만 호출하여 여러 variant의 XML 문자열을 생성합니다.
+        
+        Args:
+            variant_keys: variant 이름 목록 ("positive", "negative" 또는 process_text 결과 키)
+        
+        Returns:
+            dict: variant 이름 -> XML 문자열 (텍스트가 없으면 빈 문자열)
+        
+        Raises:
+            Exception: 재시도 후에도 LLM 처리에 실패한 경우 (페이지를 빈 결과로 저장하지 않고 실패로 기록)
+        """
         # 원본 XML 파일에서 텍스트 추출
-        text_info_list = self.extract_text()
-        text_list = [text for text, _ in text_info_list]
-        tbpe_id_list = [tbpe_id for _, tbpe_id in text_info_list]
+        text_list, tbpe_id_list = self.extract_segments()
         
         if not text_list:
-            return "", ""
-        
-        # 텍스트 리스트를 \\+\\ 구분자로 연결
-        combined_text = ""
-        for i, text in enumerate(text_list):
-            if i > 0:
-                combined_text += "\\+\\"
-            combined_text += text
+            return {key: "" for key in variant_keys}
         
         # 새 어댑터의 process_text 함수에 결합된 텍스트 전달 (API 한 번만 호출)
         try:
-            processed_result = process_text(combined_text)
-            print(f"프롬프트 처리 결과: {processed_result}")
+            with timed(self.timings, "llm"):
+                processed_result = request_segments(
+                    text_list, self.cache, self.packer, self.controller, self.backend
+                )
+            log_processed_result(processed_result, len(text_list))
         except Exception as e:
             print(f"프롬프트 처리 중 오류 발생: {e}")
-            return "", ""
+            raise
+        
+        return dict(self.iter_variants(processed_result, text_list, tbpe_id_list, variant_keys))
+
+    def extract_segments(self):
+        """
+        XML에서 추출한 텍스트와 TbpeId를 각각의 리스트로 반환합니다.
+        
+        Returns:
+            tuple: (텍스트 리스트, TbpeId 리스트)
+        """
+        # 전체 트리 파싱 시간은 추출 시간과 나누어 기록
+        if not self.streaming:
+            self.tree
+        
+        with timed(self.timings, "extract"):
+            text_info_list = self.extract_text()
+        text_list = [text for text, _ in text_info_list]
+        tbpe_id_list = [tbpe_id for _, tbpe_id in text_info_list]
+        return text_list, tbpe_id_list
+
+    def apply_processed_result(self, processed_result, text_list, tbpe_id_list):
+        """
+        process_text 결과를 XML에 반영하여 positive와 negative XML 문자열을 생성합니다.
+        
+        Args:
+            processed_result: process_text 함수의 결과
+            text_list: 원본 텍스트 리스트
+            tbpe_id_list: TbpeId 리스트
+        
+        Returns:
+            tuple: (positive_xml_string, negative_xml_string)
+        """
+        variants = dict(self.iter_variants(processed_result, text_list, tbpe_id_list, ["positive", "negative"]))
+        return variants["positive"], variants["negative"]
+
+    def iter_variants(self, processed_result, text_list, tbpe_id_list, variant_keys):
+        """
+        하나의 파싱된 트리와 process_text 결과로 variant별 XML 문자열을 순서대로 생성합니다.
+        variant마다 변경된 태그만 원본 상태로 복원하므로, 추가 variant의 비용은 업데이트와 직렬화뿐입니다.
+        
+        Args:
+            processed_result: process_text 함수의 결과
+            text_list: 원본 텍스트 리스트
+            tbpe_id_list: TbpeId 리스트
+            variant_keys: variant 이름 목록 ("positive", "negative" 또는 process_text 결과 키)
         
-        # Positive 결과 처리
-        positive_text_info_list = self.extract_processed_texts(processed_result, text_list, tbpe_id_list, "positive")
-        self.update_xml(positive_text_info_list)
-        positive_xml_string = self.xml_to_string()
+        Yields:
+            tuple: (variant 이름, XML 문자열)
+        """
+        # update_xml이 변경하는 TEXT/SIMPLE_TEXT 하위 트리만 저장 (파일을 다시 파싱하지 않고 복원)
+        snapshot = self.snapshot_text_elements()
+        if self.serializer == "splice":
+            # 요소 위치는 문서 순서로 대응하므로 트리를 변경하기 전에 기록
+            with timed(self.timings, "serialize"):
+                self.build_splice_index()
         
-        # 원본 XML 파일을 다시 로드 (변경된 내용을 초기화)
-        self.tree = ET.parse(self.file_path)
-        self.root = self.tree.getroot()
+        for variant_key in variant_keys:
+            with timed(self.timings, "update"):
+                text_info_list = self.extract_processed_texts(processed_result, text_list, tbpe_id_list, variant_key)
+                self.update_xml(text_info_list)
+            
+            with timed(self.timings, "serialize"):
+                xml_string = self.serialize(snapshot)
         
-        # Negative 결과 처리
-        negative_text_info_list = self.extract_processed_texts(processed_result, text_list, tbpe_id_list, "negative")
-        self.update_xml(negative_text_info_list)
-        negative_xml_string = self.xml_to_string()
+            # 변경된 내용을 원본 상태로 복원
+            with timed(self.timings, "update"):
+                self.restore_text_elements(snapshot)
         
-        # 원본 XML 파일을 다시 로드 (변경된 내용을 초기화)
-        self.tree = ET.parse(self.file_path)
-        self.root = self.tree.getroot()
+            yield variant_key, xml_string
+
+    def build_element_index(self):
+        """
+        트리를 한 번만 순회하여 TbpeId별 TEXT/SIMPLE_TEXT 태그 인덱스를 생성합니다.
+        업데이트에 사용하는 Text/TextBody/TextData/RenderPos 하위 태그도 미리 찾아 둡니다.
         
-        return positive_xml_string, negative_xml_string
+        Returns:
+            dict: TbpeId -> [(태그 이름, 태그 요소, 하위 태그 딕셔너리), ...]
+        """
+        if self._element_index is not None:
+            return self._element_index
+        
+        text_tags = []
+        simple_text_tags = []
+        for elem in self.root.iter():
+            if elem.tag == "TEXT":
+                text_tags.append(elem)
+            elif elem.tag == "SIMPLE_TEXT":
+                simple_text_tags.append(elem)
+        
+        # findall(".//TEXT") + findall(".//SIMPLE_TEXT")와 같은 순서
+        self._text_elements = text_tags + simple_text_tags
+        
+        self._element_index = {}
+        for tag in self._text_elements:
+            entry = (tag.tag, tag, self.resolve_child_tags(tag))
+            self._element_index.setdefault(tag.get("TbpeId"), []).append(entry)
+        
+        return self._element_index
+    
+    def resolve_child_tags(self, tag):
+        """
+        태그의 직계 하위 태그 중 업데이트에 사용하는 태그를 찾습니다 (태그 이름별 첫 번째 요소, find와 동일).
+        
+        Args:
+            tag: TEXT 또는 SIMPLE_TEXT 태그 요소
+            
+        Returns:
+            dict: 하위 태그 이름 -> 요소
+        """
+        children = {}
+        for child in tag:
+            if child.tag in TEXT_CHILD_TAGS and child.tag not in children:
+                children[child.tag] = child
+        return children
+
+    def snapshot_text_elements(self):
+        """
+        update_xml이 변경할 수 있는 TEXT/SIMPLE_TEXT 태그와 Text/TextBody 하위 태그의 상태를 저장합니다.
+        
+        Returns:
+            list: (요소, 텍스트, 하위 요소 리스트) 튜플의 리스트
+        """
+        self.build_element_index()
+        
+        snapshot = []
+        for tag in self._text_elements:
+            # TextData/RenderPos 태그 제거를 되돌리기 위해 하위 요소 리스트 저장
+            snapshot.append((tag, tag.text, list(tag)))
+            for child in tag:
+                if child.tag in ("Text", "TextBody"):
+                    snapshot.append((child, child.text, None))
+        return snapshot
+    
+    def restore_text_elements(self, snapshot):
+        """
+        snapshot_text_elements로 저장한 상태로 XML 트리를 복원합니다.
+        
+        Args:
+            snapshot: snapshot_text_elements의 반환값
+        """
+        for element, text, children in snapshot:
+            element.text = text
+            if children is not None:
+                element[:] = children
+
+    def serialize(self, snapshot):
+        """
+        update_xml을 반영한 XML 트리를 SERIALIZER 설정에 따라 문자열로 변환합니다.
+        splice를 사용할 수 없는 문서는 ElementTree로 직렬화합니다.
+        
+        Args:
+            snapshot: snapshot_text_elements의 반환값 (변경 전 상태)
+        
+        Returns:
+            str: XML 문자열
+        """
+        if self.serializer == "splice":
+            xml_string = self.splice_to_string(snapshot)
+            if xml_string is not None:
+                return xml_string
+            self.counters["splice_fallback"] = self.counters.get("splice_fallback", 0) + 1
+        return self.xml_to_string()
+
+    def build_splice_index(self):
+        """
+        원본 XML 바이트를 읽고 TEXT/SIMPLE_TEXT 태그와 직계 하위 태그의 바이트 위치를 기록합니다 (파일당 한 번).
+        update_xml로 트리를 변경하기 전에 호출해야 합니다.
+        
+        Returns:
+            tuple: (원본 바이트, 요소 -> ElementSpan 딕셔너리), 바이트 편집을 사용할 수 없는 문서면 None
+        """
+        if self._splice_index is None:
+            self._splice_index = ()
+            with open(self.file_path, 'rb') as f:
+                data = f.read()
+            if can_splice(data):
+                self.build_element_index()
+                targets = set()
+                for tag in self._text_elements:
+                    targets.add(tag)
+                    targets.update(tag)
+                
+                # 트리의 문서 순서 번호로 expat 이벤트와 요소를 대응
+                ordinals = {}
+                for ordinal, elem in enumerate(self.root.iter()):
+                    if elem in targets:
+                        ordinals[ordinal] = elem
+                spans = index_element_spans(data, ordinals)
+                self._splice_index = (data, {ordinals[ordinal]: span for ordinal, span in spans.items()})
+        return self._splice_index or None
+
+    def splice_to_string(self, snapshot):
+        """
+        원본 XML 바이트에서 update_xml이 변경한 텍스트와 제거한 하위 태그만 바꾸어 문자열로 변환합니다.
+        변경되지 않은 마크업은 원본과 바이트 단위로 같으며, 트리 전체를 직렬화하지 않으므로
+        비용은 문서 크기보다 변경된 텍스트 양에 비례합니다.
+        
+        Args:
+            snapshot: snapshot_text_elements의 반환값 (변경 전 상태)
+        
+        Returns:
+            str: XML 문자열 (바이트 편집을 사용할 수 없으면 None)
+        """
+        splice_index = self.build_splice_index()
+        if splice_index is None:
+            return None
+        data, spans = splice_index
+        
+        edits = []
+        for element, text, children in snapshot:
+            if element.text != text:
+                edits.append(text_edit(data, spans[element], element.text))
+            if children is None or len(element) == len(children):
+                continue
+            
+            # update_xml은 하위 태그를 제거만 하므로 원본에 없는 요소가 있으면 바이트 편집 불가
+            remaining = set(element)
+            if not remaining.issubset(children):
+                return None
+            for child in children:
+                if child not in remaining:
+                    # ElementTree의 remove와 같이 요소 뒤의 tail도 함께 제거
+                    span = spans[child]
+                    edits.append((span.start, span.tail_end, b""))
+        
+        xml_bytes = splice(data, edits)
+        if xml_bytes is None:
+            return None
+        # BOM은 XML 문자열에 포함하지 않음
+        return xml_bytes.decode('utf-8-sig')
 
     def xml_to_string(self):
         """XML 트리를 문자열로 변환"""
@@ -90,7 +552,7 @@ class XMLParser:
             processed_result: process_text 함수의 결과 (딕셔너리 형태)
             text_list: 원본 텍스트 리스트
             tbpe_id_list: TbpeId 리스트
-            doc_type: 문서 유형 ("positive" 또는 "negative")
+            doc_type: 문서 유형 ("positive", "negative" 또는 process_text 결과 키)
             
         Returns:
             list: (텍스트, TbpeId) 튜플의 리스트
@@ -100,11 +562,8 @@ class XMLParser:
         try:
             # 딕셔너리 형태로 결과가 반환된 경우
             if isinstance(processed_result, dict):
-                # positive 또는 negative 텍스트 선택
-                if doc_type == "negative":
-                    processed_text = processed_result.get("hard_negative_document", "")
-                else:  # positive
-                    processed_text = processed_result.get("positive_document", "")
+                # 문서 유형에 해당하는 텍스트 선택 (positive, negative 외에는 결과 키로 사용)
+                processed_text = processed_result.get(VARIANT_DOCUMENT_KEYS.get(doc_type, doc_type), "")
                 
                 # 처리된 텍스트를 개행 문자(\n)로 분리
                 processed_text_list = processed_text.split("\\+\\")
@@ -113,6 +572,7 @@ class XMLParser:
                 # 분리된 텍스트 수가 원본 텍스트 수와 다를 경우
                 if len(processed_text_list) != len(text_list):
                     print(f"분리된 텍스트 개수({len(processed_text_list)})와 원래 텍스트 개수({len(text_list)})가 다릅니다.")
+                    self.counters["segment_mismatch"] = self.counters.get("segment_mismatch", 0) + 1
                     # 텍스트 수가 더 많은 경우, 원본 텍스트 수에 맞게 조정
                     if len(processed_text_list) > len(text_list):
                         processed_text_list = processed_text_list[:len(text_list)]
@@ -165,53 +625,190 @@ class XMLParser:
     
     def extract_text(self):
         """XML에서 <SIMPLE_TEXT> 또는 <TEXT> 태그의 텍스트와 TbpeId를 추출하고 형식을 변환합니다."""
+        if self.streaming:
+            return list(self.iter_text_segments())
+        
         text_tag_info = []
 
+        # 트리를 한 번 순회하여 태그 인덱스를 만들고 업데이트 시 재사용
+        self.build_element_index()
+        text_tags = [tag for tag in self._text_elements if tag.tag == "TEXT"]
+        simple_text_tags = [tag for tag in self._text_elements if tag.tag == "SIMPLE_TEXT"]
+
         # SIMPLE_TEXT 태그에서 텍스트와 TbpeId 추출
-        for simple_text_tag in self.root.findall(".//SIMPLE_TEXT"):
-            text_body = simple_text_tag.find(".//TextBody")
-            if text_body is not None and text_body.text:
-                try:
-                    json_data = json.loads(text_body.text)
-                    texts = self.extract_texts_from_json_structure(json_data)
-                    tbpe_id = simple_text_tag.get('TbpeId')
-                    
-                    # 텍스트 리스트가 비어있지 않은 경우에만 처리
-                    if texts:
-                        # 텍스트 리스트를 공백으로 결합
-                        combined_text = ' '.join([text for text in texts if text is not None])
-                        
-                        # \xa0 문자를 공백으로 대체
-                        combined_text = combined_text.replace('\xa0', ' ')
-                        
-                        # 개행 문자를 \\n 로 대체
-                        formatted_text = combined_text.replace("\n", "\\n")
-                        
-                        # 결합된 텍스트와 TbpeId를 리스트에 추가
-                        text_tag_info.append((formatted_text, tbpe_id))
-                except json.JSONDecodeError:
-                    continue
+        for simple_text_tag in simple_text_tags:
+            text_info = self.format_simple_text_tag(simple_text_tag)
+            if text_info is not None:
+                text_tag_info.append(text_info)
 
         # TEXT 태그에서 텍스트와 TbpeId 추출
-        for text_tag in self.root.findall(".//TEXT"):
-            # TEXT 태그 내부의 Text 하위 태그 찾기
-            text_subtag = text_tag.find("Text")
-            if text_subtag is not None and text_subtag.text is not None:
-                text = text_subtag.text
-            else:
-                # 하위 태그가 없거나 텍스트가 없으면 TEXT 태그 자체의 텍스트 사용
-                text = text_tag.text
+        for text_tag in text_tags:
+            text_info = self.format_text_tag(text_tag)
+            if text_info is not None:
+                text_tag_info.append(text_info)
+
+        return text_tag_info
+
+    def iter_text_segments(self):
+        """
+        iterparse로 XML을 순차적으로 읽으며 텍스트와 TbpeId를 추출합니다.
+        전체 트리를 만들지 않고, TEXT/SIMPLE_TEXT 태그 밖의 요소는 닫히는 즉시 버리므로
+        메모리 사용량은 가장 큰 태그 하나의 크기로 제한됩니다.
+        결과 순서는 extract_text와 동일합니다 (SIMPLE_TEXT 태그 전체 후 TEXT 태그 전체, 각각 문서 순서).
+        
+        Yields:
+            tuple: (텍스트, TbpeId)
+        """
+        open_elements = []
+        open_targets = 0
+        start_count = 0
+        start_order = {}
+        simple_text_pending = []
+        text_pending = []
+        
+        for event, elem in ET.iterparse(self.file_path, events=("start", "end")):
+            if event == "start":
+                open_elements.append(elem)
+                if elem.tag in ("SIMPLE_TEXT", "TEXT"):
+                    open_targets += 1
+                    start_order[elem] = start_count
+                    start_count += 1
+                continue
+            
+            open_elements.pop()
+            if elem.tag == "SIMPLE_TEXT":
+                open_targets -= 1
+                text_info = self.format_simple_text_tag(elem, use_cache=False)
+                if text_info is not None:
+                    simple_text_pending.append((start_order[elem], text_info))
+                del start_order[elem]
+            elif elem.tag == "TEXT":
+                open_targets -= 1
+                text_info = self.format_text_tag(elem)
+                if text_info is not None:
+                    text_pending.append((start_order[elem], text_info))
+                del start_order[elem]
             
-            tbpe_id = text_tag.get('TbpeId')
-            if text is not None:
-                # \xa0 문자를 공백으로 대체
-                text = text.replace('\xa0', ' ')
+            if open_targets == 0:
+                # 중첩된 태그가 모두 닫히면 SIMPLE_TEXT 텍스트를 문서 순서대로 바로 반환
+                simple_text_pending.sort(key=lambda item: item[0])
+                for _, text_info in simple_text_pending:
+                    yield text_info
+                simple_text_pending = []
                 
-                # 개행 문자를 \\n 로 대체
-                formatted_text = text.replace("\n", "\\n")
-                text_tag_info.append((formatted_text, tbpe_id))
+                # 처리가 끝난 요소는 부모에서 제거하여 메모리 해제
+                if open_elements:
+                    elem.clear()
+                    del open_elements[-1][-1]
+        
+        # TEXT 태그의 텍스트는 SIMPLE_TEXT 태그 뒤에 문서 순서대로 반환
+        text_pending.sort(key=lambda item: item[0])
+        for _, text_info in text_pending:
+            yield text_info
 
-        return text_tag_info
+    def format_simple_text_tag(self, simple_text_tag, use_cache=True):
+        """
+        SIMPLE_TEXT 태그의 TextBody JSON에서 텍스트를 추출하고 형식을 변환합니다.
+        
+        Args:
+            simple_text_tag: SIMPLE_TEXT 태그 요소
+            use_cache: 파싱된 JSON을 업데이트 시 재사용하도록 저장할지 여부 (스트리밍 추출 시 False)
+            
+        Returns:
+            tuple: (텍스트, TbpeId) (텍스트가 없거나 JSON 파싱에 실패하면 None)
+        """
+        text_body = simple_text_tag.find(".//TextBody")
+        if text_body is not None and text_body.text:
+            try:
+                if use_cache:
+                    json_data = self.parse_text_body(text_body)["json"]
+                else:
+                    json_data = json_codec.loads(text_body.text)
+                texts = self.extract_texts_from_json_structure(json_data)
+                tbpe_id = simple_text_tag.get('TbpeId')
+                
+                # 텍스트 리스트가 비어있지 않은 경우에만 처리
+                if texts:
+                    # 텍스트 리스트를 공백으로 결합
+                    combined_text = ' '.join([text for text in texts if text is not None])
+                    
+                    # \xa0 문자를 공백으로 대체
+                    combined_text = combined_text.replace('\xa0', ' ')
+                    
+                    # 개행 문자를 \\n 로 대체
+                    formatted_text = combined_text.replace("\n", "\\n")
+                    
+                    return formatted_text, tbpe_id
+            except json.JSONDecodeError:
+                return None
+        return None
+
+    def parse_text_body(self, text_body):
+        """
+        TextBody의 JSON을 파싱하고 폰트 크기 조정에 사용할 원본 전체 텍스트를 함께 계산합니다.
+        같은 TextBody 요소는 내용이 바뀌지 않았다면 한 번만 파싱합니다.
+        
+        Args:
+            text_body: TextBody 태그 요소
+        
+        Returns:
+            dict: json (파싱된 JSON, 변경하지 않고 사용), original_total_text (원본 전체 텍스트),
+                length_error (원본 전체 텍스트 계산 시 발생한 오류 메시지)
+        
+        Raises:
+            json.JSONDecodeError, TypeError: JSON 파싱에 실패한 경우
+        """
+        cached = self._text_body_cache.get(text_body)
+        if cached is not None and cached["source"] is text_body.text:
+            return cached
+        
+        json_data = json_codec.loads(text_body.text)
+        
+        # 원본 전체 텍스트 계산 (update_text_json_structure가 사용하는 경우에만)
+        original_total_text = None
+        length_error = None
+        if isinstance(json_data, dict) and "c" in json_data and isinstance(json_data["c"], list):
+            try:
+                original_total_text = " ".join(self.count_text_length_from_json(json_data))
+            except TypeError as e:
+                length_error = str(e)
+        
+        cached = {
+            "source": text_body.text,
+            "json": json_data,
+            "original_total_text": original_total_text,
+            "length_error": length_error
+        }
+        self._text_body_cache[text_body] = cached
+        return cached
+
+    def format_text_tag(self, text_tag):
+        """
+        TEXT 태그의 텍스트를 추출하고 형식을 변환합니다.
+        
+        Args:
+            text_tag: TEXT 태그 요소
+            
+        Returns:
+            tuple: (텍스트, TbpeId) (텍스트가 없으면 None)
+        """
+        # TEXT 태그 내부의 Text 하위 태그 찾기
+        text_subtag = text_tag.find("Text")
+        if text_subtag is not None and text_subtag.text is not None:
+            text = text_subtag.text
+        else:
+            # 하위 태그가 없거나 텍스트가 없으면 TEXT 태그 자체의 텍스트 사용
+            text = text_tag.text
+        
+        tbpe_id = text_tag.get('TbpeId')
+        if text is not None:
+            # \xa0 문자를 공백으로 대체
+            text = text.replace('\xa0', ' ')
+            
+            # 개행 문자를 \\n 로 대체
+            formatted_text = text.replace("\n", "\\n")
+            return formatted_text, tbpe_id
+        return None
 
     def extract_texts_from_json_structure(self, json_data):
         """
@@ -255,11 +852,10 @@ class XMLParser:
         Returns:
             Element: 업데이트된 XML 루트 요소
         """
-        # TEXT 태그 확인
-        text_tags = self.root.findall(".//TEXT")
-        simple_text_tags = self.root.findall(".//SIMPLE_TEXT")
+        # TbpeId 인덱스 확인 (트리 전체를 다시 탐색하지 않음)
+        element_index = self.build_element_index()
         
-        if not text_tags and not simple_text_tags:
+        if not element_index:
             return self.root
         
         # 응답 리스트를 TbpeId를 키로 하는 딕셔너리로 변환
@@ -267,76 +863,82 @@ class XMLParser:
         for text, tbpe_id in text_info_list:
             text_info_dict[tbpe_id] = text
         
-        # TEXT 태그 업데이트
-        for text_tag in text_tags:
-            tbpe_id = text_tag.get("TbpeId")
-            if tbpe_id in text_info_dict:
-                self.update_text_tag(text_tag, text_info_dict[tbpe_id])
-        
-        # SIMPLE_TEXT 태그 업데이트
-        for simple_text_tag in simple_text_tags:
-            tbpe_id = simple_text_tag.get("TbpeId")
-            if tbpe_id in text_info_dict:
-                self.update_simple_text_tag(simple_text_tag, text_info_dict[tbpe_id])
+        # TbpeId별로 TEXT/SIMPLE_TEXT 태그 업데이트
+        for tbpe_id, text in text_info_dict.items():
+            for tag_name, tag, children in element_index.get(tbpe_id, ()):
+                if tag_name == "TEXT":
+                    self.update_text_tag(tag, text, children)
+                else:
+                    self.update_simple_text_tag(tag, text, children)
         
         return self.root
     
-    def update_text_tag(self, text_tag, new_text):
+    def update_text_tag(self, text_tag, new_text, children=None):
         """
         TEXT 태그의 내용을 업데이트합니다.
         
         Args:
             text_tag: TEXT 태그 요소
             new_text: 새로운 텍스트
+            children: 미리 찾아 둔 하위 태그 딕셔너리 (없으면 직접 찾음)
             
         Returns:
             None
         """
+        if children is None:
+            children = self.resolve_child_tags(text_tag)
+        
         # Text 태그 찾기
-        text_node = text_tag.find("Text")
+        text_node = children.get("Text")
         
         # Text 태그가 있으면 내용 업데이트
         if text_node is not None:
             text_node.text = new_text
             # TextData 태그와 RenderPos 태그 제거
-            self.remove_textData_tag(text_tag)
-            self.remove_renderPos_tag(text_tag)
+            self.remove_textData_tag(text_tag, children)
+            self.remove_renderPos_tag(text_tag, children)
         else:
             # Text 태그가 없으면 TEXT 태그 직접 업데이트
             text_tag.text = new_text
     
-    def update_simple_text_tag(self, simple_text_tag, new_text):
+    def update_simple_text_tag(self, simple_text_tag, new_text, children=None):
         """
         SIMPLE_TEXT 태그의 내용을 업데이트합니다.
         
         Args:
             simple_text_tag: SIMPLE_TEXT 태그 요소
             new_text: 새로운 텍스트
+            children: 미리 찾아 둔 하위 태그 딕셔너리 (없으면 직접 찾음)
             
         Returns:
             None
         """
         tbpe_id = simple_text_tag.get("TbpeId")
         
+        if children is None:
+            children = self.resolve_child_tags(simple_text_tag)
+        
         # TextBody 태그 찾기
-        text_body = simple_text_tag.find("TextBody")
+        text_body = children.get("TextBody")
         
         if text_body is None:
             print(f"TextBody 태그를 찾을 수 없음 (TbpeId: {tbpe_id})")
             return
         
         try:
-            # TextBody 태그의 JSON 데이터 파싱
-            json_data = json.loads(text_body.text)
+            # TextBody 태그의 JSON 데이터 파싱 (추출 시 파싱한 결과 재사용)
+            parsed = self.parse_text_body(text_body)
+            if parsed["length_error"] is not None:
+                raise TypeError(parsed["length_error"])
             
-            # JSON 구조 업데이트 (기존 메서드 활용)
-            updated_json = self.update_text_json_structure(json_data, new_text)
+            # JSON 구조 업데이트 (기존 메서드 활용, 저장된 원본 JSON은 변경하지 않음)
+            updated_json = self.update_text_json_structure(parsed["json"], new_text, parsed["original_total_text"])
             
             # 업데이트된 JSON 데이터를 문자열로 변환하여 설정
-            text_body.text = json.dumps(updated_json, ensure_ascii=False)
+            text_body.text = json_codec.dumps(updated_json)
             
             # RenderPos 태그 제거 (XML 태그로서 제거)
-            render_pos = simple_text_tag.find("RenderPos")
+            render_pos = children.get("RenderPos")
             if render_pos is not None:
                 simple_text_tag.remove(render_pos)
                 print(f"RenderPos 태그 제거 완료 (TbpeId: {tbpe_id})")
@@ -345,7 +947,7 @@ class XMLParser:
             # JSON 파싱 오류 시 텍스트 직접 설정
             print(f"JSON 파싱 오류: {e}")
     
-    def update_text_json_structure(self, json_data, new_text):
+    def update_text_json_structure(self, json_data, new_text, original_total_text=None):
         """
         JSON 구조에서 텍스트를 업데이트합니다.
         두 가지 구조를 모두 처리합니다:
@@ -354,10 +956,12 @@ class XMLParser:
         
         첫 번째 텍스트 노드만 업데이트하고 나머지 텍스트 노드는 삭제합니다.
         텍스트 길이 비율에 따라 폰트 크기도 자동으로 조정합니다.
+        입력 JSON은 변경하지 않고, 변경되는 부분만 복사한 새 JSON을 반환합니다.
         
         Args:
             json_data: JSON 데이터 (딕셔너리)
             new_text: 새로운 텍스트
+            original_total_text: 미리 계산한 원본 전체 텍스트 (없으면 직접 계산)
             
         Returns:
             dict: 업데이트된 JSON 데이터
@@ -365,11 +969,12 @@ class XMLParser:
         # 최상위 c키가 있고 리스트인지 확인
         if "c" in json_data and isinstance(json_data["c"], list):
             # 전체 텍스트 길이 계산
-            original_total_text = " ".join(self.count_text_length_from_json(json_data))
+            if original_total_text is None:
+                original_total_text = " ".join(self.count_text_length_from_json(json_data))
             
             # 첫 번째 문단 외 모든 문단 삭제
-            while len(json_data["c"]) > 1:
-                json_data["c"].pop()
+            json_data = dict(json_data)
+            json_data["c"] = json_data["c"][:1]
             
             # 첫 번째 문단 처리
             if len(json_data["c"]) > 0:
@@ -377,6 +982,10 @@ class XMLParser:
                 
                 # 문단이 딕셔너리이고 c키가 있는지 확인
                 if isinstance(paragraph, dict) and "c" in paragraph and isinstance(paragraph["c"], list):
+                    paragraph = dict(paragraph)
+                    paragraph["c"] = list(paragraph["c"])
+                    json_data["c"][0] = paragraph
+                    
                     # 첫 번째 텍스트 노드 찾기
                     found_first_text = False
                     
@@ -384,8 +993,12 @@ class XMLParser:
                         # "t"가 "r"이고 "c"가 리스트인 항목 찾기 (텍스트 노드)
                         if isinstance(item, dict) and item.get("t") == "r" and "c" in item and isinstance(item["c"], list):
                             if not found_first_text:
+                                item = dict(item)
+                                paragraph["c"][i] = item
+                                
                                 # 폰트 크기 조정 (rp가 있고 size가 있는 경우)
                                 if "rp" in item and isinstance(item["rp"], dict) and "size" in item["rp"]:
+                                    item["rp"] = dict(item["rp"])
                                     original_size = item["rp"]["size"]
                                     # 기존 메서드 호출하여 폰트 크기 조정 (전체 텍스트 길이 사용)
                                     new_size = self.update_text_font_size(original_total_text, new_text, original_size)
@@ -479,31 +1092,33 @@ class XMLParser:
         return new_size
         
     
-    def remove_textData_tag(self, parent_tag):
+    def remove_textData_tag(self, parent_tag, children=None):
         """
         TextData 태그를 제거합니다.
         
         Args:
             parent_tag: 부모 태그 요소
+            children: 미리 찾아 둔 하위 태그 딕셔너리 (없으면 직접 찾음)
             
         Returns:
             None
         """
-        text_data_tag = parent_tag.find("TextData")
+        text_data_tag = children.get("TextData") if children is not None else parent_tag.find("TextData")
         if text_data_tag is not None:
             parent_tag.remove(text_data_tag)
     
-    def remove_renderPos_tag(self, parent_tag):
+    def remove_renderPos_tag(self, parent_tag, children=None):
         """
         RenderPos 태그를 제거합니다.
         
         Args:
             parent_tag: 부모 태그 요소
+            children: 미리 찾아 둔 하위 태그 딕셔너리 (없으면 직접 찾음)
             
         Returns:
             None
         """
-        render_pos_tag = parent_tag.find("RenderPos")
+        render_pos_tag = children.get("RenderPos") if children is not None else parent_tag.find("RenderPos")
         if render_pos_tag is not None:
             parent_tag.remove(render_pos_tag)
 
@@ -0,0 +1,200 @@
+import os
+from pathlib import Path
+
+# 생성된 XML 저장 방식 (XML_STORAGE 환경 변수)
+# - inline: 배치 파일에 XML 문자열을 그대로 포함 (기본값)
+# - sidecar: variant마다 별도 XML 파일로 저장하고 배치 파일에는 파일명만 기록
+# - zstd: 배치마다 하나의 zstd 아카이브에 문서별 독립 프레임으로 저장하고 배치 파일에는 위치(offset, length)만 기록
+XML_STORAGE_MODES = ("inline", "sidecar", "zstd")
+
+# 배치 파일 항목에서 XML 문자열을 담는 키 (variant 이름 -> 키)
+XML_KEYS = {"positive": "positive_xml", "negative": "negative_xml"}
+
+def storage_paths(batch_json_path):
+    """
+    배치 파일에 대응하는 XML 저장 위치를 반환합니다 (배치 파일과 같은 디렉토리, 같은 이름).
+    
+    Args:
+        batch_json_path (str): 배치 파일 경로 (batch_{idx}.json 또는 batch_{idx}.jsonl)
+    
+    Returns:
+        tuple: (sidecar 디렉토리 경로, zstd 아카이브 경로)
+    """
+    stem = os.path.splitext(batch_json_path)[0]
+    return f"{stem}_xml", f"{stem}.xml.zst"
+
+def check_storage_mode(mode):
+    """
+    XML 저장 방식을 사용할 수 있는지 확인합니다.
+    
+    Raises:
+        ValueError: 지원하지 않는 저장 방식이거나 zstandard 모듈이 설치되어 있지 않은 경우
+    """
+    if mode not in XML_STORAGE_MODES:
+        raise ValueError(f"지원하지 않는 XML 저장 방식입니다: {mode} (사용 가능: {', '.join(XML_STORAGE_MODES)})")
+    if mode == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("zstd 저장 방식에는 zstandard 모듈이 필요합니다 (pip install zstandard).")
+
+class XMLStorage:
+    """
+    배치 하나의 생성된 XML을 배치 파일 밖에 저장하는 클래스
+    
+    배치 결과 항목의 positive_xml/negative_xml/variant_xml 문자열을 저장한 뒤 xml_refs의 참조로 바꿉니다.
+    - sidecar: {"path": 파일명} (sidecar 디렉토리 기준)
+    - zstd: {"offset": 아카이브 내 위치, "length": 압축 크기, "size": 원본 크기}
+      문서마다 독립된 zstd 프레임으로 저장하므로 아카이브 전체를 풀지 않고 필요한 문서만 읽을 수 있습니다.
+    빈 XML(LLM 처리 실패 등)은 배치 파일에 그대로 둡니다.
+    """
+
+    def __init__(self, batch_json_path, mode, level=3):
+        """
+        Args:
+            batch_json_path (str): 배치 파일 경로 (저장 위치 계산 기준)
+            mode (str): 저장 방식 (sidecar 또는 zstd)
+            level (int): zstd 압축 수준
+        """
+        self.mode = mode
+        self.sidecar_dir, self.archive_path = storage_paths(batch_json_path)
+        self.documents = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+        self._names = set()
+        self._archive = None
+        self._offset = 0
+        
+        if mode == "sidecar":
+            os.makedirs(self.sidecar_dir, exist_ok=True)
+        elif mode == "zstd":
+            import zstandard
+            self._compressor = zstandard.ZstdCompressor(level=level)
+            self._archive = open(self.archive_path, 'wb')
+        else:
+            raise ValueError(f"배치 파일 밖에 저장할 수 없는 XML 저장 방식입니다: {mode}")
+
+    def store_all(self, file_results):
+        """
+        배치 결과 이터러블을 감싸 각 항목의 XML을 저장하고 참조로 바꾼 항목을 반환합니다.
+        모든 항목을 반환하면 아카이브를 닫습니다.
+        
+        Args:
+            file_results: process_file 결과 이터러블
+        
+        Yields:
+            dict: XML 문자열 대신 xml_refs를 포함한 배치 결과 항목
+        """
+        try:
+            for file_result in file_results:
+                yield self.store(file_result)
+        finally:
+            self.close()
+
+    def store(self, file_result):
+        """배치 결과 항목 하나의 XML을 저장하고 참조로 바꿉니다."""
+        if not file_result.get("success"):
+            return file_result
+        
+        documents = {variant: file_result.get(key) for variant, key in XML_KEYS.items()}
+        documents.update(file_result.get("variant_xml") or {})
+        
+        refs = {}
+        stem = Path(file_result["file"]).stem
+        for variant, xml_string in documents.items():
+            if not xml_string:
+                continue
+            refs[variant] = self.write(stem, variant, xml_string.encode("utf-8"))
+        
+        if not refs:
+            return file_result
+        
+        # 저장한 XML 문자열은 배치 파일에 포함하지 않음
+        for variant in refs:
+            if variant in XML_KEYS:
+                file_result.pop(XML_KEYS[variant])
+            else:
+                file_result["variant_xml"].pop(variant)
+        if "variant_xml" in file_result and not file_result["variant_xml"]:
+            file_result.pop("variant_xml")
+        file_result["xml_storage"] = self.mode
+        file_result["xml_refs"] = refs
+        return file_result
+
+    def write(self, stem, variant, data):
+        """
+        XML 문서 하나를 저장합니다.
+        
+        Args:
+            stem (str): 입력 파일명 (확장자 제외)
+            variant (str): variant 이름 (positive, negative 등)
+            data (bytes): UTF-8로 인코딩된 XML 문서
+        
+        Returns:
+            dict: 배치 파일에 기록할 참조
+        """
+        self.documents += 1
+        self.raw_bytes += len(data)
+        
+        if self.mode == "sidecar":
+            # 다른 디렉토리의 같은 이름 파일이 같은 배치에 있는 경우 번호를 붙임
+            name = f"{stem}_{variant}.xml"
+            suffix = 1
+            while name in self._names:
+                name = f"{stem}_{variant}_{suffix}.xml"
+                suffix += 1
+            self._names.add(name)
+            with open(os.path.join(self.sidecar_dir, name), 'wb') as f:
+                f.write(data)
+            self.stored_bytes += len(data)
+            return {"path": name}
+        
+        frame = self._compressor.compress(data)
+        ref = {"offset": self._offset, "length": len(frame), "size": len(data)}
+        self._archive.write(frame)
+        self._offset += len(frame)
+        self.stored_bytes += len(frame)
+        return ref
+
+    def close(self):
+        """zstd 아카이브를 닫습니다."""
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+
+    def stats(self):
+        """저장한 문서 수와 원본/저장 크기를 반환합니다."""
+        return {
+            "xml_documents": self.documents,
+            "xml_raw_bytes": self.raw_bytes,
+            "xml_stored_bytes": self.stored_bytes
+        }
+
+def load_xml(batch_json_path, file_result, variant):
+    """
+    배치 결과 항목에서 variant의 XML 문자열을 읽어옵니다 (저장 방식과 무관).
+    
+    Args:
+        batch_json_path (str): 항목이 기록된 배치 파일 경로
+        file_result (dict): 배치 결과 항목
+        variant (str): variant 이름 (positive, negative 등)
+    
+    Returns:
+        str: XML 문자열 (없으면 빈 문자열)
+    """
+    ref = (file_result.get("xml_refs") or {}).get(variant)
+    if ref is None:
+        if variant in XML_KEYS:
+            return file_result.get(XML_KEYS[variant], "")
+        return (file_result.get("variant_xml") or {}).get(variant, "")
+    
+    sidecar_dir, archive_path = storage_paths(batch_json_path)
+    if file_result.get("xml_storage") == "sidecar":
+        with open(os.path.join(sidecar_dir, ref["path"]), 'rb') as f:
+            return f.read().decode("utf-8")
+    
+    import zstandard
+    with open(archive_path, 'rb') as f:
+        f.seek(ref["offset"])
+        frame = f.read(ref["length"])
+    return zstandard.ZstdDecompressor().decompress(frame, max_output_size=ref["size"]).decode("utf-8")
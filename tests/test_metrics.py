@@ -0,0 +1,16 @@
+from python.services.metrics import percentile, summarize
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile([], 95) == 0.0
+
+def test_tail_percentiles_are_max_on_small_samples():
+    # 표본이 20개 미만이면 p95/p99는 최댓값이어야 함
+    for n in range(1, 20):
+        values = [i / 1000 for i in range(1, n + 1)]
+        stats = summarize(values)
+        assert stats["p95_ms"] == stats["max_ms"]
+        assert stats["p99_ms"] == stats["max_ms"]